@@ -0,0 +1,86 @@
+"""Compare rule-based goal parsing against the LLM-only path.
+
+Runs against a LocalBackend with simulated model latency, so no API key
+is needed:
+
+    python benchmarks/goal_parsing.py --latency 0.8
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from statistics import mean
+
+# Runs straight from a checkout, without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from health_wellness_agent.tools.goal_analyzer import GoalAnalyzerTool
+from health_wellness_agent.utils.llm_client import LocalBackend, configure_llm_client
+
+SAMPLE_GOALS = [
+    "lose 5 kg in 10 weeks",
+    "Gain 3 lbs of muscle by March",
+    "I want to lose 2 stone in 6 months",
+    "drop 10 pounds in 12 weeks without running",
+    "put on 4kg of muscle in 16 weeks",
+    "lose 8 lbs by 2027-01-31",
+    "gain 2 kg in 3 months, vegetarian",
+    "shed 6 kilos in 2 months, bad knee",
+    "lose one stone in 14 weeks",
+    "bulk up 5 lbs in 10 weeks",
+    "run a marathon in 16 weeks",
+    "lose fat and build muscle",
+    "get fitter before summer",
+    "improve my flexibility so I can do the splits",
+    "I want to feel healthier"
+]
+
+def simulated_model(model_name: str, prompt: str) -> str:
+    return json.dumps({
+        "goal_type": "weight_loss",
+        "target_value": 5.0,
+        "timeframe_weeks": 10,
+        "constraints": []
+    })
+
+async def run_path(use_fast_path: bool, backend: LocalBackend) -> dict:
+    GoalAnalyzerTool._parse_cache.clear()
+    tool = GoalAnalyzerTool()
+    tool.use_fast_path = use_fast_path
+    calls_before = backend.calls
+
+    latencies = []
+    for goal in SAMPLE_GOALS:
+        start = time.perf_counter()
+        await tool.extract_goal(goal)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    model_calls = backend.calls - calls_before
+    return {
+        "path": "fast path + LLM fallback" if use_fast_path else "LLM only",
+        "hit_rate": 1 - model_calls / len(SAMPLE_GOALS),
+        "model_calls": model_calls,
+        "mean_ms": mean(latencies),
+        "total_ms": sum(latencies)
+    }
+
+async def main(latency: float) -> None:
+    backend = LocalBackend(simulated_model, latency=latency)
+    configure_llm_client(backend)
+
+    print(f"{len(SAMPLE_GOALS)} goals, simulated model latency {latency * 1000:.0f} ms")
+    for use_fast_path in (False, True):
+        result = await run_path(use_fast_path, backend)
+        print(
+            f"{result['path']:<26} hit rate {result['hit_rate']:>5.0%}  "
+            f"model calls {result['model_calls']:>3}  "
+            f"mean {result['mean_ms']:>8.2f} ms  total {result['total_ms']:>9.2f} ms"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.8, help="simulated model latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency))
\ No newline at end of file
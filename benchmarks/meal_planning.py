@@ -0,0 +1,79 @@
+"""Measure week meal-plan latency for serial vs concurrent day generation.
+
+Runs against a LocalBackend with simulated model latency, so no API key
+is needed:
+
+    python benchmarks/meal_planning.py --latency 0.5 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Runs straight from a checkout, without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from health_wellness_agent.tools.meal_planner import DietaryPreferences, MealPlannerTool
+from health_wellness_agent.utils.llm_client import LocalBackend, configure_llm_client
+
+TARGETS = {"calories": 2000, "protein": 120, "carbs": 220, "fat": 70}
+
+def simulated_meal(name: str, calories: float) -> dict:
+    return {
+        "name": name,
+        "ingredients": ["1 cup oats", "2 eggs", "100g spinach"],
+        "nutrition": {"calories": calories, "protein": calories / 20, "carbs": calories / 9, "fat": calories / 30},
+        "preparation": "Combine and cook.",
+        "portion_size": "1 plate"
+    }
+
+def make_responder(failure_rate: float, rng: random.Random):
+    def respond(model_name: str, prompt: str) -> str:
+        if rng.random() < failure_rate:
+            raise RuntimeError("simulated model failure")
+        return json.dumps({
+            "breakfast": simulated_meal("Veggie omelette", 450),
+            "lunch": simulated_meal("Chickpea bowl", 650),
+            "dinner": simulated_meal("Salmon and rice", 700),
+            "snacks": [simulated_meal("Greek yogurt", 200)]
+        })
+    return respond
+
+async def time_week(max_concurrent_days: int) -> float:
+    tool = MealPlannerTool()
+    tool.max_concurrent_days = max_concurrent_days
+    tool.day_retry_delay = 0.0
+    # Measure the model path: the optimizer and template cache would fill every day without a call
+    tool.use_optimizer = False
+    tool.use_plan_cache = False
+
+    start = time.perf_counter()
+    plans = await tool.generate_daily_plans(TARGETS, DietaryPreferences(calories_target=2000))
+    elapsed = time.perf_counter() - start
+
+    assert list(plans) == ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    return elapsed
+
+async def main(latency: float, failure_rate: float, seed: int) -> None:
+    backend = LocalBackend(make_responder(failure_rate, random.Random(seed)), latency=latency)
+    configure_llm_client(backend)
+
+    print(f"simulated model latency {latency * 1000:.0f} ms, failure rate {failure_rate:.0%}")
+    for concurrency in (1, 2, 4, 7):
+        calls_before = backend.calls
+        elapsed = await time_week(concurrency)
+        print(
+            f"max_concurrent_days={concurrency}  week in {elapsed * 1000:>8.1f} ms  "
+            f"model calls {backend.calls - calls_before}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated model latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of model calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.failure_rate, args.seed))
\ No newline at end of file
@@ -1,7 +1,9 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from datetime import datetime
 from pydantic import BaseModel
 from openai.agents import Agent, AgentResponse
 from ..context import UserSessionContext
+from ..utils.anomaly import AnomalyTrigger
 
 class EscalationAgent(Agent):
     name = "escalation"
@@ -44,6 +46,30 @@ class EscalationAgent(Agent):
             }
         )
 
+    def escalate_anomalies(self, triggers: List[AnomalyTrigger], context: UserSessionContext) -> Dict:
+        # Detector triggers arrive already classified, so they reach a coach without a model call
+        if not triggers:
+            return {}
+        escalation_details = {
+            "triggers": [trigger.trigger for trigger in triggers],
+            "urgency": "high" if any(trigger.urgency == "high" for trigger in triggers) else "medium",
+            "required_expertise": "coach",
+            "anomalies": [trigger.model_dump() for trigger in triggers]
+        }
+        context.handoff_logs.append({
+            "timestamp": datetime.now(),
+            "from_agent": "progress_tracker",
+            "to_agent": "escalation",
+            "reason": escalation_details["triggers"],
+            "urgency": escalation_details["urgency"]
+        })
+        context.escalation_status = {
+            "status": "pending_coach_review",
+            "timestamp": datetime.now(),
+            "details": escalation_details
+        }
+        return escalation_details
+
     async def analyze_escalation_need(self, query: str, context: UserSessionContext) -> Dict:
         # Identify escalation triggers
         triggers = self.identify_escalation_triggers(query)
@@ -2,8 +2,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 from openai.agents import Agent, AgentResponse
 from ..context import UserSessionContext
-from ..config import GEMINI_API_KEY
-import google.generativeai as genai
+from ..utils.llm_client import get_model
 
 class InjurySupportAgent(Agent):
     name = "injury_support"
@@ -38,8 +37,7 @@ class InjurySupportAgent(Agent):
 
     def __init__(self):
         super().__init__()
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = get_model('gemini-pro')
 
     async def assess_injury(self, query: str, context: UserSessionContext) -> Dict:
         prompt = "Assess injury details and provide safe recommendations."
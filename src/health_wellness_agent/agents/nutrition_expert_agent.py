@@ -2,8 +2,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 from openai.agents import Agent, AgentResponse
 from ..context import UserSessionContext
-from ..config import GEMINI_API_KEY
-import google.generativeai as genai
+from ..utils.llm_client import get_model
 
 class NutritionExpertAgent(Agent):
     name = "nutrition_expert"
@@ -32,8 +31,7 @@ class NutritionExpertAgent(Agent):
 
     def __init__(self):
         super().__init__()
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = get_model('gemini-pro')
 
     async def analyze_nutrition_requirements(self, query: str, context: UserSessionContext) -> Dict:
         prompt = "Analyze dietary requirements and restrictions from the query."
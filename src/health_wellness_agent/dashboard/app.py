@@ -6,17 +6,10 @@ import numpy as np
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 import io
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
+from health_wellness_agent.utils.llm_client import get_model
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Configure Gemini AI
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
+# Shared Gemini handle; the client behind it survives Streamlit reruns
+model = get_model('gemini-1.5-flash')
 
 # Set page config with dark theme
 st.set_page_config(
@@ -187,7 +180,7 @@ def get_ai_recommendations(age, weight, height, bmi, bmi_status):
     
     Make the recommendations detailed but concise."""
     
-    response = model.generate_content(prompt)
+    response = model.generate_content_sync(prompt)
     return response.text
 
 # Main chat interface
@@ -215,7 +208,7 @@ if user_input:
         Provide a helpful and personalized response."""
         
         with st.spinner("Thinking..."):
-            response = model.generate_content(prompt)
+            response = model.generate_content_sync(prompt)
             st.markdown(response.text)
             # Save to chat history
             st.session_state.chat_history.append({"role": "assistant", "content": response.text})
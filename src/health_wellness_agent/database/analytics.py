@@ -0,0 +1,141 @@
+"""Rebuild per-user and per-cohort progress summaries from progress_logs.
+
+Run from a nightly job; summaries are replaced wholesale on every run:
+
+    python -m health_wellness_agent.database.analytics sqlite:///health.db --chunk-rows 50000
+"""
+from typing import Dict, Iterator, Optional
+from datetime import datetime
+import argparse
+import pandas as pd
+from sqlalchemy import delete, select
+from .db import Database
+from .models import CohortProgressSummary, Goal, ProgressLog, UserProgressSummary
+
+# Rows read from progress_logs per chunk
+CHUNK_ROWS = 200_000
+# Cohort for users without an active goal
+NO_GOAL_COHORT = "no_active_goal"
+
+LOG_COLUMNS = [
+    ProgressLog.user_id,
+    ProgressLog.log_date,
+    ProgressLog.weight,
+    ProgressLog.energy_level,
+    ProgressLog.workout_compliance,
+    ProgressLog.diet_compliance
+]
+
+class CohortAnalytics:
+    """Per-user and per-cohort progress summaries from one ordered pass over progress_logs"""
+
+    def __init__(self, db: Database, chunk_rows: int = CHUNK_ROWS):
+        self.db = db
+        self.chunk_rows = chunk_rows
+
+    def read_chunks(self) -> Iterator[pd.DataFrame]:
+        # Streamed in (user_id, log_date) order; a user cut off at the end of a chunk moves to the next one,
+        # so every yielded frame holds complete users
+        query = select(*LOG_COLUMNS).order_by(ProgressLog.user_id, ProgressLog.log_date)
+        carry = None
+        with self.db.engine.connect().execution_options(stream_results=True) as connection:
+            for chunk in pd.read_sql(query, connection, parse_dates=["log_date"], chunksize=self.chunk_rows):
+                if carry is not None:
+                    chunk = pd.concat([carry, chunk], ignore_index=True)
+                split = int(chunk["user_id"].searchsorted(chunk["user_id"].iat[-1], side="left"))
+                carry = chunk.iloc[split:]
+                if split:
+                    yield chunk.iloc[:split]
+        if carry is not None and len(carry):
+            yield carry
+
+    def load_cohorts(self) -> pd.Series:
+        # A user's cohort is the type of their most recent active goal
+        with self.db.engine.connect() as connection:
+            goals = pd.read_sql(
+                select(Goal.user_id, Goal.goal_type).where(Goal.status == "active").order_by(Goal.created_at, Goal.id),
+                connection
+            )
+        return goals.drop_duplicates("user_id", keep="last").set_index("user_id")["goal_type"]
+
+    def summarize_users(self, logs: pd.DataFrame, today: Optional[datetime] = None) -> pd.DataFrame:
+        # Logs arrive sorted by user and date, so first/last are the earliest/latest values
+        summary = logs.groupby("user_id", sort=False).agg(
+            log_count=("log_date", "size"),
+            first_log=("log_date", "first"),
+            last_log=("log_date", "last"),
+            workout_compliance=("workout_compliance", "mean"),
+            diet_compliance=("diet_compliance", "mean"),
+            energy_level=("energy_level", "mean"),
+            weight_start=("weight", "first"),
+            weight_latest=("weight", "last")
+        )
+
+        # Least-squares weight slope from grouped sums, with days counted from each user's first weigh-in
+        weighed = logs[logs["weight"].notna()]
+        days = (weighed["log_date"] - weighed.groupby("user_id", sort=False)["log_date"].transform("first")) / pd.Timedelta(days=1)
+        sums = pd.DataFrame({
+            "user_id": weighed["user_id"],
+            "n": 1.0,
+            "t": days,
+            "y": weighed["weight"],
+            "tt": days * days,
+            "ty": days * weighed["weight"]
+        }).groupby("user_id", sort=False).sum()
+        denominator = sums["n"] * sums["tt"] - sums["t"] ** 2
+        slope = (sums["n"] * sums["ty"] - sums["t"] * sums["y"]) / denominator.where(denominator > 1e-9)
+        summary["weight_slope"] = (slope * 7).reindex(summary.index)
+
+        # Streaks are runs of consecutive calendar days with at least one log; the latest streak is the run
+        # still alive on the reference day, i.e. ending today or yesterday, and 0 once a day has been missed
+        logged = logs[["user_id"]].assign(day=logs["log_date"].dt.floor("D")).drop_duplicates()
+        new_run = (logged["user_id"] != logged["user_id"].shift()) | (logged["day"] - logged["day"].shift() != pd.Timedelta(days=1))
+        runs = logged.groupby(new_run.cumsum(), sort=False).agg(user_id=("user_id", "first"), end=("day", "last"), length=("day", "size"))
+        today = pd.Timestamp(today or datetime.utcnow()).floor("D")
+        runs["current"] = runs["length"].where(runs["end"] >= today - pd.Timedelta(days=1), 0)
+        streaks = runs.groupby("user_id", sort=False).agg(latest_streak=("current", "last"), longest_streak=("length", "max"))
+        return summary.join(streaks)
+
+    def summarize_cohorts(self, users: pd.DataFrame) -> pd.DataFrame:
+        # Means over users, so a user who logs daily counts the same as one who logs weekly
+        return users.groupby("cohort").agg(
+            user_count=("log_count", "size"),
+            log_count=("log_count", "sum"),
+            workout_compliance=("workout_compliance", "mean"),
+            diet_compliance=("diet_compliance", "mean"),
+            energy_level=("energy_level", "mean"),
+            weight_slope_mean=("weight_slope", "mean"),
+            weight_slope_median=("weight_slope", "median"),
+            longest_streak_mean=("longest_streak", "mean")
+        )
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        computed_at = now or datetime.utcnow()
+        cohorts = self.load_cohorts()
+        parts = [self.summarize_users(chunk, computed_at) for chunk in self.read_chunks()]
+        if not parts:
+            return {"users": 0, "cohorts": 0}
+
+        users = pd.concat(parts)
+        users["cohort"] = cohorts.reindex(users.index).fillna(NO_GOAL_COHORT).to_numpy()
+        users["computed_at"] = computed_at
+        cohort_summary = self.summarize_cohorts(users)
+        cohort_summary["computed_at"] = computed_at
+
+        # Replaced in one transaction so readers never see a half-written run
+        with self.db.engine.begin() as connection:
+            connection.execute(delete(UserProgressSummary))
+            connection.execute(delete(CohortProgressSummary))
+            users.reset_index().to_sql(UserProgressSummary.__tablename__, connection, if_exists="append", index=False, chunksize=10_000)
+            cohort_summary.reset_index().to_sql(CohortProgressSummary.__tablename__, connection, if_exists="append", index=False, chunksize=10_000)
+        return {"users": len(users), "cohorts": len(cohort_summary)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db_url", help="SQLAlchemy database URL")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="progress_logs rows read per chunk")
+    args = parser.parse_args()
+    db = Database(args.db_url)
+    db.create_tables()
+    counts = CohortAnalytics(db, args.chunk_rows).run()
+    print(f"summarized {counts['users']} users in {counts['cohorts']} cohorts")
\ No newline at end of file
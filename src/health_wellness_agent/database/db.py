@@ -1,8 +1,21 @@
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Callable
+from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
-from .models import Base, User, Goal, MealPlan, WorkoutPlan, ProgressLog
+from ..utils.anomaly import AnomalyDetector, AnomalySink, EscalationSink
+from ..utils.trend_stats import TrendState
+from .models import Base, User, Goal, MealPlan, WorkoutPlan, ProgressLog, ProgressTrend
+from .rollups import ROLLUP_METRICS, apply_log, backfill, rollup_series, summarize_range
+from .upsert import upsert
+
+# Trend metric names mapped to their progress_logs columns
+TREND_COLUMNS = {
+    "weight": "weight",
+    "energy_levels": "energy_level",
+    "workout_compliance": "workout_compliance",
+    "diet_compliance": "diet_compliance"
+}
 
 class Database:
     def __init__(self, db_url: str):
@@ -16,8 +29,20 @@ class Database:
         return self.SessionLocal()
 
 class DatabaseManager:
-    def __init__(self, db: Database):
+    def __init__(
+        self,
+        db: Database,
+        anomaly_sink: Optional[AnomalySink] = None,
+        escalation_agent: Optional[Any] = None,
+        contexts: Optional[Callable[[int], Any]] = None
+    ):
         self.db = db
+        # Anomalies go to the escalation agent unless another sink is given
+        if anomaly_sink is None and escalation_agent is not None:
+            if contexts is None:
+                raise ValueError("Escalating anomalies needs a way to look up each user's session context")
+            anomaly_sink = EscalationSink(escalation_agent, contexts)
+        self.anomaly_sink = anomaly_sink
 
     async def create_user(self, user_data: dict) -> User:
         with self.db.get_session() as session:
@@ -59,9 +84,48 @@ class DatabaseManager:
         with self.db.get_session() as session:
             progress_log = ProgressLog(user_id=user_id, **log_data)
             session.add(progress_log)
+            apply_log(session, user_id, progress_log.log_date, {metric: log_data.get(metric) for metric in ROLLUP_METRICS})
+
+            # Fold the new values into the user's running trends and anomaly baselines in the same transaction
+            # The JSON state is rebuilt in Python, so the row is created if missing and then locked:
+            # concurrent logs for one user take turns instead of overwriting each other's update
+            values = {metric: log_data.get(column) for metric, column in TREND_COLUMNS.items()}
+            upsert(session, ProgressTrend, {"user_id": user_id, "state": {}}, ["user_id"])
+            trend = session.query(ProgressTrend).filter(ProgressTrend.user_id == user_id).with_for_update().populate_existing().one()
+            state = TrendState.from_dict(trend.state)
+            state.update(progress_log.log_date, values)
+            detector = AnomalyDetector.from_dict(trend.detector)
+            triggers = detector.observe(progress_log.log_date, values)
+            trend.state = state.to_dict()
+            trend.detector = detector.to_dict()
             session.commit()
             session.refresh(progress_log)
-            return progress_log
+
+        if triggers and self.anomaly_sink is not None:
+            await self.anomaly_sink.emit(user_id, triggers)
+        return progress_log
+
+    async def get_trend_state(self, user_id: int) -> TrendState:
+        with self.db.get_session() as session:
+            trend = session.get(ProgressTrend, user_id)
+            return TrendState.from_dict(trend.state if trend else None)
+
+    async def get_anomaly_detector(self, user_id: int) -> AnomalyDetector:
+        with self.db.get_session() as session:
+            trend = session.get(ProgressTrend, user_id)
+            return AnomalyDetector.from_dict(trend.detector if trend else None)
+
+    async def get_progress_summary(self, user_id: int, start_date: datetime, end_date: datetime) -> dict:
+        # Averages over whole days, read from the coarsest rollups that tile the range
+        with self.db.get_session() as session:
+            return summarize_range(session, user_id, start_date, end_date)
+
+    async def get_progress_rollups(self, user_id: int, period: str, start_date: datetime, end_date: datetime) -> List[dict]:
+        with self.db.get_session() as session:
+            return rollup_series(session, user_id, period, start_date, end_date)
+
+    async def rebuild_rollups(self, user_ids: Optional[List[int]] = None) -> int:
+        return backfill(self.db.engine, user_ids)
 
     async def get_user_progress(self, user_id: int, start_date: datetime, end_date: datetime) -> List[ProgressLog]:
         with self.db.get_session() as session:
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -24,6 +24,8 @@ class User(Base):
     meal_plans = relationship('MealPlan', back_populates='user')
     workout_plans = relationship('WorkoutPlan', back_populates='user')
     progress_logs = relationship('ProgressLog', back_populates='user')
+    scheduled_checkins = relationship('ScheduledCheckin', back_populates='user')
+    progress_trend = relationship('ProgressTrend', back_populates='user', uselist=False)
 
 class Goal(Base):
     __tablename__ = 'goals'
@@ -73,6 +75,8 @@ class WorkoutPlan(Base):
 
 class ProgressLog(Base):
     __tablename__ = 'progress_logs'
+    # Per-user range reads and the cohort scan both walk logs by user, then date
+    __table_args__ = (Index('ix_progress_logs_user_date', 'user_id', 'log_date'),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -85,4 +89,84 @@ class ProgressLog(Base):
     notes = Column(String(500))
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    user = relationship('User', back_populates='progress_logs')
\ No newline at end of file
+    user = relationship('User', back_populates='progress_logs')
+
+class ProgressTrend(Base):
+    __tablename__ = 'progress_trends'
+
+    # Running trend accumulators and anomaly baselines per metric, updated with every progress log
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    state = Column(JSON, nullable=False)
+    detector = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = relationship('User', back_populates='progress_trend')
+
+class ProgressRollup(Base):
+    __tablename__ = 'progress_rollups'
+    # One row per user and calendar day, ISO week or month; sums and counts keep averages exact under incremental updates
+    __table_args__ = (UniqueConstraint('user_id', 'period', 'period_start', name='uq_progress_rollups_period'),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    period = Column(String(10), nullable=False)
+    period_start = Column(DateTime, nullable=False)
+    log_count = Column(Integer, nullable=False, default=0)
+    weight_sum = Column(Float, nullable=False, default=0.0)
+    weight_count = Column(Integer, nullable=False, default=0)
+    energy_level_sum = Column(Float, nullable=False, default=0.0)
+    energy_level_count = Column(Integer, nullable=False, default=0)
+    workout_compliance_sum = Column(Float, nullable=False, default=0.0)
+    workout_compliance_count = Column(Integer, nullable=False, default=0)
+    diet_compliance_sum = Column(Float, nullable=False, default=0.0)
+    diet_compliance_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserProgressSummary(Base):
+    __tablename__ = 'user_progress_summaries'
+
+    # Rebuilt by the cohort analytics job; weight_slope is kg per week
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    cohort = Column(String(50), nullable=False, index=True)
+    log_count = Column(Integer, nullable=False)
+    first_log = Column(DateTime)
+    last_log = Column(DateTime)
+    workout_compliance = Column(Float)
+    diet_compliance = Column(Float)
+    energy_level = Column(Float)
+    weight_start = Column(Float)
+    weight_latest = Column(Float)
+    weight_slope = Column(Float)
+    latest_streak = Column(Integer)
+    longest_streak = Column(Integer)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class CohortProgressSummary(Base):
+    __tablename__ = 'cohort_progress_summaries'
+
+    cohort = Column(String(50), primary_key=True)
+    user_count = Column(Integer, nullable=False)
+    log_count = Column(Integer, nullable=False)
+    workout_compliance = Column(Float)
+    diet_compliance = Column(Float)
+    energy_level = Column(Float)
+    weight_slope_mean = Column(Float)
+    weight_slope_median = Column(Float)
+    longest_streak_mean = Column(Float)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class ScheduledCheckin(Base):
+    __tablename__ = 'scheduled_checkins'
+    # Restoring the dispatcher reads only pending rows, in due order
+    __table_args__ = (Index('ix_scheduled_checkins_pending', 'delivered_at', 'due_at'),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    due_at = Column(DateTime, nullable=False)
+    checkin_type = Column(String(50), nullable=False)
+    metrics_required = Column(JSON)
+    questions = Column(JSON)
+    delivered_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship('User', back_populates='scheduled_checkins')
\ No newline at end of file
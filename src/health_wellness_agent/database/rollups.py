@@ -0,0 +1,163 @@
+"""Rebuild daily, weekly and monthly progress rollups from progress_logs.
+
+Run after a schema change or a bulk import; log_progress keeps them current otherwise:
+
+    python -m health_wellness_agent.database.rollups sqlite:///health.db --user-id 42
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+import argparse
+import pandas as pd
+from sqlalchemy import and_, create_engine, delete, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .models import Base, ProgressLog, ProgressRollup
+from .upsert import upsert
+
+# Coarsest first
+ROLLUP_PERIODS = ["month", "week", "day"]
+# progress_logs columns with a _sum and _count in every rollup row
+ROLLUP_METRICS = ["weight", "energy_level", "workout_compliance", "diet_compliance"]
+# Users read and aggregated per backfill batch
+BACKFILL_USERS = 1000
+
+EMPTY_TOTALS = {
+    "log_count": 0,
+    **{f"{metric}_sum": 0.0 for metric in ROLLUP_METRICS},
+    **{f"{metric}_count": 0 for metric in ROLLUP_METRICS}
+}
+
+def period_start(when: datetime, period: str) -> datetime:
+    day = datetime(when.year, when.month, when.day)
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+def period_end(start: datetime, period: str) -> datetime:
+    if period == "day":
+        return start + timedelta(days=1)
+    if period == "week":
+        return start + timedelta(weeks=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+def periods_filter(user_id: int, periods: Sequence[Tuple[str, datetime]]):
+    return and_(
+        ProgressRollup.user_id == user_id,
+        or_(*(and_(ProgressRollup.period == period, ProgressRollup.period_start == start) for period, start in periods))
+    )
+
+def apply_log(session: Session, user_id: int, log_date: datetime, values: Dict[str, Optional[float]]) -> None:
+    # Adds one log to its day, week and month rows inside the caller's transaction; each row is inserted
+    # or incremented by the database in one statement, so concurrent logs neither collide nor lose counts
+    totals = dict(EMPTY_TOTALS, log_count=1)
+    for metric in ROLLUP_METRICS:
+        value = values.get(metric)
+        if value is not None:
+            totals[f"{metric}_sum"] = value
+            totals[f"{metric}_count"] = 1
+    for period in ROLLUP_PERIODS:
+        upsert(
+            session,
+            ProgressRollup,
+            {"user_id": user_id, "period": period, "period_start": period_start(log_date, period), **totals},
+            ["user_id", "period", "period_start"],
+            increment=list(EMPTY_TOTALS)
+        )
+
+def cover(start: datetime, end: datetime) -> List[Tuple[str, datetime]]:
+    # Fewest aligned periods covering the days from start to end inclusive: whole months where they fit,
+    # then whole weeks that stop short of the next whole month, then single days
+    cursor = period_start(start, "day")
+    stop = period_start(end, "day") + timedelta(days=1)
+    periods = []
+    while cursor < stop:
+        next_month = period_end(period_start(cursor, "month"), "month")
+        week_limit = next_month if period_end(next_month, "month") <= stop else stop
+        if cursor.day == 1 and period_end(cursor, "month") <= stop:
+            period = "month"
+        elif cursor.weekday() == 0 and period_end(cursor, "week") <= week_limit:
+            period = "week"
+        else:
+            period = "day"
+        periods.append((period, cursor))
+        cursor = period_end(cursor, period)
+    return periods
+
+def averages(totals: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    summary = {"log_count": totals["log_count"]}
+    for metric in ROLLUP_METRICS:
+        count = totals[f"{metric}_count"]
+        summary[metric] = totals[f"{metric}_sum"] / count if count else None
+    return summary
+
+def summarize_range(session: Session, user_id: int, start: datetime, end: datetime) -> Dict[str, Optional[float]]:
+    periods = cover(start, end)
+    totals = dict(EMPTY_TOTALS)
+    if periods:
+        for row in session.query(ProgressRollup).filter(periods_filter(user_id, periods)):
+            for name in totals:
+                totals[name] += getattr(row, name)
+    return averages(totals)
+
+def rollup_series(session: Session, user_id: int, period: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    rows = session.query(ProgressRollup).filter(
+        ProgressRollup.user_id == user_id,
+        ProgressRollup.period == period,
+        ProgressRollup.period_start.between(period_start(start, period), end)
+    ).order_by(ProgressRollup.period_start).all()
+    return [
+        {"period_start": row.period_start, **averages({name: getattr(row, name) for name in EMPTY_TOTALS})}
+        for row in rows
+    ]
+
+def rollup_frame(logs: pd.DataFrame) -> pd.DataFrame:
+    # All three granularities for a batch of logs in one groupby each
+    day = logs["log_date"].dt.floor("D")
+    starts = {
+        "day": day,
+        "week": day - pd.to_timedelta(day.dt.weekday, unit="D"),
+        "month": day - pd.to_timedelta(day.dt.day - 1, unit="D")
+    }
+    aggregations = {"log_count": ("log_date", "size")}
+    for metric in ROLLUP_METRICS:
+        aggregations[f"{metric}_sum"] = (metric, "sum")
+        aggregations[f"{metric}_count"] = (metric, "count")
+    frames = [
+        logs.assign(period_start=starts[period]).groupby(["user_id", "period_start"]).agg(**aggregations).reset_index().assign(period=period)
+        for period in ROLLUP_PERIODS
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+def backfill(engine: Engine, user_ids: Optional[Sequence[int]] = None, batch_users: int = BACKFILL_USERS) -> int:
+    # Delete and rebuild in one transaction, so readers never see the rollups missing and a failure changes nothing;
+    # users are still read and aggregated in batches to bound memory
+    written = 0
+    columns = [ProgressLog.user_id, ProgressLog.log_date] + [getattr(ProgressLog, metric) for metric in ROLLUP_METRICS]
+    with engine.begin() as connection:
+        if user_ids is None:
+            connection.execute(delete(ProgressRollup))
+            user_ids = connection.execute(select(ProgressLog.user_id).distinct().order_by(ProgressLog.user_id)).scalars().all()
+        else:
+            connection.execute(delete(ProgressRollup).where(ProgressRollup.user_id.in_(list(user_ids))))
+
+        for offset in range(0, len(user_ids), batch_users):
+            batch = list(user_ids[offset:offset + batch_users])
+            logs = pd.read_sql(select(*columns).where(ProgressLog.user_id.in_(batch)), connection, parse_dates=["log_date"])
+            if logs.empty:
+                continue
+            rollups = rollup_frame(logs)
+            rollups["updated_at"] = datetime.utcnow()
+            rollups.to_sql(ProgressRollup.__tablename__, connection, if_exists="append", index=False, chunksize=10_000)
+            written += len(rollups)
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db_url", help="SQLAlchemy database URL")
+    parser.add_argument("--user-id", type=int, action="append", help="rebuild only these users (repeatable)")
+    args = parser.parse_args()
+    engine = create_engine(args.db_url)
+    Base.metadata.create_all(engine)
+    print(f"wrote {backfill(engine, args.user_id)} rollup rows")
\ No newline at end of file
@@ -0,0 +1,33 @@
+from typing import Any, Dict, Sequence
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Dialects with a single-statement INSERT-or-UPDATE
+UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite, "mysql": mysql, "mariadb": mysql}
+
+def upsert(session: Session, model, values: Dict[str, Any], conflict_columns: Sequence[str], increment: Sequence[str] = ()) -> None:
+    # Inserts values, or on a unique conflict adds the increment columns to the existing row (or leaves it alone);
+    # the database applies it atomically, so concurrent writers neither fail nor lose updates
+    dialect = session.get_bind().dialect.name
+    module = UPSERT_DIALECTS.get(dialect)
+    if module is None:
+        raise NotImplementedError(f"No atomic upsert for the {dialect} dialect")
+
+    statement = module.insert(model).values(**values)
+    # Columns like updated_at that the ORM would refresh on UPDATE; the upsert must set them itself
+    refreshed = [column.name for column in model.__table__.columns if column.onupdate is not None] if increment else []
+    if module is mysql:
+        proposed = statement.inserted
+        changes = {column: getattr(model, column) + proposed[column] for column in increment}
+        changes.update({column: proposed[column] for column in refreshed})
+        # MySQL has no DO NOTHING; assigning a key column to itself is the no-op form
+        statement = statement.on_duplicate_key_update(changes or {conflict_columns[0]: getattr(model, conflict_columns[0])})
+    else:
+        proposed = statement.excluded
+        changes = {column: getattr(model, column) + proposed[column] for column in increment}
+        changes.update({column: proposed[column] for column in refreshed})
+        if changes:
+            statement = statement.on_conflict_do_update(index_elements=list(conflict_columns), set_=changes)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=list(conflict_columns))
+    session.execute(statement)
\ No newline at end of file
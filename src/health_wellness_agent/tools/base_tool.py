@@ -2,6 +2,7 @@ from typing import Any, Dict, Optional
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
 from openai.agents import Tool
+import asyncio
 
 class AsyncToolBase(Tool, ABC):
     max_retries: int = 3
@@ -0,0 +1,154 @@
+from typing import Dict, List, Optional, Set, Tuple
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+import asyncio
+import logging
+from ..database.db import Database
+from ..database.models import ScheduledCheckin as ScheduledCheckinRow
+from ..utils.timer_wheel import TimerWheel
+from .scheduler import ScheduledCheckin
+
+class CheckinSink(ABC):
+    @abstractmethod
+    async def deliver(self, user_id: int, checkin: ScheduledCheckin) -> None:
+        """Hand one due check-in to whatever notifies the user"""
+        pass
+
+class LocalCheckinSink(CheckinSink):
+    """In-process sink for tests and local runs; keeps every delivery in order"""
+
+    def __init__(self):
+        self.delivered: List[Tuple[int, ScheduledCheckin]] = []
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def deliver(self, user_id: int, checkin: ScheduledCheckin) -> None:
+        self.delivered.append((user_id, checkin))
+        self.queue.put_nowait((user_id, checkin))
+
+def to_utc(when: datetime) -> datetime:
+    # Stored naive in UTC, like every other timestamp in the database
+    if when.tzinfo is None:
+        return when
+    return when.astimezone(timezone.utc).replace(tzinfo=None)
+
+class CheckinDispatcher:
+    """Delivers due check-ins for every user from one timer wheel, with the database as the source of truth"""
+
+    def __init__(self, db: Database, sink: CheckinSink, tick_seconds: float = 60.0):
+        self.db = db
+        self.sink = sink
+        self.tick_seconds = tick_seconds
+        self.wheel = TimerWheel(tick_seconds, self.timestamp(self.now()))
+        # Ids currently on the wheel, so restoring never queues one twice
+        self.pending: Set[int] = set()
+
+    @staticmethod
+    def now() -> datetime:
+        return datetime.utcnow()
+
+    @staticmethod
+    def timestamp(when: datetime) -> float:
+        return when.replace(tzinfo=timezone.utc).timestamp()
+
+    def enqueue(self, due: float, checkin_id: int) -> None:
+        self.wheel.add(due, checkin_id)
+        self.pending.add(checkin_id)
+
+    def restore(self) -> int:
+        # Only ids and due times of pending rows; payloads are loaded when they fire
+        with self.db.get_session() as session:
+            rows = session.query(ScheduledCheckinRow.id, ScheduledCheckinRow.due_at).filter(
+                ScheduledCheckinRow.delivered_at.is_(None)
+            ).all()
+        restored = [(checkin_id, due_at) for checkin_id, due_at in rows if checkin_id not in self.pending]
+        for checkin_id, due_at in restored:
+            self.enqueue(self.timestamp(due_at), checkin_id)
+        return len(restored)
+
+    def schedule(self, user_id: int, checkins: List[ScheduledCheckin]) -> List[int]:
+        with self.db.get_session() as session:
+            rows = [
+                ScheduledCheckinRow(
+                    user_id=user_id,
+                    due_at=to_utc(checkin.datetime),
+                    checkin_type=checkin.checkin_type,
+                    metrics_required=checkin.metrics_required,
+                    questions=checkin.questions
+                )
+                for checkin in checkins
+            ]
+            session.add_all(rows)
+            session.commit()
+            scheduled = [(row.id, row.due_at) for row in rows]
+
+        for checkin_id, due_at in scheduled:
+            self.enqueue(self.timestamp(due_at), checkin_id)
+        return [checkin_id for checkin_id, _ in scheduled]
+
+    async def tick(self, now: Optional[datetime] = None) -> int:
+        now = to_utc(now or self.now())
+        due_ids = self.wheel.advance(self.timestamp(now))
+        self.pending.difference_update(due_ids)
+        if not due_ids:
+            return 0
+
+        try:
+            with self.db.get_session() as session:
+                rows = session.query(ScheduledCheckinRow).filter(
+                    ScheduledCheckinRow.id.in_(due_ids),
+                    ScheduledCheckinRow.delivered_at.is_(None)
+                ).order_by(ScheduledCheckinRow.due_at).all()
+                due: Dict[int, Tuple[int, ScheduledCheckin]] = {
+                    row.id: (
+                        row.user_id,
+                        ScheduledCheckin(
+                            datetime=row.due_at.replace(tzinfo=timezone.utc),
+                            checkin_type=row.checkin_type,
+                            metrics_required=row.metrics_required or [],
+                            questions=row.questions or []
+                        )
+                    )
+                    for row in rows
+                }
+        except BaseException:
+            # They left the wheel but nothing was sent; try them all again next tick
+            for checkin_id in due_ids:
+                self.enqueue(self.timestamp(now) + self.tick_seconds, checkin_id)
+            raise
+
+        delivered = []
+        try:
+            for checkin_id, (user_id, checkin) in due.items():
+                # One failing delivery mustn't hold back the others
+                try:
+                    await self.sink.deliver(user_id, checkin)
+                except Exception:
+                    logging.exception("Delivering check-in %s to user %s failed; retrying next tick", checkin_id, user_id)
+                    continue
+                delivered.append(checkin_id)
+        finally:
+            # Mark delivered in one statement so a restart doesn't send them again
+            if delivered:
+                with self.db.get_session() as session:
+                    session.query(ScheduledCheckinRow).filter(ScheduledCheckinRow.id.in_(delivered)).update(
+                        {ScheduledCheckinRow.delivered_at: now},
+                        synchronize_session=False
+                    )
+                    session.commit()
+            # Anything the sink didn't take is retried on the next tick
+            for checkin_id in due.keys() - set(delivered):
+                self.enqueue(self.timestamp(now) + self.tick_seconds, checkin_id)
+        return len(delivered)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self.restore()
+        while not stop.is_set():
+            try:
+                await self.tick()
+            except Exception:
+                # Failed check-ins are already back on the wheel; keep dispatching
+                logging.exception("Check-in dispatch tick failed")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
\ No newline at end of file
@@ -0,0 +1,218 @@
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+from pydantic import BaseModel
+import json
+import os
+import re
+import threading
+
+EXERCISES_JSON_PATH = os.path.join(os.path.dirname(__file__), "data", "exercises.json")
+
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+
+# Keywords in free-text limitations that map onto catalog contraindications
+CONTRAINDICATION_KEYWORDS = {
+    "knee": ["knee", "acl", "meniscus", "patella"],
+    "lower_back": ["back", "spine", "spinal", "disc", "sciatica"],
+    "shoulder": ["shoulder", "rotator"],
+    "wrist": ["wrist", "carpal"],
+    "elbow": ["elbow"],
+    "hip": ["hip"],
+    "ankle": ["ankle", "achilles"],
+    "neck": ["neck"],
+    "hypertension": ["blood pressure", "hypertension", "heart"]
+}
+
+# Training emphasis for each goal type from the goal analyzer
+GOAL_EMPHASIS = {
+    "weight_loss": "fat_loss",
+    "weight_gain": "hypertrophy",
+    "muscle_gain": "hypertrophy",
+    "endurance": "endurance",
+    "flexibility": "mobility",
+    "general_fitness": "strength"
+}
+
+# Exercise slots for each schedule focus: (movement pattern, muscle groups it should hit)
+FOCUS_SLOTS: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    "full_body": [("squat", ()), ("hinge", ()), ("horizontal_push", ()), ("horizontal_pull", ()), ("core", ())],
+    "upper_body": [
+        ("horizontal_push", ()), ("horizontal_pull", ()), ("vertical_push", ()), ("vertical_pull", ()),
+        ("isolation", ("biceps", "triceps"))
+    ],
+    "lower_body": [("squat", ()), ("hinge", ()), ("lunge", ()), ("isolation", ("hamstrings", "calves")), ("core", ())],
+    "push": [("horizontal_push", ()), ("vertical_push", ()), ("horizontal_push", ()), ("isolation", ("triceps",))],
+    "pull": [("vertical_pull", ()), ("horizontal_pull", ()), ("horizontal_pull", ()), ("isolation", ("biceps",))],
+    "legs": [("squat", ()), ("hinge", ()), ("lunge", ()), ("isolation", ("hamstrings", "calves"))],
+    "cardio": [("cardio", ()), ("cardio", ()), ("core", ())],
+    "core": [("core", ()), ("core", ()), ("carry", ())],
+    "mobility": [("mobility", ()), ("mobility", ()), ("mobility", ())],
+    "active_recovery": [("cardio", ()), ("mobility", ()), ("mobility", ())]
+}
+
+# (sets, reps, rest) for lifts by training emphasis; a mobility emphasis keeps them light
+PRESCRIPTIONS = {
+    "strength": ("4", "5", "120s"),
+    "hypertrophy": ("3", "10", "90s"),
+    "endurance": ("3", "15", "45s"),
+    "fat_loss": ("3", "12", "45s"),
+    "mobility": ("2", "12", "60s")
+}
+CARDIO_PRESCRIPTION = ("1", "20 min", "0s")
+MOBILITY_PRESCRIPTION = ("2", "30s hold", "30s")
+
+def normalize_term(text: str) -> str:
+    return "_".join(text.lower().replace("-", " ").split())
+
+def limitation_words(text: str) -> str:
+    # Lowercase words with plurals dropped, space-padded so keywords match whole words only
+    words = [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in re.findall(r"[a-z]+", text.lower())
+    ]
+    return f" {' '.join(words)} "
+
+def limitation_contraindications(limitations: Iterable[str]) -> Set[str]:
+    found = set()
+    for limitation in limitations:
+        text = limitation_words(limitation)
+        for contraindication, keywords in CONTRAINDICATION_KEYWORDS.items():
+            if any(limitation_words(keyword) in text for keyword in keywords):
+                found.add(contraindication)
+    return found
+
+class Exercise(BaseModel):
+    name: str
+    muscle_groups: List[str]
+    equipment: List[str]
+    movement_pattern: str
+    difficulty: str
+    contraindications: List[str] = []
+    compound: bool = False
+    goals: List[str] = []
+
+class ExerciseCatalog:
+    """Bundled exercises with an inverted index per facet, so selection is set intersection"""
+
+    def __init__(self, exercises: List[Exercise]):
+        self.exercises = exercises
+        self.by_muscle = self.build_index(lambda exercise: exercise.muscle_groups)
+        self.by_equipment = self.build_index(lambda exercise: exercise.equipment)
+        self.by_pattern = self.build_index(lambda exercise: [exercise.movement_pattern])
+        self.by_difficulty = self.build_index(lambda exercise: [exercise.difficulty])
+        self.by_contraindication = self.build_index(lambda exercise: exercise.contraindications)
+
+    @classmethod
+    def load(cls, path: str = EXERCISES_JSON_PATH) -> "ExerciseCatalog":
+        with open(path, encoding="utf-8") as f:
+            return cls([Exercise(**exercise) for exercise in json.load(f)])
+
+    def build_index(self, keys) -> Dict[str, FrozenSet[int]]:
+        index: Dict[str, Set[int]] = {}
+        for exercise_id, exercise in enumerate(self.exercises):
+            for key in keys(exercise):
+                index.setdefault(key, set()).add(exercise_id)
+        return {key: frozenset(ids) for key, ids in index.items()}
+
+    def union(self, index: Dict[str, FrozenSet[int]], keys: Iterable[str]) -> FrozenSet[int]:
+        return frozenset().union(*(index.get(key, frozenset()) for key in keys))
+
+    def allowed(
+        self,
+        experience: str,
+        limitations: Iterable[str] = (),
+        available_equipment: Optional[Iterable[str]] = None
+    ) -> FrozenSet[int]:
+        # Exercises at or below the user's level, minus anything their limitations rule out
+        level = DIFFICULTIES.index(experience) if experience in DIFFICULTIES else len(DIFFICULTIES) - 1
+        allowed = self.union(self.by_difficulty, DIFFICULTIES[:level + 1])
+        allowed -= self.union(self.by_contraindication, limitation_contraindications(limitations))
+
+        if available_equipment:
+            available = {normalize_term(item) for item in available_equipment} | {"bodyweight"}
+            allowed -= self.union(self.by_equipment, [item for item in self.by_equipment if item not in available])
+        return allowed
+
+    def query(
+        self,
+        allowed: FrozenSet[int],
+        movement_pattern: Optional[str] = None,
+        muscle_groups: Iterable[str] = ()
+    ) -> FrozenSet[int]:
+        candidates = allowed
+        if movement_pattern:
+            candidates = candidates & self.by_pattern.get(movement_pattern, frozenset())
+        muscle_groups = list(muscle_groups)
+        if muscle_groups:
+            candidates = candidates & self.union(self.by_muscle, muscle_groups)
+        return candidates
+
+    def score(self, exercise_id: int, emphasis: str, experience: str) -> float:
+        exercise = self.exercises[exercise_id]
+        score = 2.0 if emphasis in exercise.goals else 0.0
+        if exercise.compound and emphasis in ("strength", "hypertrophy", "fat_loss"):
+            score += 1.0
+        if exercise.difficulty == experience:
+            score += 0.5
+        return score
+
+    def select_week(
+        self,
+        schedule: Mapping[str, Mapping[str, str]],
+        goal_type: str,
+        experience: str,
+        limitations: Iterable[str] = (),
+        available_equipment: Optional[Iterable[str]] = None,
+        repeat_penalty: float = 1.5
+    ) -> List[Dict[str, str]]:
+        emphasis = GOAL_EMPHASIS.get(goal_type, "strength")
+        allowed = self.allowed(experience, limitations, available_equipment)
+        usage: Dict[int, int] = {}
+
+        selected = []
+        for day, session in schedule.items():
+            focus = normalize_term(session.get("focus", "rest"))
+            used_today: Set[int] = set()
+            for movement_pattern, muscle_groups in FOCUS_SLOTS.get(focus, []):
+                candidates = self.query(allowed, movement_pattern, muscle_groups) - used_today
+                if not candidates:
+                    continue
+                # Rank locally; spread the week across the catalog with a repeat penalty
+                best = max(
+                    sorted(candidates),
+                    key=lambda exercise_id: self.score(exercise_id, emphasis, experience)
+                    - repeat_penalty * usage.get(exercise_id, 0)
+                )
+                used_today.add(best)
+                usage[best] = usage.get(best, 0) + 1
+                selected.append(self.prescribe(best, day, focus, emphasis))
+        return selected
+
+    def prescribe(self, exercise_id: int, day: str, focus: str, emphasis: str) -> Dict[str, str]:
+        exercise = self.exercises[exercise_id]
+        if exercise.movement_pattern == "cardio":
+            sets, reps, rest = CARDIO_PRESCRIPTION
+        elif exercise.movement_pattern == "mobility":
+            sets, reps, rest = MOBILITY_PRESCRIPTION
+        else:
+            sets, reps, rest = PRESCRIPTIONS[emphasis]
+        return {
+            "name": exercise.name,
+            "day": day,
+            "focus": focus,
+            "movement_pattern": exercise.movement_pattern,
+            "muscle_groups": ", ".join(exercise.muscle_groups),
+            "equipment": ", ".join(exercise.equipment),
+            "sets": sets,
+            "reps": reps,
+            "rest": rest
+        }
+
+_exercise_catalog: Optional[ExerciseCatalog] = None
+_exercise_catalog_lock = threading.Lock()
+
+def get_exercise_catalog() -> ExerciseCatalog:
+    global _exercise_catalog
+    with _exercise_catalog_lock:
+        if _exercise_catalog is None:
+            _exercise_catalog = ExerciseCatalog.load()
+        return _exercise_catalog
\ No newline at end of file
@@ -0,0 +1,338 @@
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import numpy as np
+
+FOODS_CSV_PATH = os.path.join(os.path.dirname(__file__), "data", "foods.csv")
+
+# Per-100g nutrients stored for every food; macros in grams, micros in milligrams
+NUTRIENTS = [
+    "calories", "protein", "carbs", "fat", "fiber", "sugar",
+    "sodium", "calcium", "iron", "potassium", "vitamin_c"
+]
+
+# Position of each nutrient in every nutrient array
+NUTRIENT_INDEX = {nutrient: position for position, nutrient in enumerate(NUTRIENTS)}
+
+GRAMS_PER_UNIT = {
+    "mg": 0.001, "g": 1.0, "kg": 1000.0,
+    "oz": 28.3495, "lb": 453.592
+}
+
+# Volume units in fractions of a cup; converted to grams with each food's cup weight
+CUPS_PER_UNIT = {"ml": 1 / 240, "l": 1000 / 240, "tsp": 1 / 48, "tbsp": 1 / 16, "cup": 1.0}
+
+UNIT_ALIASES = {
+    "mg": "mg", "milligram": "mg", "milligrams": "mg",
+    "g": "g", "gr": "g", "gram": "g", "grams": "g",
+    "kg": "kg", "kilogram": "kg", "kilograms": "kg",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "tsp": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "tbsp": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "cup": "cup", "cups": "cup",
+    "piece": "piece", "pieces": "piece", "slice": "slice", "slices": "slice",
+    "clove": "clove", "cloves": "clove", "scoop": "scoop", "scoops": "scoop",
+    "fillet": "fillet", "fillets": "fillet"
+}
+
+UNICODE_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+
+# Words that describe preparation rather than identify the food
+DESCRIPTORS = {
+    "fresh", "frozen", "raw", "cooked", "boiled", "steamed", "grilled", "baked", "roasted",
+    "chopped", "diced", "sliced", "minced", "shredded", "grated", "mashed", "large", "medium",
+    "small", "ripe", "organic", "plain", "low-fat", "skinless", "boneless", "lean", "of",
+    "a", "pinch", "dash", "drizzle", "sprinkle"
+}
+
+# Seasoning amounts too small to count towards nutrition
+NEGLIGIBLE_RE = re.compile(r"\b(?:to taste|pinch|dash|sprinkle)\b", re.IGNORECASE)
+
+INGREDIENT_RE = re.compile(
+    r"^\s*(?P<quantity>\d+\s+\d+/\d+|\d+\s*[½¼¾⅓⅔]|\d+/\d+|\d+(?:\.\d+)?|[½¼¾⅓⅔])?"
+    r"\s*(?P<unit>(?:" + "|".join(sorted(UNIT_ALIASES, key=len, reverse=True)) + r")\b\.?)?"
+    r"\s*(?P<name>.*?)\s*$",
+    re.IGNORECASE
+)
+
+@dataclass(frozen=True)
+class ParsedIngredient:
+    quantity: Optional[float]
+    unit: Optional[str]
+    name: str
+
+@dataclass(frozen=True)
+class FoodRecord:
+    name: str
+    per_100g: Dict[str, float]
+    grams_per_piece: Optional[float] = None
+    grams_per_cup: Optional[float] = None
+    category: Optional[str] = None
+
+def parse_quantity(token: str) -> float:
+    if token in UNICODE_FRACTIONS:
+        return UNICODE_FRACTIONS[token]
+    if token[-1] in UNICODE_FRACTIONS:
+        return float(token[:-1].strip()) + UNICODE_FRACTIONS[token[-1]]
+    if " " in token:
+        whole, fraction = token.split()
+        return float(whole) + parse_quantity(fraction)
+    if "/" in token:
+        numerator, denominator = token.split("/")
+        return float(numerator) / float(denominator)
+    return float(token)
+
+def normalize_food_name(name: str) -> str:
+    # Drop parentheticals and trailing notes such as ", chopped" or "to taste"
+    name = re.sub(r"\(.*?\)", " ", name.lower()).split(",")[0]
+    name = re.sub(r"\b(?:to taste|for garnish|for serving|optional)\b", " ", name)
+    words = [word for word in re.findall(r"[a-z0-9%'-]+", name) if word not in DESCRIPTORS]
+    return " ".join(words)
+
+def parse_ingredient(text: str) -> ParsedIngredient:
+    match = INGREDIENT_RE.match(text)
+    unit = match.group("unit")
+    quantity = None
+    if match.group("quantity"):
+        quantity = parse_quantity(match.group("quantity").strip())
+    elif NEGLIGIBLE_RE.search(text):
+        quantity = 0.0
+    return ParsedIngredient(
+        quantity=quantity,
+        unit=UNIT_ALIASES[unit.rstrip(".").lower()] if unit else None,
+        name=normalize_food_name(match.group("name"))
+    )
+
+def scale_amount(text: str, factor: float) -> str:
+    # Multiplies the leading quantity of an ingredient or portion ("60g rolled oats" -> "66g rolled oats")
+    match = INGREDIENT_RE.match(text)
+    quantity = match.group("quantity") if match else None
+    if not quantity or factor == 1:
+        return text
+    scaled = parse_quantity(quantity.strip()) * factor
+    scaled = round(scaled) if scaled >= 10 else round(scaled, 1)
+    return f"{text[:match.start('quantity')]}{scaled:g}{text[match.end('quantity'):]}"
+
+def nutrient_array(nutrition: Dict[str, float]) -> np.ndarray:
+    # Nutrients outside the shared table are not tracked in arrays
+    values = np.zeros(len(NUTRIENTS), dtype=np.float64)
+    for nutrient, value in nutrition.items():
+        position = NUTRIENT_INDEX.get(nutrient)
+        if position is not None:
+            values[position] = value
+    return values
+
+def nutrient_dict(values: np.ndarray) -> Dict[str, float]:
+    return dict(zip(NUTRIENTS, values.tolist()))
+
+class NutrientView(Mapping[str, float]):
+    """Read-only dict view of a nutrient array, plus any nutrients outside NUTRIENTS as given"""
+
+    __slots__ = ("values", "extra")
+
+    def __init__(self, nutrition: Mapping[str, float]):
+        values = nutrient_array(nutrition)
+        values.flags.writeable = False
+        self.values = values
+        self.extra = {nutrient: float(value) for nutrient, value in nutrition.items() if nutrient not in NUTRIENT_INDEX}
+
+    def __getitem__(self, nutrient: str) -> float:
+        position = NUTRIENT_INDEX.get(nutrient)
+        if position is None:
+            return self.extra[nutrient]
+        return float(self.values[position])
+
+    def __iter__(self) -> Iterator[str]:
+        yield from NUTRIENTS
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(NUTRIENTS) + len(self.extra)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    # Immutable, so copies can share it
+    def __copy__(self) -> "NutrientView":
+        return self
+
+    def __deepcopy__(self, memo) -> "NutrientView":
+        return self
+
+def singularize(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("oes") or word.endswith("ches") or word.endswith("shes"):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+class FoodDatabase:
+    """Read-only per-100g nutrient database, built once from the bundled CSV into SQLite"""
+
+    def __init__(self, csv_path: str = FOODS_CSV_PATH, db_path: Optional[str] = None):
+        self.csv_path = csv_path
+        self.db_path = db_path or os.getenv("FOOD_DB_PATH") or self.default_db_path(csv_path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Bound per instance so each database keeps its own lookup cache
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+
+    @staticmethod
+    def default_db_path(csv_path: str) -> str:
+        # Keyed on CSV content, so editing the data rebuilds the database
+        with open(csv_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        return os.path.join(tempfile.gettempdir(), f"health_wellness_foods_{digest}.sqlite")
+
+    @staticmethod
+    def build(csv_path: str, db_path: str) -> None:
+        # Build into a temporary file and rename, so concurrent processes never see a partial file
+        tmp_path = f"{db_path}.{os.getpid()}.tmp"
+        connection = sqlite3.connect(tmp_path)
+        try:
+            nutrient_columns = ", ".join(f"{nutrient} REAL NOT NULL" for nutrient in NUTRIENTS)
+            connection.execute(
+                f"CREATE TABLE foods (id INTEGER PRIMARY KEY, name TEXT NOT NULL, {nutrient_columns}, "
+                "grams_per_piece REAL, grams_per_cup REAL, category TEXT)"
+            )
+            connection.execute("CREATE TABLE food_names (name TEXT PRIMARY KEY, food_id INTEGER NOT NULL) WITHOUT ROWID")
+
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                for food_id, row in enumerate(csv.DictReader(f), start=1):
+                    connection.execute(
+                        f"INSERT INTO foods VALUES ({', '.join('?' * (len(NUTRIENTS) + 5))})",
+                        [food_id, row["name"]]
+                        + [float(row[nutrient]) for nutrient in NUTRIENTS]
+                        + [float(row["grams_per_piece"]) if row["grams_per_piece"] else None,
+                           float(row["grams_per_cup"]) if row["grams_per_cup"] else None,
+                           row["category"] or None]
+                    )
+                    names = [row["name"]] + [alias for alias in row["aliases"].split("|") if alias]
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO food_names VALUES (?, ?)",
+                        [(normalize_food_name(name), food_id) for name in names]
+                    )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, db_path)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Open lazily; SQLite maps the file, so processes on one host share its pages
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    if not os.path.exists(self.db_path):
+                        self.build(self.csv_path, self.db_path)
+                    connection = sqlite3.connect(
+                        f"file:{self.db_path}?mode=ro&immutable=1",
+                        uri=True,
+                        check_same_thread=False
+                    )
+                    connection.execute("PRAGMA mmap_size = 67108864")
+                    self._connection = connection
+        return self._connection
+
+    def _query(self, name: str) -> Optional[FoodRecord]:
+        connection = self.connection
+        with self._lock:
+            row = connection.execute(
+                f"SELECT foods.name, {', '.join(NUTRIENTS)}, grams_per_piece, grams_per_cup, category "
+                "FROM food_names JOIN foods ON foods.id = food_names.food_id WHERE food_names.name = ?",
+                (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return FoodRecord(
+            name=row[0],
+            per_100g=dict(zip(NUTRIENTS, row[1:1 + len(NUTRIENTS)])),
+            grams_per_piece=row[-3],
+            grams_per_cup=row[-2],
+            category=row[-1]
+        )
+
+    def _lookup(self, name: str) -> Optional[FoodRecord]:
+        # Only the whole phrase, as written or singular; a trailing word alone ("coconut milk" -> "milk")
+        # names a different food, and an unresolved ingredient keeps the model's estimate
+        words = normalize_food_name(name).split()
+        if not words:
+            return None
+        for candidate in dict.fromkeys((" ".join(words), " ".join(words[:-1] + [singularize(words[-1])]))):
+            record = self._query(candidate)
+            if record is not None:
+                return record
+        return None
+
+    def search(self, term: str) -> List[str]:
+        # Foods with a word in their name or an alias starting with term ("almond" -> almonds, almond milk)
+        term = normalize_food_name(term)
+        if not term:
+            return []
+        connection = self.connection
+        with self._lock:
+            rows = connection.execute(
+                "SELECT DISTINCT foods.name FROM food_names JOIN foods ON foods.id = food_names.food_id "
+                "WHERE instr(' ' || food_names.name, ?) > 0",
+                (f" {term}",)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def ingredient_grams(self, ingredient: ParsedIngredient, food: FoodRecord) -> Optional[float]:
+        quantity = ingredient.quantity if ingredient.quantity is not None else 1.0
+        if quantity == 0:
+            return 0.0
+        if ingredient.unit in GRAMS_PER_UNIT:
+            return quantity * GRAMS_PER_UNIT[ingredient.unit]
+        if ingredient.unit in CUPS_PER_UNIT:
+            # Assume water density when the food has no cup weight
+            return quantity * CUPS_PER_UNIT[ingredient.unit] * (food.grams_per_cup or 240.0)
+        if food.grams_per_piece is not None:
+            return quantity * food.grams_per_piece
+        return None
+
+    def ingredient_nutrition(self, ingredient: str) -> Optional[Dict[str, float]]:
+        parsed = parse_ingredient(ingredient)
+        food = self.lookup(parsed.name)
+        if food is None:
+            return None
+        grams = self.ingredient_grams(parsed, food)
+        if grams is None:
+            return None
+        return {nutrient: value * grams / 100 for nutrient, value in food.per_100g.items()}
+
+    def meal_nutrition(self, ingredients: Iterable[str]) -> Optional[Dict[str, float]]:
+        # All-or-nothing: a partial total would silently under-count the meal
+        totals = dict.fromkeys(NUTRIENTS, 0.0)
+        for ingredient in ingredients:
+            nutrition = self.ingredient_nutrition(ingredient)
+            if nutrition is None:
+                return None
+            for nutrient, value in nutrition.items():
+                totals[nutrient] += value
+        return {nutrient: round(value, 1) for nutrient, value in totals.items()}
+
+    def unresolved_ingredients(self, ingredients: Iterable[str]) -> List[str]:
+        return [ingredient for ingredient in ingredients if self.ingredient_nutrition(ingredient) is None]
+
+_food_database: Optional[FoodDatabase] = None
+_food_database_lock = threading.Lock()
+
+def get_food_database() -> FoodDatabase:
+    global _food_database
+    with _food_database_lock:
+        if _food_database is None:
+            _food_database = FoodDatabase()
+        return _food_database
\ No newline at end of file
@@ -0,0 +1,228 @@
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import and_, func, select
+from ..database.db import Database
+from ..database.models import Goal, ProgressLog
+
+# Goal types with a tracked metric, and whether target_value is a drop or a gain in it
+GOAL_FORECAST_METRIC = {"weight_loss": "weight", "weight_gain": "weight", "muscle_gain": "weight"}
+GOAL_DIRECTION = {"weight_loss": -1.0, "weight_gain": 1.0, "muscle_gain": 1.0}
+
+# Huber threshold in robust standard deviations, and reweighting passes
+HUBER_K = 1.345
+IRLS_ITERATIONS = 4
+# Two-sided 80% band on the completion date
+BAND_Z = 1.2816
+# Only recent check-ins describe the current rate
+FIT_WINDOW_DAYS = 182
+# Projections further out than this count as not on track
+MAX_HORIZON_DAYS = 3650.0
+
+DAY = np.timedelta64(1, "D")
+
+def pack_series(groups: np.ndarray, dates: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Long (group, date, value) rows to one NaN-padded row per group, in a few array operations
+    keep = ~np.isnan(values)
+    groups, dates, values = groups[keep], dates[keep].astype("datetime64[us]"), values[keep]
+    order = np.lexsort((dates, groups))
+    groups, dates, values = groups[order], dates[order], values[order]
+
+    ids, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+    rows = np.repeat(np.arange(len(ids)), counts)
+    columns = np.arange(len(groups)) - np.repeat(starts, counts)
+    origins = dates[starts]
+
+    width = int(counts.max(initial=1))
+    times = np.full((len(ids), width), np.nan)
+    padded = np.full((len(ids), width), np.nan)
+    times[rows, columns] = (dates - origins[rows]) / DAY
+    padded[rows, columns] = values
+    return ids, times, padded, origins
+
+def row_median(values: np.ndarray, count: np.ndarray) -> np.ndarray:
+    # Median of each row's first count values after sorting NaN to the end; faster than nanmedian
+    ordered = np.sort(np.where(np.isnan(values), np.inf, values), axis=1)
+    rows = np.arange(len(values))
+    return (ordered[rows, (count - 1) // 2] + ordered[rows, count // 2]) / 2
+
+class ForecastBatch:
+    """Goal progress and projected completion for many goals, one array entry per goal"""
+
+    def __init__(self, ids: np.ndarray, columns: Dict[str, np.ndarray], dates: Dict[str, np.ndarray]):
+        self.ids = ids
+        self.columns = columns
+        self.dates = dates
+        self.rows = {goal_id: row for row, goal_id in enumerate(ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.rows)
+
+    def row(self, goal_id) -> Dict[str, float]:
+        row = self.rows[goal_id]
+        return {name: float(column[row]) for name, column in self.columns.items()}
+
+    def completion_dates(self, goal_id) -> Dict[str, Optional[datetime]]:
+        row = self.rows[goal_id]
+        return {
+            name: None if np.isnat(column[row]) else column[row].astype(datetime)
+            for name, column in self.dates.items()
+        }
+
+class GoalForecaster:
+    """Huber-weighted linear trend per goal, fitted for every goal at once with masked array sums"""
+
+    def fit(self, times: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+        mask = ~np.isnan(values)
+        t = np.where(mask, times, 0.0)
+        y = np.where(mask, values, 0.0)
+        weights = mask.astype(np.float64)
+        count = mask.sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for iteration in range(IRLS_ITERATIONS + 1):
+                total = weights.sum(axis=1)
+                t_mean = (weights * t).sum(axis=1) / total
+                y_mean = (weights * y).sum(axis=1) / total
+                dt = np.where(mask, t - t_mean[:, None], 0.0)
+                sxx = (weights * dt * dt).sum(axis=1)
+                slope = np.where(sxx > 0, (weights * dt * (y - y_mean[:, None])).sum(axis=1) / sxx, 0.0)
+                intercept = y_mean - slope * t_mean
+                residuals = np.where(mask, y - intercept[:, None] - slope[:, None] * t, np.nan)
+                if iteration == IRLS_ITERATIONS:
+                    break
+                # Downweight check-ins far from the line (scale from the median absolute residual)
+                scale = np.maximum(1.4826 * row_median(np.abs(residuals), count), 1e-9)
+                weights = np.where(mask, np.minimum(1.0, HUBER_K * scale[:, None] / np.abs(residuals)), 0.0)
+
+            variance = np.nansum(weights * residuals ** 2, axis=1) / np.maximum(total - 2, 1)
+            slope_se = np.where((count > 2) & (sxx > 0), np.sqrt(variance / sxx), np.inf)
+
+        last = count - 1
+        rows = np.arange(len(values))
+        return {
+            "slope": slope,
+            "intercept": intercept,
+            "slope_se": slope_se,
+            "first": values[:, 0],
+            "latest": values[rows, last],
+            "latest_t": times[rows, last]
+        }
+
+    def project(self, fit: Dict[str, np.ndarray], targets: np.ndarray) -> Dict[str, np.ndarray]:
+        slope, slope_se = fit["slope"], fit["slope_se"]
+        level = fit["intercept"] + slope * fit["latest_t"]
+        direction = np.sign(targets - fit["first"])
+        remaining = targets - level
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            overall = np.where(targets != fit["first"], (fit["latest"] - fit["first"]) / (targets - fit["first"]), 1.0)
+            # Days from the latest check-in at the fitted rate, and at the band's faster and slower rates
+            toward = slope * direction
+            band = BAND_Z * slope_se
+            days = np.abs(remaining) / toward
+            fastest = np.abs(remaining) / (toward + band)
+            slowest = np.abs(remaining) / (toward - band)
+
+        reached = remaining * direction <= 0
+        days, fastest, slowest = (
+            np.where(reached, 0.0, np.where((estimate > 0) & (estimate <= MAX_HORIZON_DAYS), estimate, np.nan))
+            for estimate in (days, fastest, slowest)
+        )
+        return {
+            "overall_progress": np.clip(overall, 0.0, None),
+            "weekly_progress": slope * 7,
+            "projected_completion": days,
+            "projected_completion_lower": fastest,
+            "projected_completion_upper": slowest
+        }
+
+    def forecast(
+        self,
+        groups: np.ndarray,
+        dates: np.ndarray,
+        values: np.ndarray,
+        targets: Mapping,
+        baselines: Optional[Mapping] = None
+    ) -> ForecastBatch:
+        # Targets are levels of the metric (e.g. 72 kg), keyed like groups; baselines are where each
+        # goal started, when that is earlier than the series (defaults to each series' first value)
+        ids, times, padded, origins = pack_series(groups, dates, values)
+        fit = self.fit(times, padded)
+        if baselines is not None:
+            fit["first"] = np.array([baselines[goal_id] for goal_id in ids.tolist()], dtype=np.float64)
+        columns = self.project(fit, np.array([targets[goal_id] for goal_id in ids.tolist()], dtype=np.float64))
+
+        latest = origins + np.round(fit["latest_t"] * 86400).astype("timedelta64[s]")
+        dates = {}
+        for name in ("projected_completion", "projected_completion_lower", "projected_completion_upper"):
+            days = columns[name]
+            offset = np.round(np.nan_to_num(days) * 86400).astype("timedelta64[s]")
+            dates[name] = np.where(np.isnan(days), np.datetime64("NaT"), latest + offset)
+        return ForecastBatch(ids, columns, dates)
+
+    def forecast_active_goals(self, db: Database, now: Optional[datetime] = None) -> ForecastBatch:
+        # Nightly pass: every active goal with a tracked metric, from one query per table
+        # plus one for each goal's starting weight
+        since = (now or datetime.utcnow()) - timedelta(days=FIT_WINDOW_DAYS)
+        active = and_(Goal.status == "active", Goal.goal_type.in_(list(GOAL_FORECAST_METRIC)))
+        with db.get_session() as session:
+            goals = session.execute(
+                select(Goal.id, Goal.user_id, Goal.goal_type, Goal.target_value, Goal.start_date).where(active)
+            ).all()
+
+            # The first check-in on or after the goal's start, however long ago; only the fit is windowed
+            goal_start = func.coalesce(Goal.start_date, since)
+            first_logged = (
+                select(Goal.id.label("goal_id"), Goal.user_id.label("user_id"), func.min(ProgressLog.log_date).label("log_date"))
+                .join(ProgressLog, ProgressLog.user_id == Goal.user_id)
+                .where(active, ProgressLog.log_date >= goal_start, ProgressLog.weight.is_not(None))
+                .group_by(Goal.id, Goal.user_id)
+                .subquery()
+            )
+            baselines = dict(session.execute(
+                select(first_logged.c.goal_id, ProgressLog.weight).join(
+                    ProgressLog,
+                    and_(
+                        ProgressLog.user_id == first_logged.c.user_id,
+                        ProgressLog.log_date == first_logged.c.log_date,
+                        ProgressLog.weight.is_not(None)
+                    )
+                )
+            ).all())
+
+            logs = session.execute(
+                select(ProgressLog.user_id, ProgressLog.log_date, ProgressLog.weight).where(
+                    ProgressLog.log_date >= since,
+                    ProgressLog.weight.is_not(None)
+                )
+            ).all()
+        if not goals or not logs:
+            return ForecastBatch(np.array([], dtype=np.int64), {}, {})
+
+        user_ids, log_dates, weights = (np.array(column) for column in zip(*logs))
+        log_dates = log_dates.astype("datetime64[us]")
+        goal_ids, goal_users, goal_types, target_values, start_dates = zip(*goals)
+
+        # Each goal takes its user's check-ins since the goal started, gathered without a per-goal loop
+        order = np.lexsort((log_dates, user_ids))
+        user_ids, log_dates, weights = user_ids[order], log_dates[order], weights[order].astype(np.float64)
+        goal_users = np.array(goal_users)
+        first = np.searchsorted(user_ids, goal_users, side="left")
+        counts = np.searchsorted(user_ids, goal_users, side="right") - first
+        take = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        groups = np.repeat(np.array(goal_ids), counts)
+        starts = np.array([start or since for start in start_dates], dtype="datetime64[us]")
+        current = log_dates[take] >= np.repeat(starts, counts)
+        take, groups = take[current], groups[current]
+
+        # target_value is the change from the goal's first check-in, in the goal's direction
+        targets = {
+            goal_id: baselines[goal_id] + GOAL_DIRECTION[goal_type] * target_value
+            for goal_id, goal_type, target_value in zip(goal_ids, goal_types, target_values)
+            if goal_id in baselines
+        }
+        return self.forecast(groups, log_dates[take], weights[take], targets, baselines)
\ No newline at end of file
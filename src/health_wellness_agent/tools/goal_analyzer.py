@@ -1,29 +1,286 @@
-# Remove openai import
-from typing import Dict, Optional
-from pydantic import BaseModel
-from ..config import GEMINI_API_KEY
-import google.generativeai as genai
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import date
+import math
+import re
+from pydantic import BaseModel, ValidationError, field_validator
+from openai.agents import Tool
+from ..utils.llm_client import get_model
+
+GOAL_TYPES = ["weight_loss", "weight_gain", "muscle_gain", "endurance", "flexibility", "general_fitness"]
+
+GOAL_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "goal_type": {"type": "string", "enum": GOAL_TYPES},
+        "target_value": {"type": "number"},
+        "timeframe_weeks": {"type": "integer"},
+        "constraints": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["goal_type", "target_value", "timeframe_weeks", "constraints"]
+}
+
+class GoalExtraction(BaseModel):
+    goal_type: str
+    target_value: float
+    timeframe_weeks: int
+    constraints: List[str] = []
+
+    @field_validator('goal_type')
+    @classmethod
+    def validate_goal_type(cls, v: str) -> str:
+        if v not in GOAL_TYPES:
+            raise ValueError(f"Unknown goal type: {v}")
+        return v
+
+    @field_validator('timeframe_weeks')
+    @classmethod
+    def validate_timeframe(cls, v: int) -> int:
+        if v <= 0:
+            raise ValueError("Timeframe must be at least one week")
+        return v
+
+# The planning tools take the analyzer's structured goal as their input
+GoalOutput = GoalExtraction
+
+KG_PER_UNIT = {"kg": 1.0, "lb": 0.45359237, "st": 6.35029318}
+
+WEEKS_PER_UNIT = {"day": 1 / 7, "week": 1.0, "month": 52 / 12, "year": 52.0}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12
+}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+_NUMBER = r"\b(\d+(?:\.\d+)?|" + "|".join(NUMBER_WORDS) + r")"
+
+# An ordinal ("march 1st") is never a quantity, so a unit can't start with an ordinal suffix
+QUANTITY_RE = re.compile(
+    _NUMBER + r"(?!(?:st|nd|rd|th)\b)\s*(kgs?|kilo(?:gram)?s?|lbs?|pounds?|st|stones?)\b"
+)
+DURATION_RE = re.compile(_NUMBER + r"[\s-]*(days?|weeks?|wks?|months?|years?)\b")
+# "twice a week", "30 minutes a day", "3 days a week" describe how often, not how long
+FREQUENCY_BEFORE_RE = re.compile(
+    r"\b(?:once|twice|thrice|times|x|minutes?|mins?|hours?|hrs?|days?|sessions?|steps|km|miles?|reps)\s*$"
+)
+FREQUENCY_AFTER_RE = re.compile(r"\s*(?:a|an|per|each|every)\s+(?:day|week|month)\b")
+ISO_DATE_RE = re.compile(r"\bby\s+(\d{4})-(\d{2})-(\d{2})\b")
+MONTH_DATE_RE = re.compile(
+    r"\b(?:by|before|until)\s+(?:the\s+end\s+of\s+)?"
+    r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+    r"(?:\s+(\d{1,2})(?:st|nd|rd|th)?)?(?:,?\s+(\d{4}))?\b"
+)
+CONSTRAINT_RE = re.compile(
+    r"\b(?:without|avoid(?:ing)?|no)\s+([a-z][a-z ]*?)(?=[,.;!]|\s+(?:and|but|in|by|within)\b|$)"
+    r"|\b((?:bad|injured|sore|weak)\s+(?:knees?|back|shoulders?|ankles?|hips?|wrists?))\b"
+    r"|\b(vegetarian|vegan|pescatarian|gluten[- ]free|dairy[- ]free|keto|halal|kosher)\b"
+)
+
+# Checked in order; the first pattern that matches wins
+GOAL_TYPE_PATTERNS = [
+    ("muscle_gain", re.compile(r"\b(?:gain|build|add|put on|increase)\b.*\b(?:muscle|lean mass|strength)\b|\bbulk(?:ing)?\b")),
+    ("weight_loss", re.compile(r"\b(?:lose|drop|shed|cut|burn|reduce|lost)\b|\bslim(?:ming)? down\b|\bweight loss\b|\bfat loss\b")),
+    ("weight_gain", re.compile(r"\b(?:gain|put on|increase)\b.*\b(?:weight|kg|kgs|lbs?|pounds?|stones?)\b|\bweight gain\b")),
+    ("endurance", re.compile(r"\b(?:run|running|marathon|\d+k|cardio|endurance|stamina|cycl(?:e|ing)|swim(?:ming)?)\b")),
+    ("flexibility", re.compile(r"\b(?:flexib\w*|stretch\w*|mobility|yoga|splits)\b")),
+    ("general_fitness", re.compile(r"\b(?:fit|fitter|fitness|healthier|healthy|in shape|tone|toned)\b"))
+]
+
+class GoalParse(BaseModel):
+    goal_type: Optional[str] = None
+    target_value: Optional[float] = None
+    timeframe_weeks: Optional[int] = None
+    constraints: List[str] = []
+    confidence: float = 0.0
+
+    def to_extraction(self) -> GoalExtraction:
+        return GoalExtraction(
+            goal_type=self.goal_type,
+            target_value=self.target_value,
+            timeframe_weeks=self.timeframe_weeks,
+            constraints=self.constraints
+        )
+
+class RuleBasedGoalParser:
+    # Weights of each field in the confidence score; they sum to 1.0
+    GOAL_TYPE_WEIGHT = 0.4
+    TARGET_WEIGHT = 0.3
+    TIMEFRAME_WEIGHT = 0.3
+    AMBIGUITY_PENALTY = 0.2
+
+    def parse(self, text: str, today: Optional[date] = None) -> GoalParse:
+        text = " ".join(text.lower().split())
+        today = today or date.today()
+        confidence = 0.0
+
+        goal_types = [name for name, pattern in GOAL_TYPE_PATTERNS if pattern.search(text)]
+        goal_type = goal_types[0] if goal_types else None
+        if goal_type:
+            confidence += self.GOAL_TYPE_WEIGHT
+            # "lose fat and build muscle" style goals need the model to decide
+            if {"weight_loss", "muscle_gain"} <= set(goal_types) or {"weight_loss", "weight_gain"} <= set(goal_types):
+                confidence -= self.AMBIGUITY_PENALTY
+
+        quantities = {self.to_kg(value, unit) for value, unit in QUANTITY_RE.findall(text)}
+        ambiguous_target = len(quantities) > 1
+        target_value = quantities.pop() if len(quantities) == 1 else None
+        if target_value is not None:
+            confidence += self.TARGET_WEIGHT
+
+        timeframe_weeks, ambiguous_timeframe = self.parse_timeframe(text, today)
+        if timeframe_weeks is not None:
+            confidence += self.TIMEFRAME_WEIGHT
+
+        # Competing readings go to the model rather than being guessed
+        if ambiguous_target or ambiguous_timeframe:
+            confidence -= self.AMBIGUITY_PENALTY
+
+        constraints = [next(group for group in match if group).strip() for match in CONSTRAINT_RE.findall(text)]
+
+        return GoalParse(
+            goal_type=goal_type,
+            target_value=target_value,
+            timeframe_weeks=timeframe_weeks,
+            constraints=constraints,
+            confidence=round(max(confidence, 0.0), 2)
+        )
+
+    @staticmethod
+    def to_number(token: str) -> float:
+        return float(NUMBER_WORDS.get(token, token))
+
+    def to_kg(self, value: str, unit: str) -> float:
+        unit_key = "kg" if unit.startswith("k") else "lb" if unit.startswith(("lb", "p")) else "st"
+        return round(self.to_number(value) * KG_PER_UNIT[unit_key], 2)
+
+    def durations(self, text: str) -> List[Tuple[str, str]]:
+        durations = []
+        for match in DURATION_RE.finditer(text):
+            if FREQUENCY_AFTER_RE.match(text, match.end()):
+                continue
+            if match.group(1) in ("a", "an") and FREQUENCY_BEFORE_RE.search(text, 0, match.start()):
+                continue
+            durations.append(match.groups())
+        return durations
+
+    def parse_timeframe(self, text: str, today: date) -> Tuple[Optional[int], bool]:
+        # Returns the timeframe and whether the text offered more than one reading of it
+        durations = self.durations(text)
+        deadline_match = ISO_DATE_RE.search(text) or MONTH_DATE_RE.search(text)
+        if len(durations) == 1:
+            value, unit = durations[0]
+            unit_key = "week" if unit.startswith("wk") else unit.rstrip("s")
+            weeks = max(1, math.ceil(self.to_number(value) * WEEKS_PER_UNIT[unit_key]))
+            return weeks, deadline_match is not None
+        if durations:
+            return None, True
+
+        if match := ISO_DATE_RE.search(text):
+            try:
+                deadline = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            except ValueError:
+                return None, False
+            return self.weeks_until(today, deadline), False
+
+        if match := MONTH_DATE_RE.search(text):
+            month = MONTHS[match.group(1)]
+            day = int(match.group(2) or 1)
+            year = int(match.group(3) or today.year)
+            try:
+                deadline = date(year, month, day)
+                # A bare month name means its next occurrence
+                if match.group(3) is None and deadline <= today:
+                    deadline = date(year + 1, month, day)
+            except ValueError:
+                return None, False
+            return self.weeks_until(today, deadline), False
+
+        return None, False
+
+    @staticmethod
+    def weeks_until(today: date, deadline: date) -> Optional[int]:
+        days = (deadline - today).days
+        if days <= 0:
+            return None
+        return max(1, math.ceil(days / 7))
 
 class GoalAnalyzerTool(Tool):
+    parse_cache_size: int = 1024
+    use_fast_path: bool = True
+    fast_path_threshold: float = 0.9
+
+    # Shared by every instance, since tools are rebuilt for each message
+    _parse_cache: "OrderedDict[Tuple[str, date], GoalExtraction]" = OrderedDict()
+    fast_path_hits: int = 0
+    fast_path_misses: int = 0
+
     def __init__(self):
         super().__init__()
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = get_model('gemini-pro')
+        self.rule_parser = RuleBasedGoalParser()
+
+    @staticmethod
+    def normalize_goal_text(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    async def extract_goal(self, text: str) -> GoalExtraction:
+        # Identical goals (after normalization) never hit the model twice on the same day;
+        # "by March" or "next month" mean a different timeframe tomorrow
+        today = date.today()
+        key = (self.normalize_goal_text(text), today)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            return cached.model_copy(deep=True)
+
+        extraction = None
+        if self.use_fast_path:
+            parsed = self.rule_parser.parse(text, today)
+            if parsed.confidence >= self.fast_path_threshold:
+                extraction = parsed.to_extraction()
+                GoalAnalyzerTool.fast_path_hits += 1
+            else:
+                GoalAnalyzerTool.fast_path_misses += 1
+
+        if extraction is None:
+            extraction = await self.extract_goal_with_model(text)
+
+        self._parse_cache[key] = extraction
+        if len(self._parse_cache) > self.parse_cache_size:
+            self._parse_cache.popitem(last=False)
+        return extraction.model_copy(deep=True)
+
+    async def extract_goal_with_model(self, text: str) -> GoalExtraction:
+        prompt = (
+            "Extract the health/fitness goal from the text as JSON with the goal type, "
+            "the numerical target value, the timeframe in weeks and any constraints "
+            "(injuries, schedule, equipment, diet) the user mentions."
+        )
+        response = await self.model.generate_content(
+            f"{prompt}\n\nText: {text}",
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": GOAL_EXTRACTION_SCHEMA
+            }
+        )
+        try:
+            return GoalExtraction.model_validate_json(response.text)
+        except ValidationError as e:
+            raise ValueError(f"Could not parse goal from model response: {e}") from e
 
     async def extract_goal_type(self, text: str) -> str:
-        prompt = "Extract the type of health/fitness goal from the text."
-        response = await self.model.generate_content(f"{prompt}\n\nText: {text}")
-        return response.text
+        return (await self.extract_goal(text)).goal_type
 
-    def extract_target_value(self, text: str) -> float:
-        prompt = "Extract numerical target value from the text."
-        response = self.model.generate_content(f"{prompt}\n\nText: {text}")
-        return float(response.text)
+    async def extract_target_value(self, text: str) -> float:
+        return (await self.extract_goal(text)).target_value
 
-    def extract_timeframe(self, text: str) -> int:
-        prompt = "Extract timeframe in weeks from the text."
-        response = self.model.generate_content(f"{prompt}\n\nText: {text}")
-        return int(response.text)
+    async def extract_timeframe(self, text: str) -> int:
+        return (await self.extract_goal(text)).timeframe_weeks
 
     def validate_goal_safety(self, target: float, timeframe: int) -> None:
         if not self.guardrails.check_progression_rate(0, target, timeframe * 7):
@@ -39,7 +296,7 @@ class GoalAnalyzerTool(Tool):
             metrics["weekly_weight_gain"] = 0.25
         return metrics
 
-    def identify_constraints(self, goal_input: GoalInput) -> Dict[str, str]:
+    def identify_constraints(self, goal_input: "GoalInput") -> Dict[str, str]:
         constraints = {}
         if goal_input.current_stats:
             if goal_input.current_stats.get("bmi", 0) > 30:
@@ -0,0 +1,333 @@
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from itertools import combinations
+from pydantic import BaseModel
+import json
+import os
+import re
+import threading
+import numpy as np
+from .food_database import NUTRIENTS, FoodDatabase, get_food_database, parse_ingredient, singularize
+
+RECIPES_JSON_PATH = os.path.join(os.path.dirname(__file__), "data", "recipes.json")
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+
+# Nutrients the optimizer fits, with their weight in the score
+TARGET_WEIGHTS = {"calories": 2.0, "protein": 1.0, "carbs": 1.0, "fat": 1.0}
+
+# Free-text preferences mapped onto the catalog's diet and allergen tags; one word can name several
+TAG_ALIASES: Dict[str, Set[str]] = {
+    "veggie": {"vegetarian"}, "plant_based": {"vegan"}, "pescetarian": {"pescatarian"},
+    "no_gluten": {"gluten_free"}, "coeliac": {"gluten_free"}, "celiac": {"gluten_free"},
+    "no_dairy": {"dairy_free"}, "lactose_free": {"dairy_free"},
+    "peanut": {"peanuts"}, "nut": {"nuts"}, "tree_nut": {"nuts"}, "tree_nuts": {"nuts"},
+    "egg": {"eggs"}, "milk": {"dairy"}, "lactose": {"dairy"}, "wheat": {"gluten"},
+    "soya": {"soy"}, "seafood": {"fish", "shellfish"}, "shrimp": {"shellfish"}, "prawns": {"shellfish"}
+}
+
+# Words that say how someone reacts rather than to what ("nut allergy", "lactose intolerance")
+ALLERGY_WORDS = {"allergy", "allergies", "allergic", "intolerance", "intolerant", "sensitivity", "to"}
+
+def normalize_tag(text: str) -> str:
+    return "_".join(text.lower().replace("-", " ").split())
+
+def resolve_tags(text: str) -> Set[str]:
+    tag = normalize_tag(text)
+    return TAG_ALIASES.get(tag, {tag})
+
+def allergy_terms(allergy: str) -> List[str]:
+    # The whole phrase and each word, as written and singular ("sesame seeds" -> ..., "sesame", "seed")
+    words = [word for word in re.findall(r"[a-z]+", allergy.lower()) if word not in ALLERGY_WORDS]
+    if not words:
+        return []
+    phrases = [" ".join(words), " ".join(words[:-1] + [singularize(words[-1])])]
+    if len(words) > 1:
+        phrases += [form for word in words for form in (word, singularize(word))]
+    return list(dict.fromkeys(phrases))
+
+class Recipe(BaseModel):
+    name: str
+    meal_type: str
+    cuisine: str
+    ingredients: List[str]
+    preparation: str
+    portion_size: str
+    allergens: List[str] = []
+    diets: List[str] = []
+
+class TagIndex:
+    """Assigns each diet/allergen tag one bit, so a tag set is a single uint64"""
+
+    MAX_TAGS = 64
+
+    def __init__(self, tags: List[str]):
+        if len(tags) > self.MAX_TAGS:
+            raise ValueError(f"Tag index supports at most {self.MAX_TAGS} tags, got {len(tags)}")
+        self.bits = {tag: 1 << position for position, tag in enumerate(sorted(tags))}
+
+    def mask(self, tags: List[str]) -> int:
+        mask = 0
+        for tag in tags:
+            mask |= self.bits[tag]
+        return mask
+
+@dataclass
+class DayCombination:
+    breakfast: int
+    lunch: int
+    dinner: int
+    snacks: Tuple[int, ...]
+    score: float
+
+class RecipeCatalog:
+    def __init__(self, recipes: List[Recipe], food_db: FoodDatabase):
+        self.recipes = recipes
+
+        # Diet and allergen tags share one bit space, prefixed to keep them apart
+        self.tag_index = TagIndex(sorted(
+            {f"diet:{tag}" for recipe in recipes for tag in recipe.diets}
+            | {f"allergen:{tag}" for recipe in recipes for tag in recipe.allergens}
+        ))
+        self.tag_masks = np.array(
+            [self.tag_index.mask([f"diet:{tag}" for tag in recipe.diets] + [f"allergen:{tag}" for tag in recipe.allergens])
+             for recipe in recipes],
+            dtype=np.uint64
+        )
+
+        # Recipe-by-nutrient matrix, one row per recipe in NUTRIENTS order, and
+        # recipe-by-food membership for allergies to foods we don't tag
+        rows = []
+        recipe_foods = []
+        for recipe in recipes:
+            nutrition = food_db.meal_nutrition(recipe.ingredients)
+            if nutrition is None:
+                unresolved = food_db.unresolved_ingredients(recipe.ingredients)
+                raise ValueError(f"Recipe '{recipe.name}' has ingredients missing from the food database: {unresolved}")
+            rows.append([nutrition[nutrient] for nutrient in NUTRIENTS])
+            recipe_foods.append({food_db.lookup(parse_ingredient(ingredient).name).name for ingredient in recipe.ingredients})
+        self.nutrients = np.array(rows, dtype=np.float64).reshape(len(recipes), len(NUTRIENTS))
+
+        self.food_db = food_db
+        self.food_columns = {name: column for column, name in enumerate(sorted(set().union(*recipe_foods)))}
+        self.food_matrix = np.zeros((len(recipes), len(self.food_columns)), dtype=bool)
+        for row, foods in enumerate(recipe_foods):
+            self.food_matrix[row, [self.food_columns[name] for name in foods]] = True
+
+        self.meal_type_index = {
+            meal_type: np.array([i for i, recipe in enumerate(recipes) if recipe.meal_type == meal_type], dtype=np.intp)
+            for meal_type in MEAL_TYPES
+        }
+
+    @classmethod
+    def load(cls, path: str = RECIPES_JSON_PATH, food_db: Optional[FoodDatabase] = None) -> "RecipeCatalog":
+        with open(path, encoding="utf-8") as f:
+            recipes = [Recipe(**recipe) for recipe in json.load(f)]
+        return cls(recipes, food_db or get_food_database())
+
+    def nutrition(self, index: int) -> Dict[str, float]:
+        return {nutrient: float(value) for nutrient, value in zip(NUTRIENTS, self.nutrients[index])}
+
+    def constraint_masks(self, restrictions: List[str], allergies: List[str]) -> Optional[Tuple[int, int, List[int]]]:
+        required = 0
+        for restriction in restrictions:
+            for tag in resolve_tags(restriction):
+                bit = self.tag_index.bits.get(f"diet:{tag}")
+                if bit is None:
+                    # No recipe is known to satisfy this restriction
+                    return None
+                required |= bit
+
+        # An allergy excludes every allergen tag its words name and every food whose name contains it;
+        # one that resolves to neither is unknown, and only the model can judge it
+        excluded = 0
+        food_columns = set()
+        for allergy in allergies:
+            terms = allergy_terms(allergy)
+            bits = [self.tag_index.bits.get(f"allergen:{tag}") for term in terms for tag in resolve_tags(term)]
+            foods = [name for term in terms[:2] for name in self.food_db.search(term)]
+            if not foods and not any(bits):
+                return None
+            for bit in bits:
+                excluded |= bit or 0
+            food_columns.update(self.food_columns[name] for name in foods if name in self.food_columns)
+
+        return required, excluded, sorted(food_columns)
+
+    def eligible(self, restrictions: List[str], allergies: List[str]) -> np.ndarray:
+        masks = self.constraint_masks(restrictions, allergies)
+        if masks is None:
+            return np.zeros(len(self.recipes), dtype=bool)
+        required, excluded, food_columns = masks
+
+        required, excluded = np.uint64(required), np.uint64(excluded)
+        mask = ((self.tag_masks & required) == required) & ((self.tag_masks & excluded) == 0)
+        if food_columns:
+            mask &= ~self.food_matrix[:, food_columns].any(axis=1)
+        return mask
+
+class MealPlanOptimizer:
+    def __init__(
+        self,
+        catalog: RecipeCatalog,
+        calorie_tolerance: float = 0.1,
+        macro_tolerance: float = 0.2,
+        max_snacks: int = 2,
+        repeat_penalty: float = 0.15,
+        cuisine_penalty: float = 0.02
+    ):
+        self.catalog = catalog
+        self.calorie_tolerance = calorie_tolerance
+        self.macro_tolerance = macro_tolerance
+        self.max_snacks = max_snacks
+        self.repeat_penalty = repeat_penalty
+        self.cuisine_penalty = cuisine_penalty
+
+    def plan_days(
+        self,
+        targets: Dict[str, float],
+        restrictions: List[str],
+        allergies: List[str],
+        preferred_cuisine: List[str],
+        num_days: int
+    ) -> List[Optional[DayCombination]]:
+        fitted = [nutrient for nutrient in TARGET_WEIGHTS if targets.get(nutrient)]
+        if "calories" not in fitted:
+            return [None] * num_days
+
+        columns = [NUTRIENTS.index(nutrient) for nutrient in fitted]
+        target = np.array([targets[nutrient] for nutrient in fitted], dtype=np.float64)
+        weights = np.array([TARGET_WEIGHTS[nutrient] for nutrient in fitted], dtype=np.float64)
+        tolerance = np.array(
+            [self.calorie_tolerance if nutrient == "calories" else self.macro_tolerance for nutrient in fitted],
+            dtype=np.float64
+        )
+
+        eligible = self.catalog.eligible(restrictions, allergies)
+        slots = {meal_type: index[eligible[index]] for meal_type, index in self.catalog.meal_type_index.items()}
+        if any(len(slots[meal_type]) == 0 for meal_type in ("breakfast", "lunch", "dinner")):
+            return [None] * num_days
+
+        # Snack options: none, one, or up to max_snacks distinct snacks
+        snack_options = [()] + [
+            option
+            for count in range(1, self.max_snacks + 1)
+            for option in combinations(slots["snack"].tolist(), count)
+        ]
+        snack_totals = np.array(
+            [self.catalog.nutrients[list(option)][:, columns].sum(axis=0) if option else np.zeros(len(columns))
+             for option in snack_options]
+        )
+
+        nutrients = self.catalog.nutrients[:, columns]
+        breakfast = nutrients[slots["breakfast"]]
+        lunch = nutrients[slots["lunch"]]
+        dinner = nutrients[slots["dinner"]]
+
+        # Every breakfast x lunch x dinner x snack-option total in one broadcast
+        totals = (
+            breakfast[:, None, None, None, :]
+            + lunch[None, :, None, None, :]
+            + dinner[None, None, :, None, :]
+            + snack_totals[None, None, None, :, :]
+        )
+        deviation = np.abs(totals - target) / target
+        base_score = (deviation * weights).sum(axis=-1) / weights.sum()
+        feasible = (deviation <= tolerance).all(axis=-1)
+        base_score = np.where(feasible, base_score, np.inf)
+
+        cuisine_cost = self.cuisine_costs(preferred_cuisine)
+        usage = np.zeros(len(self.catalog.recipes), dtype=np.float64)
+
+        plans = []
+        for _ in range(num_days):
+            # Penalize recipes already used this week so days vary
+            cost = self.repeat_penalty * usage + cuisine_cost
+            snack_cost = np.array([cost[list(option)].sum() if option else 0.0 for option in snack_options])
+            score = (
+                base_score
+                + cost[slots["breakfast"]][:, None, None, None]
+                + cost[slots["lunch"]][None, :, None, None]
+                + cost[slots["dinner"]][None, None, :, None]
+                + snack_cost[None, None, None, :]
+            )
+
+            best = int(np.argmin(score))
+            if not np.isfinite(score.flat[best]):
+                plans.append(None)
+                continue
+
+            b, l, d, s = np.unravel_index(best, score.shape)
+            combination = DayCombination(
+                breakfast=int(slots["breakfast"][b]),
+                lunch=int(slots["lunch"][l]),
+                dinner=int(slots["dinner"][d]),
+                snacks=tuple(snack_options[s]),
+                score=float(base_score[b, l, d, s])
+            )
+            for index in (combination.breakfast, combination.lunch, combination.dinner) + combination.snacks:
+                usage[index] += 1
+            plans.append(combination)
+
+        return plans
+
+    def best_replacement(
+        self,
+        targets: Dict[str, float],
+        rest_of_day: Dict[str, float],
+        meal_type: str,
+        restrictions: List[str],
+        allergies: List[str],
+        preferred_cuisine: List[str],
+        exclude: List[str]
+    ) -> Optional[int]:
+        fitted = [nutrient for nutrient in TARGET_WEIGHTS if targets.get(nutrient)]
+        if "calories" not in fitted:
+            return None
+
+        columns = [NUTRIENTS.index(nutrient) for nutrient in fitted]
+        target = np.array([targets[nutrient] for nutrient in fitted], dtype=np.float64)
+        rest = np.array([rest_of_day.get(nutrient, 0.0) for nutrient in fitted], dtype=np.float64)
+        weights = np.array([TARGET_WEIGHTS[nutrient] for nutrient in fitted], dtype=np.float64)
+        tolerance = np.array(
+            [self.calorie_tolerance if nutrient == "calories" else self.macro_tolerance for nutrient in fitted],
+            dtype=np.float64
+        )
+
+        candidates = self.catalog.meal_type_index[meal_type]
+        excluded = set(exclude)
+        keep = self.catalog.eligible(restrictions, allergies)[candidates] & np.array(
+            [self.catalog.recipes[i].name not in excluded for i in candidates], dtype=bool
+        )
+        candidates = candidates[keep]
+        if len(candidates) == 0:
+            return None
+
+        # Score each candidate by how well the whole day fits once it is swapped in
+        deviation = np.abs(rest + self.catalog.nutrients[candidates][:, columns] - target) / target
+        score = (deviation * weights).sum(axis=-1) / weights.sum() + self.cuisine_costs(preferred_cuisine)[candidates]
+        score = np.where((deviation <= tolerance).all(axis=-1), score, np.inf)
+
+        best = int(np.argmin(score))
+        if not np.isfinite(score[best]):
+            return None
+        return int(candidates[best])
+
+    def cuisine_costs(self, preferred_cuisine: List[str]) -> np.ndarray:
+        costs = np.zeros(len(self.catalog.recipes), dtype=np.float64)
+        preferred = {normalize_tag(cuisine) for cuisine in preferred_cuisine}
+        if preferred:
+            for i, recipe in enumerate(self.catalog.recipes):
+                if normalize_tag(recipe.cuisine) not in preferred:
+                    costs[i] = self.cuisine_penalty
+        return costs
+
+_optimizer: Optional[MealPlanOptimizer] = None
+_optimizer_lock = threading.Lock()
+
+def get_meal_optimizer() -> MealPlanOptimizer:
+    global _optimizer
+    with _optimizer_lock:
+        if _optimizer is None:
+            _optimizer = MealPlanOptimizer(RecipeCatalog.load())
+        return _optimizer
\ No newline at end of file
@@ -1,6 +1,20 @@
-from typing import List, Dict, Optional
-from pydantic import BaseModel
-from openai.agents import Tool, StreamingResponse
+from typing import AsyncGenerator, ClassVar, List, Dict, Mapping, Optional, Tuple
+from pydantic import BaseModel, PrivateAttr, field_serializer
+from openai.agents import StreamingResponse
+from ..utils.llm_client import get_model
+from .base_tool import AsyncToolBase
+from .goal_analyzer import GoalOutput
+from .food_database import NUTRIENTS, NutrientView, get_food_database, nutrient_array, nutrient_dict, scale_amount
+from .meal_optimizer import TARGET_WEIGHTS, DayCombination, MealPlanOptimizer, get_meal_optimizer
+from .plan_cache import PlanTemplateCache, PlanTemplateKey, portion_scale
+from .shopping_list import ShoppingList
+import asyncio
+import json
+import os
+import threading
+import numpy as np
+
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 
 class DietaryPreferences(BaseModel):
     restrictions: List[str] = []
@@ -8,14 +22,38 @@ class DietaryPreferences(BaseModel):
     preferred_cuisine: List[str] = []
     calories_target: Optional[int] = None
 
-class Meal(BaseModel):
+class NutrientModel(BaseModel):
+    """Holds the model's nutrients as one float array in NUTRIENTS order; the dict field is a read-only view of it"""
+
+    nutrient_field: ClassVar[str]
+
+    def model_post_init(self, __context) -> None:
+        self.__dict__[self.nutrient_field] = NutrientView(getattr(self, self.nutrient_field))
+
+    def __setattr__(self, name, value):
+        # Replacing the dict replaces the array; the view itself can't be edited in place
+        if name == self.nutrient_field:
+            value = NutrientView(value)
+        super().__setattr__(name, value)
+
+    @field_serializer("nutrition", "total_nutrition", check_fields=False)
+    def serialize_nutrients(self, nutrients: Mapping[str, float]) -> Dict[str, float]:
+        return dict(nutrients)
+
+    @property
+    def nutrients(self) -> np.ndarray:
+        return getattr(self, self.nutrient_field).values
+
+class Meal(NutrientModel):
+    nutrient_field: ClassVar[str] = "nutrition"
     name: str
     ingredients: List[str]
     nutrition: Dict[str, float]
     preparation: str
     portion_size: str
 
-class DailyPlan(BaseModel):
+class DailyPlan(NutrientModel):
+    nutrient_field: ClassVar[str] = "total_nutrition"
     breakfast: Meal
     lunch: Meal
     dinner: Meal
@@ -24,16 +62,146 @@ class DailyPlan(BaseModel):
 
 class MealPlan(BaseModel):
     daily_plans: Dict[str, DailyPlan]
-    shopping_list: List[str]
+    # Aisle -> quantified items, summed across the plan
+    shopping_list: Dict[str, List[str]]
     nutritional_summary: Dict[str, float]
+    # Running ingredient totals behind shopping_list, so swaps can update it in place
+    _shopping: Optional[ShoppingList] = PrivateAttr(default=None)
+
+def scale_meal_plan(meal_plan: MealPlan, targets: Dict[str, float]) -> MealPlan:
+    # Every portion by one factor, so recipes keep their proportions while the day meets the targets
+    factor = portion_scale(meal_plan.nutritional_summary, targets, TARGET_WEIGHTS)
+    if abs(factor - 1) < 1e-3:
+        return meal_plan
+    shopping = ShoppingList()
+    for plan in meal_plan.daily_plans.values():
+        for meal in [plan.breakfast, plan.lunch, plan.dinner] + plan.snacks:
+            meal.ingredients = [scale_amount(ingredient, factor) for ingredient in meal.ingredients]
+            meal.portion_size = scale_amount(meal.portion_size, factor)
+            meal.nutrition = nutrient_dict(meal.nutrients * factor)
+            shopping.add_meal(meal.ingredients)
+        plan.total_nutrition = nutrient_dict(plan.nutrients * factor)
+    meal_plan.nutritional_summary = nutrient_dict(nutrient_array(meal_plan.nutritional_summary) * factor)
+    meal_plan.shopping_list = shopping.grouped()
+    meal_plan._shopping = shopping
+    return meal_plan
+
+_plan_cache: Optional[PlanTemplateCache[MealPlan]] = None
+_plan_cache_lock = threading.Lock()
+
+def get_plan_cache() -> PlanTemplateCache[MealPlan]:
+    global _plan_cache
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            # Set MEAL_PLAN_CACHE_DIR to share templates across processes and restarts
+            _plan_cache = PlanTemplateCache(MealPlan, disk_dir=os.getenv("MEAL_PLAN_CACHE_DIR"), scale=scale_meal_plan)
+        return _plan_cache
+
+class MealPlanStream:
+    """Streams each DailyPlan to every reader as it finishes and builds the MealPlan from the same objects"""
+
+    def __init__(
+        self,
+        tool: "MealPlannerTool",
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        days: List[str] = DAYS_OF_WEEK
+    ):
+        self.tool = tool
+        self.targets = targets
+        self.preferences = preferences
+        self.days = list(days)
+        # Finished days are kept so a reader that subscribes late still sees the whole week
+        self._completed: List[Tuple[str, DailyPlan]] = []
+        self._finished = False
+        self._subscribers: List[asyncio.Queue] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "asyncio.Task[MealPlan]":
+        # Generation runs once, however many consumers read the days or the result
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._generate())
+        return self._task
+
+    def _publish(self, item: Optional[Tuple[str, DailyPlan]]) -> None:
+        # None marks the end of the stream
+        if item is None:
+            self._finished = True
+        else:
+            self._completed.append(item)
+        for queue in self._subscribers:
+            queue.put_nowait(item)
+
+    async def _generate(self) -> MealPlan:
+        cache_key = self.tool.plan_cache_key(self.targets, self.preferences, self.days)
+        cached = self.tool.plan_cache.get(cache_key, self.targets) if self.tool.use_plan_cache else None
+        if cached is not None:
+            for day in self.days:
+                self._publish((day, cached.daily_plans[day]))
+            self._publish(None)
+            return cached
+
+        daily_plans = {}
+        try:
+            async for day, plan in self.tool.stream_daily_plans(self.targets, self.preferences, self.days):
+                daily_plans[day] = plan
+                self._publish((day, plan))
+        finally:
+            self._publish(None)
 
-from typing import List, Dict, Optional, AsyncGenerator
-from pydantic import BaseModel
-from openai.agents import Tool, StreamingResponse
+        meal_plan = self.tool.build_meal_plan({day: daily_plans[day] for day in self.days})
+        if self.tool.use_plan_cache:
+            self.tool.plan_cache.put(cache_key, meal_plan)
+        return meal_plan
+
+    async def __aiter__(self) -> AsyncGenerator[Tuple[str, DailyPlan], None]:
+        # Each reader gets its own queue, starting with the days already finished
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in self._completed:
+            queue.put_nowait(item)
+        if self._finished:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+        self.start()
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+        # Surface a failed day to the reader of the stream too
+        await self._task
+
+    async def progress(self) -> AsyncGenerator[str, None]:
+        async for day, plan in self:
+            yield f"Completed {day}'s meal plan: {plan.breakfast.name}, {plan.lunch.name}, {plan.dinner.name}"
+
+    async def result(self) -> MealPlan:
+        return await self.start()
 
 class MealPlannerTool(AsyncToolBase):
     name = "meal_planner"
     description = "Generates personalized meal plans based on user goals and preferences"
+    max_concurrent_days: int = 4
+    day_max_retries: int = 3
+    day_retry_delay: float = 0.5
+    use_optimizer: bool = True
+    use_plan_cache: bool = True
+
+    def __init__(self):
+        super().__init__()
+        self.model = get_model('gemini-pro')
+        self.food_db = get_food_database()
+        self.plan_cache = get_plan_cache()
+        self._optimizer: Optional[MealPlanOptimizer] = None
+
+    @property
+    def optimizer(self) -> MealPlanOptimizer:
+        # The recipe catalog loads on first use, not when the tool is built
+        if self._optimizer is None:
+            self._optimizer = get_meal_optimizer()
+        return self._optimizer
 
     async def validate_input(self, goal_output: GoalOutput, preferences: DietaryPreferences) -> bool:
         if not goal_output or not preferences:
@@ -43,45 +211,58 @@ class MealPlannerTool(AsyncToolBase):
         return True
 
     async def execute(self, goal_output: GoalOutput, preferences: DietaryPreferences) -> StreamingResponse[MealPlan]:
+        # final_response is the finished MealPlan and progress replays every day of it;
+        # callers that want days as they finish iterate stream_meal_plan() instead
         nutrition_targets = self.calculate_nutrition_targets(goal_output)
-        
+        stream = self.stream_meal_plan(nutrition_targets, preferences)
+
         return StreamingResponse(
-            final_response=MealPlan(
-                daily_plans=await self.generate_daily_plans(nutrition_targets, preferences),
-                shopping_list=self.create_shopping_list(daily_plans),
-                nutritional_summary=self.calculate_nutritional_summary(daily_plans)
-            ),
-            progress_generator=self.generate_meal_stream(nutrition_targets, preferences)
+            final_response=await stream.result(),
+            progress_generator=stream.progress()
         )
 
     async def post_execute(self, result: StreamingResponse[MealPlan]) -> StreamingResponse[MealPlan]:
         # Add any post-processing logic here
         return result
 
-    async def generate_meal_stream(self, nutrition_targets: Dict[str, float], preferences: DietaryPreferences) -> AsyncGenerator[str, None]:
-        total_steps = 7  # days in week
-        for day_num in range(total_steps):
-            day = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"][day_num]
-            yield f"Generating meal plan for {day}..."
-            
-            meals = await self.generate_meals_for_day(nutrition_targets, preferences)
-            yield f"Completed {day}'s meal plan: {meals['breakfast'].name}, {meals['lunch'].name}, {meals['dinner'].name}"
+    def stream_meal_plan(
+        self,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        days: List[str] = DAYS_OF_WEEK
+    ) -> MealPlanStream:
+        return MealPlanStream(self, targets, preferences, days)
+
+    def plan_cache_key(
+        self,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        days: List[str]
+    ) -> PlanTemplateKey:
+        return self.plan_cache.make_key(
+            targets,
+            preferences.restrictions,
+            preferences.allergies,
+            preferences.preferred_cuisine,
+            days
+        )
+
+    def build_meal_plan(self, daily_plans: Dict[str, DailyPlan]) -> MealPlan:
+        shopping = self.build_shopping_list(daily_plans)
+        meal_plan = MealPlan(
+            daily_plans=daily_plans,
+            shopping_list=shopping.grouped(),
+            nutritional_summary=self.calculate_nutritional_summary(daily_plans)
+        )
+        meal_plan._shopping = shopping
+        return meal_plan
 
     async def run(
         self,
         goal_output: GoalOutput,
         preferences: DietaryPreferences
     ) -> StreamingResponse[MealPlan]:
-        nutrition_targets = self.calculate_nutrition_targets(goal_output)
-        
-        return StreamingResponse(
-            final_response=MealPlan(
-                daily_plans=await self.generate_daily_plans(nutrition_targets, preferences),
-                shopping_list=self.create_shopping_list(daily_plans),
-                nutritional_summary=self.calculate_nutritional_summary(daily_plans)
-            ),
-            progress_generator=self.generate_meal_stream(nutrition_targets, preferences)
-        )
+        return await self.execute(goal_output, preferences)
 
     def calculate_nutrition_targets(self, goal_output: GoalOutput) -> Dict[str, float]:
         # Calculate daily caloric needs
@@ -102,47 +283,300 @@ class MealPlannerTool(AsyncToolBase):
             **micros
         }
 
-    async def generate_daily_plans(self, targets: Dict[str, float], preferences: DietaryPreferences) -> Dict[str, DailyPlan]:
-        # Generate meal combinations
-        daily_plans = {}
-        for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
-            meals = await self.generate_meals_for_day(targets, preferences)
-            daily_plans[day] = DailyPlan(**meals)
-        return daily_plans
-
-    def create_shopping_list(self, daily_plans: Dict[str, DailyPlan]) -> List[str]:
-        # Extract all ingredients
-        all_ingredients = set()
+    async def generate_daily_plans(
+        self,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        days: List[str] = DAYS_OF_WEEK
+    ) -> Dict[str, DailyPlan]:
+        daily_plans = {day: plan async for day, plan in self.stream_daily_plans(targets, preferences, days)}
+
+        # Days finish in any order; return them in calendar order
+        return {day: daily_plans[day] for day in days}
+
+    async def stream_daily_plans(
+        self,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        days: List[str] = DAYS_OF_WEEK
+    ) -> AsyncGenerator[Tuple[str, DailyPlan], None]:
+        # Days the optimizer can fit from the recipe catalog are ready immediately
+        optimized = self.optimize_days(targets, preferences, days) if self.use_optimizer else {}
+        for day in days:
+            if day in optimized:
+                yield day, optimized[day]
+
+        # Generate the remaining days concurrently, bounded so one plan can't hog the LLM throttle
+        semaphore = asyncio.Semaphore(self.max_concurrent_days)
+
+        async def generate_day(day: str) -> Tuple[str, DailyPlan]:
+            return day, await self.generate_day_plan(day, targets, preferences, semaphore)
+
+        tasks = [asyncio.ensure_future(generate_day(day)) for day in days if day not in optimized]
+        try:
+            # Yield each day as soon as it is ready
+            for next_day in asyncio.as_completed(tasks):
+                yield await next_day
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def optimize_days(
+        self,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        days: List[str]
+    ) -> Dict[str, DailyPlan]:
+        combinations = self.optimizer.plan_days(
+            targets,
+            preferences.restrictions,
+            preferences.allergies,
+            preferences.preferred_cuisine,
+            len(days)
+        )
+        return {
+            day: self.combination_to_plan(combination)
+            for day, combination in zip(days, combinations)
+            if combination is not None
+        }
+
+    def combination_to_plan(self, combination: DayCombination) -> DailyPlan:
+        snacks = [self.recipe_to_meal(index) for index in combination.snacks]
+        meals = {
+            "breakfast": self.recipe_to_meal(combination.breakfast),
+            "lunch": self.recipe_to_meal(combination.lunch),
+            "dinner": self.recipe_to_meal(combination.dinner),
+            "snacks": snacks
+        }
+        meals["total_nutrition"] = self.sum_meal_nutrition(
+            [meals["breakfast"], meals["lunch"], meals["dinner"]] + snacks
+        )
+        return DailyPlan(**meals)
+
+    def recipe_to_meal(self, index: int) -> Meal:
+        recipe = self.optimizer.catalog.recipes[index]
+        return Meal(
+            name=recipe.name,
+            ingredients=list(recipe.ingredients),
+            nutrition=self.optimizer.catalog.nutrition(index),
+            preparation=recipe.preparation,
+            portion_size=recipe.portion_size
+        )
+
+    async def swap_meal(
+        self,
+        meal_plan: MealPlan,
+        day: str,
+        slot: str,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        snack_index: int = 0
+    ) -> Meal:
+        daily_plan = meal_plan.daily_plans[day]
+        old_meal = self.get_meal(daily_plan, slot, snack_index)
+        new_meal = await self.generate_replacement_meal(daily_plan, slot, old_meal, targets, preferences)
+        self.replace_meal(meal_plan, day, slot, new_meal, snack_index)
+        return new_meal
+
+    def get_meal(self, daily_plan: DailyPlan, slot: str, snack_index: int = 0) -> Meal:
+        if slot == "snacks":
+            return daily_plan.snacks[snack_index]
+        if slot not in ("breakfast", "lunch", "dinner"):
+            raise ValueError(f"Unknown meal slot: {slot}")
+        return getattr(daily_plan, slot)
+
+    def day_meals(self, daily_plan: DailyPlan) -> List[Meal]:
+        return [daily_plan.breakfast, daily_plan.lunch, daily_plan.dinner] + daily_plan.snacks
+
+    async def generate_replacement_meal(
+        self,
+        daily_plan: DailyPlan,
+        slot: str,
+        old_meal: Meal,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences
+    ) -> Meal:
+        meal_type = "snack" if slot == "snacks" else slot
+        rest_of_day = self.sum_meal_nutrition([meal for meal in self.day_meals(daily_plan) if meal is not old_meal])
+        exclude = [meal.name for meal in self.day_meals(daily_plan)]
+
+        if self.use_optimizer:
+            index = self.optimizer.best_replacement(
+                targets,
+                rest_of_day,
+                meal_type,
+                preferences.restrictions,
+                preferences.allergies,
+                preferences.preferred_cuisine,
+                exclude
+            )
+            if index is not None:
+                return self.recipe_to_meal(index)
+
+        remaining = {
+            nutrient: max(target - rest_of_day.get(nutrient, 0), 0)
+            for nutrient, target in targets.items()
+        }
+        prompt = self.create_meal_prompt(meal_type, remaining, preferences, exclude)
+        response = await self.model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        return self.apply_local_nutrition(Meal(**json.loads(response.text)))
+
+    def create_meal_prompt(
+        self,
+        meal_type: str,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        exclude: List[str]
+    ) -> str:
+        return (
+            f"Create one {meal_type} as JSON with name, ingredients, nutrition, preparation and portion_size. "
+            "Give every ingredient with a quantity and unit, e.g. \"120g chicken breast\".\n\n"
+            f"Nutrition targets for this meal: {json.dumps(targets)}\n"
+            f"Do not suggest: {', '.join(exclude)}\n"
+            f"Restrictions: {', '.join(preferences.restrictions) or 'none'}\n"
+            f"Allergies: {', '.join(preferences.allergies) or 'none'}\n"
+            f"Preferred cuisine: {', '.join(preferences.preferred_cuisine) or 'any'}"
+        )
+
+    def replace_meal(
+        self,
+        meal_plan: MealPlan,
+        day: str,
+        slot: str,
+        new_meal: Meal,
+        snack_index: int = 0
+    ) -> Meal:
+        daily_plan = meal_plan.daily_plans[day]
+        old_meal = self.get_meal(daily_plan, slot, snack_index)
+        if slot == "snacks":
+            daily_plan.snacks[snack_index] = new_meal
+        else:
+            setattr(daily_plan, slot, new_meal)
+
+        # Apply only the difference between the two meals to the day and the plan
+        change = new_meal.nutrients - old_meal.nutrients
+        daily_plan.total_nutrition = nutrient_dict(daily_plan.nutrients + change)
+        meal_plan.nutritional_summary = nutrient_dict(
+            nutrient_array(meal_plan.nutritional_summary) + change / len(meal_plan.daily_plans)
+        )
+
+        self.update_shopping_list(meal_plan, removed=old_meal.ingredients, added=new_meal.ingredients)
+        return old_meal
+
+    def update_shopping_list(self, meal_plan: MealPlan, removed: List[str], added: List[str]) -> None:
+        shopping = meal_plan._shopping
+        if shopping is None:
+            # Plans loaded from the template cache's disk tier arrive without totals
+            shopping = meal_plan._shopping = self.build_shopping_list(meal_plan.daily_plans)
+        shopping.remove_meal(removed)
+        shopping.add_meal(added)
+        meal_plan.shopping_list = shopping.grouped()
+
+    async def generate_day_plan(
+        self,
+        day: str,
+        targets: Dict[str, float],
+        preferences: DietaryPreferences,
+        semaphore: asyncio.Semaphore
+    ) -> DailyPlan:
+        # Retry only the failing day instead of regenerating the whole week
+        last_error = None
+        for attempt in range(self.day_max_retries):
+            try:
+                async with semaphore:
+                    meals = await self.generate_meals_for_day(targets, preferences)
+                return DailyPlan(**meals)
+            except Exception as e:
+                last_error = e
+                if attempt < self.day_max_retries - 1:
+                    await asyncio.sleep(self.day_retry_delay * (attempt + 1))
+
+        raise Exception(f"Meal plan for {day} failed after {self.day_max_retries} retries. Last error: {str(last_error)}")
+
+    async def generate_meals_for_day(self, targets: Dict[str, float], preferences: DietaryPreferences) -> Dict:
+        prompt = self.create_day_prompt(targets, preferences)
+        response = await self.model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        data = json.loads(response.text)
+
+        meals = {
+            "breakfast": self.apply_local_nutrition(Meal(**data["breakfast"])),
+            "lunch": self.apply_local_nutrition(Meal(**data["lunch"])),
+            "dinner": self.apply_local_nutrition(Meal(**data["dinner"])),
+            "snacks": [self.apply_local_nutrition(Meal(**snack)) for snack in data.get("snacks", [])]
+        }
+        meals["total_nutrition"] = self.sum_meal_nutrition(
+            [meals["breakfast"], meals["lunch"], meals["dinner"]] + meals["snacks"]
+        )
+        return meals
+
+    def create_day_prompt(self, targets: Dict[str, float], preferences: DietaryPreferences) -> str:
+        return (
+            "Create one day of meals (breakfast, lunch, dinner and snacks) as JSON. "
+            "Each meal needs name, ingredients, nutrition, preparation and portion_size. "
+            "Give every ingredient with a quantity and unit, e.g. \"120g chicken breast\".\n\n"
+            f"Daily targets: {json.dumps(targets)}\n"
+            f"Restrictions: {', '.join(preferences.restrictions) or 'none'}\n"
+            f"Allergies: {', '.join(preferences.allergies) or 'none'}\n"
+            f"Preferred cuisine: {', '.join(preferences.preferred_cuisine) or 'any'}"
+        )
+
+    def apply_local_nutrition(self, meal: Meal) -> Meal:
+        # Prefer deterministic totals from the food database; keep the model's
+        # estimate only when some ingredient can't be resolved locally
+        nutrition = self.food_db.meal_nutrition(meal.ingredients)
+        if nutrition is not None:
+            meal.nutrition = nutrition
+        return meal
+
+    def sum_meal_nutrition(self, meals: List[Meal]) -> Dict[str, float]:
+        if not meals:
+            return nutrient_dict(np.zeros(len(NUTRIENTS)))
+        return nutrient_dict(np.stack([meal.nutrients for meal in meals]).sum(axis=0))
+
+    def create_shopping_list(self, daily_plans: Dict[str, DailyPlan]) -> Dict[str, List[str]]:
+        return self.build_shopping_list(daily_plans).grouped()
+
+    def build_shopping_list(self, daily_plans: Dict[str, DailyPlan]) -> ShoppingList:
+        shopping = ShoppingList()
         for plan in daily_plans.values():
-            for meal in [plan.breakfast, plan.lunch, plan.dinner] + plan.snacks:
-                all_ingredients.update(meal.ingredients)
-        
-        # Organize by category
-        return sorted(list(all_ingredients))
+            for meal in self.day_meals(plan):
+                shopping.add_meal(meal.ingredients)
+        return shopping
 
     def calculate_nutritional_summary(self, daily_plans: Dict[str, DailyPlan]) -> Dict[str, float]:
-        # Calculate weekly totals
-        weekly_totals = {}
-        for plan in daily_plans.values():
-            for nutrient, value in plan.total_nutrition.items():
-                weekly_totals[nutrient] = weekly_totals.get(nutrient, 0) + value
-        
-        # Calculate averages
-        return {k: v/7 for k, v in weekly_totals.items()}
+        # Daily averages over however many days the plan covers
+        return self.calculate_nutrient_statistics(daily_plans)["average"]
+
+    def calculate_nutrient_statistics(self, daily_plans: Dict[str, DailyPlan]) -> Dict[str, Dict[str, float]]:
+        if not daily_plans:
+            zeros = nutrient_dict(np.zeros(len(NUTRIENTS)))
+            return {"total": zeros, "average": dict(zeros), "variance": dict(zeros)}
+
+        # One row per day, one column per nutrient
+        days = np.stack([plan.nutrients for plan in daily_plans.values()])
+        return {
+            "total": nutrient_dict(days.sum(axis=0)),
+            "average": nutrient_dict(days.mean(axis=0)),
+            "variance": nutrient_dict(days.var(axis=0))
+        }
 
-    async def generate_meal_plan(self, preferences: Dict) -> AsyncGenerator[str, None]:
+    async def generate_meal_plan(self, goal_output: GoalOutput, preferences: DietaryPreferences) -> AsyncGenerator[str, None]:
         # Initial response
         yield "Analyzing your dietary preferences..."
-        await asyncio.sleep(0.5)
         
-        # Generate meal plan day by day
-        for day in range(1, 8):
-            yield f"\nGenerating meal plan for Day {day}..."
-            await asyncio.sleep(0.5)
-            # Generate meals for the day
-            yield f"Breakfast: {await self.generate_meal('breakfast', preferences)}"
-            yield f"Lunch: {await self.generate_meal('lunch', preferences)}"
-            yield f"Dinner: {await self.generate_meal('dinner', preferences)}"
+        # Stream each day as soon as it is generated
+        stream = self.stream_meal_plan(self.calculate_nutrition_targets(goal_output), preferences)
+        async for day, plan in stream:
+            yield f"\nMeal plan for {day.capitalize()}:"
+            yield f"Breakfast: {plan.breakfast.name}"
+            yield f"Lunch: {plan.lunch.name}"
+            yield f"Dinner: {plan.dinner.name}"
 
     async def __call__(self, **kwargs) -> StreamingResponse:
-        return StreamingResponse(self.generate_meal_plan(kwargs))
\ No newline at end of file
+        return StreamingResponse(self.generate_meal_plan(**kwargs))
\ No newline at end of file
@@ -0,0 +1,177 @@
+from typing import Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+from collections import OrderedDict
+from pydantic import BaseModel, ValidationError
+import hashlib
+import json
+import os
+import threading
+import time
+
+T = TypeVar('T', bound=BaseModel)
+
+PlanTemplateKey = Tuple[int, Tuple[int, int, int], Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+def normalize_terms(terms: List[str]) -> Tuple[str, ...]:
+    return tuple(sorted({"_".join(term.lower().replace("-", " ").split()) for term in terms}))
+
+def portion_scale(totals: Dict[str, float], targets: Dict[str, float], weights: Dict[str, float]) -> float:
+    # Least-squares factor on relative error: minimizes sum(weight * (factor * total / target - 1) ** 2)
+    ratios = [(weight, totals[nutrient] / targets[nutrient]) for nutrient, weight in weights.items()
+              if targets.get(nutrient) and totals.get(nutrient)]
+    if not ratios:
+        return 1.0
+    return sum(weight * ratio for weight, ratio in ratios) / sum(weight * ratio * ratio for weight, ratio in ratios)
+
+class PlanTemplateCache(Generic[T]):
+    """Cross-user cache of plan templates, bucketed so near-identical inputs share one entry"""
+
+    def __init__(
+        self,
+        model_type: Type[T],
+        calorie_bucket_width: int = 100,
+        macro_bucket_pct: int = 5,
+        max_entries: int = 1024,
+        ttl_seconds: float = 24 * 60 * 60,
+        disk_dir: Optional[str] = None,
+        scale: Optional[Callable[[T, Dict[str, float]], T]] = None
+    ):
+        self.model_type = model_type
+        # Fits a copied template to one user's targets; bucketing leaves each user a few percent off
+        self.scale = scale
+        self.calorie_bucket_width = calorie_bucket_width
+        self.macro_bucket_pct = macro_bucket_pct
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+            except OSError:
+                # Unusable directory: cache in memory only
+                self.disk_dir = None
+
+        self._entries: "OrderedDict[PlanTemplateKey, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(
+        self,
+        targets: Dict[str, float],
+        restrictions: List[str],
+        allergies: List[str],
+        cuisine: List[str],
+        days: List[str]
+    ) -> PlanTemplateKey:
+        calories = targets.get("calories", 0)
+        calorie_bucket = int(round(calories / self.calorie_bucket_width)) * self.calorie_bucket_width
+
+        # Macro split as percent of calories, rounded to the macro bucket
+        split = []
+        for nutrient, kcal_per_gram in (("protein", 4), ("carbs", 4), ("fat", 9)):
+            pct = 100 * targets.get(nutrient, 0) * kcal_per_gram / calories if calories else 0
+            split.append(int(round(pct / self.macro_bucket_pct)) * self.macro_bucket_pct)
+
+        return (
+            calorie_bucket,
+            tuple(split),
+            normalize_terms(restrictions),
+            normalize_terms(allergies),
+            normalize_terms(cuisine),
+            tuple(days)
+        )
+
+    def get(self, key: PlanTemplateKey, targets: Optional[Dict[str, float]] = None) -> Optional[T]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, template = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self.personalize(template, targets)
+                del self._entries[key]
+
+        template = self._read_disk(key, now)
+        with self._lock:
+            if template is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, template, now)
+        return self.personalize(template, targets)
+
+    def put(self, key: PlanTemplateKey, plan: T) -> None:
+        now = time.time()
+        # Keep our own copy so later edits to the caller's plan don't leak into the template
+        template = plan.model_copy(deep=True)
+        with self._lock:
+            self._store(key, template, now)
+        self._write_disk(key, template, now)
+
+    def personalize(self, template: T, targets: Optional[Dict[str, float]] = None) -> T:
+        # Each user gets an independent copy they can swap meals in, scaled to their own targets
+        plan = template.model_copy(deep=True)
+        if self.scale is not None and targets:
+            plan = self.scale(plan, targets)
+        return plan
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: PlanTemplateKey, template: T, stored_at: float) -> None:
+        self._entries[key] = (stored_at, template)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: PlanTemplateKey) -> str:
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _read_disk(self, key: PlanTemplateKey, now: float) -> Optional[T]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+            if now - record["stored_at"] > self.ttl_seconds:
+                os.remove(path)
+                return None
+            return self.model_type.model_validate(record["template"])
+        except (OSError, ValueError, KeyError, ValidationError):
+            return None
+
+    def _write_disk(self, key: PlanTemplateKey, template: T, stored_at: float) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # A full or read-only disk only costs the disk tier; the template is already in memory
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "template": template.model_dump(mode="json")}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
\ No newline at end of file
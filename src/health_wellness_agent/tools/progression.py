@@ -0,0 +1,175 @@
+from typing import Dict, Iterator, List, Mapping
+import re
+import numpy as np
+
+PERIODIZATION_SCHEMES = ["linear", "undulating", "block"]
+
+# Every fourth week of a linear cycle drops volume and load to recover
+DELOAD_EVERY = 4
+
+# Undulating weeks rotate through (reps multiplier, load as fraction of 1RM)
+UNDULATING_WAVE = [(1.0, 0.70), (0.6, 0.80), (1.5, 0.60)]
+
+# Block phases: (weeks, reps multiplier, sets added, starting load, ending load)
+BLOCK_PHASES = [
+    (4, 1.2, 1, 0.65, 0.72),
+    (4, 0.8, 0, 0.75, 0.82),
+    (3, 0.5, 0, 0.85, 0.92),
+    (1, 0.6, -1, 0.60, 0.60)
+]
+
+MAX_LOAD = 0.95
+# Leading number plus whatever unit follows it, spacing kept ("20 min", "30s hold")
+REPS_RE = re.compile(r"(\d+(?:\.\d+)?)(.*)")
+# One week as format_week writes it ("Week 2: 3x10 reps @ 70% RPE 7")
+WEEK_RE = re.compile(r"Week \d+: (\d+)x(\d+(?:\.\d+)?)(.*?)(?: @ (\d+)%)? RPE (\d+(?:\.\d+)?)$")
+
+class ProgressionPlan(Mapping[str, str]):
+    """Exercise-by-week sets, reps, load and RPE arrays, formatted per exercise only when read"""
+
+    def __init__(
+        self,
+        exercises: List[str],
+        units: List[str],
+        sets: np.ndarray,
+        reps: np.ndarray,
+        load: np.ndarray,
+        rpe: np.ndarray,
+        scheme: str
+    ):
+        self.exercises = exercises
+        self.units = units
+        self.sets = sets
+        self.reps = reps
+        self.load = load
+        self.rpe = rpe
+        self.scheme = scheme
+        self.rows = {name: row for row, name in enumerate(exercises)}
+        self._formatted: Dict[str, str] = {}
+
+    @property
+    def weeks(self) -> int:
+        return self.sets.shape[1]
+
+    def __getitem__(self, name: str) -> str:
+        text = self._formatted.get(name)
+        if text is None:
+            row = self.rows[name]
+            text = self._formatted[name] = "; ".join(self.format_week(row, week) for week in range(self.weeks))
+        return text
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.exercises)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def format_week(self, row: int, week: int) -> str:
+        reps = f"{self.reps[row, week]:g}{self.units[row]}"
+        load = "" if np.isnan(self.load[row, week]) else f" @ {round(100 * float(self.load[row, week]))}%"
+        return f"Week {week + 1}: {self.sets[row, week]}x{reps}{load} RPE {self.rpe[row, week]:g}"
+
+    def week(self, week: int) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "sets": int(self.sets[row, week]),
+                "reps": float(self.reps[row, week]),
+                "load": None if np.isnan(self.load[row, week]) else float(self.load[row, week]),
+                "rpe": float(self.rpe[row, week])
+            }
+            for name, row in self.rows.items()
+        }
+
+    def to_dict(self) -> Dict[str, str]:
+        return {name: self[name] for name in self.exercises}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, str], scheme: str = "linear") -> "ProgressionPlan":
+        # Parses the stored text back into arrays; loads come back at the whole percent they were shown at
+        exercises, units, rows = list(data), [], []
+        for name in exercises:
+            weeks = [WEEK_RE.match(week.strip()) for week in data[name].split(";")]
+            if not all(weeks):
+                raise ValueError(f"Unreadable progression for {name}: {data[name]}")
+            units.append(weeks[0].group(3))
+            rows.append([
+                (int(week.group(1)), float(week.group(2)), float(week.group(4)) / 100 if week.group(4) else np.nan, float(week.group(5)))
+                for week in weeks
+            ])
+        if len({len(row) for row in rows}) > 1:
+            raise ValueError("Every exercise needs the same number of weeks")
+        values = np.array(rows, dtype=np.float64).reshape(len(exercises), len(rows[0]) if rows else 0, 4)
+        return cls(exercises, units, values[..., 0].astype(np.int64), values[..., 1], values[..., 2], values[..., 3], scheme)
+
+class ProgressionEngine:
+    """Builds every exercise's multi-week progression in a handful of array operations"""
+
+    def build(self, exercises: List[Dict[str, str]], weeks: int, scheme: str = "linear") -> ProgressionPlan:
+        if scheme not in PERIODIZATION_SCHEMES:
+            raise ValueError(f"Unknown periodization scheme: {scheme}")
+        weeks = max(int(weeks or 1), 1)
+
+        # One row per distinct exercise; later days repeat the same progression
+        names, base_sets, base_reps, units = [], [], [], []
+        seen = set()
+        for exercise in exercises:
+            if exercise["name"] in seen:
+                continue
+            seen.add(exercise["name"])
+            match = REPS_RE.match(str(exercise.get("reps", "10")))
+            names.append(exercise["name"])
+            base_sets.append(float(exercise.get("sets", 3)))
+            base_reps.append(float(match.group(1)) if match else 10.0)
+            units.append(match.group(2).rstrip() if match else "")
+        base_sets = np.array(base_sets, dtype=np.float32)[:, None]
+        base_reps = np.array(base_reps, dtype=np.float32)[:, None]
+        # Time- or hold-based work progresses by duration, not by load
+        loaded = np.array([not unit.strip() for unit in units])[:, None]
+
+        reps_factor, sets_delta, load = getattr(self, f"{scheme}_waves")(np.arange(weeks))
+
+        sets = np.maximum(base_sets + sets_delta[None, :], 1).astype(np.int16)
+        reps = np.where(
+            loaded,
+            np.maximum(np.round(base_reps * reps_factor[None, :]), 1),
+            # Duration climbs 5% a week, capped at double, and dips with the deload
+            np.round(base_reps * np.minimum(1 + 0.05 * np.arange(weeks), 2.0)[None, :] * np.minimum(reps_factor, 1)[None, :])
+        ).astype(np.float32)
+        load_matrix = np.where(loaded, load[None, :], np.nan).astype(np.float32)
+        # RPE tracks relative load: 60% of 1RM ~ RPE 6, 95% ~ RPE 9.5
+        rpe = np.broadcast_to(np.round(np.clip(6 + 10 * (load - 0.6), 5, 10) * 2) / 2, sets.shape).astype(np.float32)
+
+        return ProgressionPlan(names, units, sets, reps, load_matrix, rpe, scheme)
+
+    def linear_waves(self, week: np.ndarray):
+        deload = week % DELOAD_EVERY == DELOAD_EVERY - 1
+        # Load climbs 2.5% per training week; deload weeks don't count towards it
+        load = np.minimum(0.65 + 0.025 * (week - week // DELOAD_EVERY), MAX_LOAD)
+        load = np.where(deload, load * 0.9, load)
+        return np.ones(len(week)), np.where(deload, -1.0, 0.0), load
+
+    def undulating_waves(self, week: np.ndarray):
+        wave = week % len(UNDULATING_WAVE)
+        cycle = week // len(UNDULATING_WAVE)
+        reps_factor = np.array([reps for reps, _ in UNDULATING_WAVE])[wave]
+        # Each full wave lifts all three intensities by 1%
+        load = np.minimum(np.array([load for _, load in UNDULATING_WAVE])[wave] + 0.01 * cycle, MAX_LOAD)
+        return reps_factor, np.zeros(len(week)), load
+
+    def block_waves(self, week: np.ndarray):
+        phase_weeks = np.array([length for length, *_ in BLOCK_PHASES])
+        block_length = int(phase_weeks.sum())
+        position = week % block_length
+        block = week // block_length
+
+        phase_starts = np.concatenate([[0], np.cumsum(phase_weeks)[:-1]])
+        phase = np.searchsorted(phase_starts, position, side="right") - 1
+        progress = (position - phase_starts[phase]) / np.maximum(phase_weeks[phase] - 1, 1)
+
+        reps_factor = np.array([reps for _, reps, *_ in BLOCK_PHASES])[phase]
+        sets_delta = np.array([sets for _, _, sets, *_ in BLOCK_PHASES], dtype=np.float64)[phase]
+        start = np.array([start for *_, start, _ in BLOCK_PHASES])[phase]
+        end = np.array([end for *_, end in BLOCK_PHASES])[phase]
+        # Each completed block starts the next one 2% heavier
+        load = np.minimum(start + (end - start) * progress + 0.02 * block, MAX_LOAD)
+        return reps_factor, sets_delta, load
\ No newline at end of file
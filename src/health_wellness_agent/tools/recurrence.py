@@ -0,0 +1,104 @@
+from typing import Iterable, Iterator, List, Optional
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Full names and the usual abbreviations; anything else is rejected rather than guessed
+WEEKDAY_NAMES = {
+    **{weekday: index for index, weekday in enumerate(WEEKDAYS)},
+    **{weekday[:3]: index for index, weekday in enumerate(WEEKDAYS)},
+    "tues": 1, "thur": 3, "thurs": 3
+}
+
+# Frequencies with a fixed week interval; "custom" takes its weekdays from the caller
+FREQUENCY_INTERVAL_WEEKS = {"daily": 1, "weekly": 1, "biweekly": 2, "custom": 1}
+
+TIME_FORMATS = ["%H:%M", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p", "%H"]
+
+def parse_time_of_day(text: str) -> time:
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(text.strip().upper(), time_format).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized time of day: {text}")
+
+def parse_weekday(text: str) -> int:
+    index = WEEKDAY_NAMES.get(text.strip().lower().rstrip("."))
+    if index is None:
+        raise ValueError(f"Unrecognized weekday: {text}")
+    return index
+
+class RecurrenceRule:
+    """Check-in times on fixed weekdays every N weeks, computed arithmetically in the user's timezone"""
+
+    def __init__(self, weekdays: Iterable[int], interval_weeks: int, at: time, tz: ZoneInfo, anchor: date):
+        self.weekdays = sorted(set(weekdays))
+        if not self.weekdays:
+            raise ValueError("A recurrence needs at least one weekday")
+        self.interval_weeks = interval_weeks
+        self.at = at
+        self.tz = tz
+        self.anchor = anchor
+        # Occurrence weeks are counted from the Monday of the anchor's week
+        self.anchor_monday = anchor - timedelta(days=anchor.weekday())
+
+    @classmethod
+    def from_preferences(
+        cls,
+        frequency: str,
+        preferred_time: str,
+        timezone: str,
+        start: datetime,
+        weekdays: Optional[List[str]] = None
+    ) -> "RecurrenceRule":
+        frequency = frequency.strip().lower()
+        if frequency not in FREQUENCY_INTERVAL_WEEKS:
+            raise ValueError(f"Unsupported check-in frequency: {frequency}")
+        tz = ZoneInfo(timezone)
+        anchor = (start.astimezone(tz) if start.tzinfo else start.replace(tzinfo=tz)).date()
+
+        if weekdays:
+            days = [parse_weekday(day) for day in weekdays]
+        elif frequency == "daily":
+            days = list(range(7))
+        elif frequency == "custom":
+            raise ValueError("Custom check-in frequency needs weekdays")
+        else:
+            days = [anchor.weekday()]
+        return cls(days, FREQUENCY_INTERVAL_WEEKS[frequency], parse_time_of_day(preferred_time), tz, anchor)
+
+    def localize(self, day: date) -> datetime:
+        return datetime.combine(day, self.at, tzinfo=self.tz)
+
+    def occurrences(self, start: datetime, end: Optional[datetime] = None) -> Iterator[datetime]:
+        # Jump straight to the first occurrence week at or after start; never walk day by day
+        start = start if start.tzinfo else start.replace(tzinfo=self.tz)
+        end = end if end is None or end.tzinfo else end.replace(tzinfo=self.tz)
+        start_day = max(start.astimezone(self.tz).date(), self.anchor)
+        weeks_from_anchor = (start_day - self.anchor_monday).days // 7
+        week = -(-weeks_from_anchor // self.interval_weeks) * self.interval_weeks
+        if week > weeks_from_anchor:
+            start_day = self.anchor_monday + timedelta(weeks=week)
+
+        while True:
+            monday = self.anchor_monday + timedelta(weeks=week)
+            for weekday in self.weekdays:
+                day = monday + timedelta(days=weekday)
+                if day < start_day:
+                    continue
+                when = self.localize(day)
+                if when < start:
+                    continue
+                if end is not None and when > end:
+                    return
+                yield when
+            week += self.interval_weeks
+
+    def next(self, count: int, after: datetime) -> List[datetime]:
+        return list(islice(self.occurrences(after), count))
+
+    def between(self, start: datetime, end: datetime) -> List[datetime]:
+        return list(self.occurrences(start, end))
\ No newline at end of file
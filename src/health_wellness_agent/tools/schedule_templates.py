@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, Iterator, Mapping, Optional
+from types import MappingProxyType
+from .recurrence import WEEKDAYS, parse_weekday
+
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Foci that don't count as training sessions when days are moved around
+REST_FOCI = {"rest"}
+
+# Sessions dropped first when the user has fewer days than the template
+RECOVERY_FOCI = {"active_recovery", "mobility"}
+
+def session(focus: str, duration: str, intensity: str) -> Mapping[str, str]:
+    return MappingProxyType({"focus": focus, "duration": duration, "intensity": intensity})
+
+REST_DAY = session("rest", "0 min", "none")
+
+class WeeklySchedule(Mapping[str, Mapping[str, str]]):
+    """Read-only week: a shared frozen template plus only the days this user changed"""
+
+    __slots__ = ("template", "overrides")
+
+    def __init__(self, template: Mapping[str, Mapping[str, str]], overrides: Optional[Mapping[str, Mapping[str, str]]] = None):
+        self.template = template
+        self.overrides = overrides
+
+    def __getitem__(self, day: str) -> Mapping[str, str]:
+        if self.overrides and day in self.overrides:
+            return self.overrides[day]
+        return self.template[day]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.template)
+
+    def __len__(self) -> int:
+        return len(self.template)
+
+    def with_changes(self, changes: Mapping[str, Mapping[str, str]]) -> "WeeklySchedule":
+        # Copy-on-write: the shared template is never touched
+        changes = {day: value for day, value in changes.items() if self[day] is not value}
+        if not changes:
+            return self
+        return WeeklySchedule(self.template, MappingProxyType({**(self.overrides or {}), **changes}))
+
+    def with_available_days(self, available_days: Iterable[str]) -> "WeeklySchedule":
+        # Accepts "Mon", "wed", "Friday"; an unknown name raises ValueError rather than becoming a rest day
+        available = {WEEKDAYS[parse_weekday(day)] for day in available_days}
+        if not available:
+            return self
+
+        # Keep the template's session order, moved onto the days the user can train;
+        # main sessions take priority over recovery ones when days run short
+        sessions = [self[day] for day in self if self[day]["focus"] not in REST_FOCI]
+        main = [day_session for day_session in sessions if day_session["focus"] not in RECOVERY_FOCI]
+        recovery = [day_session for day_session in sessions if day_session["focus"] in RECOVERY_FOCI]
+        sessions = main + recovery
+        training_days = [day for day in self if day in available]
+        changes = {day: REST_DAY for day in self}
+        for day, day_session in zip(training_days, sessions):
+            changes[day] = day_session
+        return self.with_changes(changes)
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        return {day: dict(self[day]) for day in self}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Mapping[str, str]]) -> "WeeklySchedule":
+        # A stored week has no shared template behind it, so every day is its own
+        return cls(MappingProxyType({day: MappingProxyType(dict(day_session)) for day, day_session in data.items()}))
+
+def template(sessions: Dict[str, Mapping[str, str]]) -> WeeklySchedule:
+    return WeeklySchedule(MappingProxyType({day: sessions.get(day, REST_DAY) for day in DAYS_OF_WEEK}))
+
+# Built once at import and shared by every request
+SCHEDULE_TEMPLATES: Mapping[str, WeeklySchedule] = MappingProxyType({
+    "beginner": template({
+        "monday": session("full_body", "30 min", "moderate"),
+        "tuesday": session("active_recovery", "20 min", "low"),
+        "wednesday": session("full_body", "30 min", "moderate"),
+        "friday": session("full_body", "30 min", "moderate"),
+        "saturday": session("mobility", "20 min", "low")
+    }),
+    "intermediate": template({
+        "monday": session("upper_body", "45 min", "moderate"),
+        "tuesday": session("lower_body", "45 min", "moderate"),
+        "wednesday": session("cardio", "30 min", "moderate"),
+        "thursday": session("upper_body", "45 min", "high"),
+        "friday": session("lower_body", "45 min", "high"),
+        "saturday": session("mobility", "30 min", "low")
+    }),
+    "advanced": template({
+        "monday": session("push", "60 min", "high"),
+        "tuesday": session("pull", "60 min", "high"),
+        "wednesday": session("legs", "60 min", "high"),
+        "thursday": session("active_recovery", "30 min", "low"),
+        "friday": session("upper_body", "60 min", "high"),
+        "saturday": session("lower_body", "60 min", "high")
+    })
+})
\ No newline at end of file
@@ -1,13 +1,23 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import datetime, timedelta
-from pydantic import BaseModel
+from itertools import islice
+from pydantic import BaseModel, Field
 from openai.agents import Tool
+from ..utils.llm_client import get_model
+from .recurrence import RecurrenceRule
+from .goal_analyzer import GoalOutput
+import asyncio
+import json
 
 class CheckinSchedule(BaseModel):
     frequency: str
     preferred_time: str
     timezone: str
     reminder_method: str
+    # Check-in weekdays for "custom" frequency, or to pin weekly/biweekly to a day
+    weekdays: List[str] = []
+    # When the schedule started; biweekly weeks and the default weekday count from here
+    anchor: datetime = Field(default_factory=lambda: datetime.now().astimezone())
 
 class ScheduledCheckin(BaseModel):
     datetime: datetime
@@ -15,9 +25,25 @@ class ScheduledCheckin(BaseModel):
     metrics_required: List[str]
     questions: List[str]
 
+# Metrics each goal type asks for at every check-in
+GOAL_METRICS = {
+    "weight_loss": ["weight", "measurements", "energy_level", "diet_compliance"],
+    "weight_gain": ["weight", "measurements", "energy_level", "diet_compliance"],
+    "muscle_gain": ["weight", "measurements", "workout_compliance", "diet_compliance"],
+    "endurance": ["energy_level", "workout_compliance"],
+    "flexibility": ["workout_compliance", "energy_level"],
+    "general_fitness": ["weight", "energy_level", "workout_compliance"]
+}
+
 class CheckinSchedulerTool(Tool):
     name = "checkin_scheduler"
     description = "Schedules and manages regular progress check-ins"
+    # Shared by every tool instance; metrics depend only on the goal type
+    _metrics_cache: Dict[str, Tuple[str, ...]] = {}
+
+    def __init__(self):
+        super().__init__()
+        self.model = get_model('gemini-pro')
 
     async def run(
         self,
@@ -31,26 +57,73 @@ class CheckinSchedulerTool(Tool):
         )
         
         # Create customized check-in content
-        for checkin in checkins:
-            await self.customize_checkin_content(checkin, goal_output)
+        await self.customize_checkins(checkins, goal_output)
         
         return checkins
 
+    async def customize_checkins(self, checkins: List[ScheduledCheckin], goal_output: GoalOutput) -> None:
+        metrics = self.get_required_metrics(goal_output)
+
+        # One question set per check-in type, generated concurrently and shared by every check-in of that type
+        checkin_types = list(dict.fromkeys(checkin.checkin_type for checkin in checkins))
+        question_sets = await asyncio.gather(
+            *(self.generate_checkin_questions(goal_output, checkin_type) for checkin_type in checkin_types)
+        )
+        questions = dict(zip(checkin_types, question_sets))
+
+        # Each check-in gets its own lists, so editing one never changes the others
+        for checkin in checkins:
+            checkin.metrics_required = list(metrics)
+            checkin.questions = list(questions[checkin.checkin_type])
+
     def generate_checkin_schedule(self, preferences: CheckinSchedule, goal_output: GoalOutput) -> List[ScheduledCheckin]:
         # Calculate check-in dates
-        start_date = datetime.now()
+        start_date = datetime.now().astimezone()
         end_date = start_date + timedelta(weeks=goal_output.timeframe_weeks)
-        
-        # Create schedule
-        checkins = []
-        current_date = start_date
-        while current_date <= end_date:
-            if self.should_schedule_checkin(current_date, preferences):
-                checkin = self.create_checkin(current_date, preferences)
-                checkins.append(checkin)
-            current_date += timedelta(days=1)
-        
-        return checkins
+        return list(self.iter_checkins(preferences, start_date, end_date))
+
+    def recurrence_rule(self, preferences: CheckinSchedule) -> RecurrenceRule:
+        return RecurrenceRule.from_preferences(
+            preferences.frequency,
+            preferences.preferred_time,
+            preferences.timezone,
+            preferences.anchor,
+            preferences.weekdays
+        )
+
+    def iter_checkins(
+        self,
+        preferences: CheckinSchedule,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Iterator[ScheduledCheckin]:
+        # Lazy: each check-in is computed only when the caller asks for it
+        rule = self.recurrence_rule(preferences)
+        previous_month = None
+        for when in rule.occurrences(start, end):
+            month = (when.year, when.month)
+            if previous_month is None:
+                # The window may open mid-month; check for an earlier check-in that month
+                month_start = when.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                first_in_month = next(rule.occurrences(month_start)) == when
+            else:
+                first_in_month = month != previous_month
+            previous_month = month
+            yield self.create_checkin(when, "monthly_review" if first_in_month else "progress")
+
+    def next_checkins(self, preferences: CheckinSchedule, count: int, after: datetime) -> List[ScheduledCheckin]:
+        return list(islice(self.iter_checkins(preferences, after), count))
+
+    def checkins_between(self, preferences: CheckinSchedule, start: datetime, end: datetime) -> List[ScheduledCheckin]:
+        return list(self.iter_checkins(preferences, start, end))
+
+    def create_checkin(self, when: datetime, checkin_type: str) -> ScheduledCheckin:
+        return ScheduledCheckin(
+            datetime=when,
+            checkin_type=checkin_type,
+            metrics_required=[],
+            questions=[]
+        )
 
     async def customize_checkin_content(self, checkin: ScheduledCheckin, goal_output: GoalOutput) -> None:
         # Set required metrics based on goal type
@@ -60,4 +133,25 @@ class CheckinSchedulerTool(Tool):
         checkin.questions = await self.generate_checkin_questions(
             goal_output,
             checkin.checkin_type
-        )
\ No newline at end of file
+        )
+
+    def get_required_metrics(self, goal_output: GoalOutput) -> List[str]:
+        goal_type = getattr(goal_output, "goal_type", "general_fitness")
+        metrics = self._metrics_cache.get(goal_type)
+        if metrics is None:
+            metrics = self._metrics_cache[goal_type] = tuple(GOAL_METRICS.get(goal_type, GOAL_METRICS["general_fitness"]))
+        return list(metrics)
+
+    async def generate_checkin_questions(self, goal_output: GoalOutput, checkin_type: str) -> List[str]:
+        prompt = (
+            f"Write 3 to 5 short questions for a {checkin_type.replace('_', ' ')} check-in. "
+            "Answer as a JSON array of strings.\n\n"
+            f"Goal: {getattr(goal_output, 'goal_type', 'general_fitness')}\n"
+            f"Target: {getattr(goal_output, 'target_value', None)}\n"
+            f"Timeframe: {getattr(goal_output, 'timeframe_weeks', None)} weeks"
+        )
+        response = await self.model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        return [str(question) for question in json.loads(response.text)]
\ No newline at end of file
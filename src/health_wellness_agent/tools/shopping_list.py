@@ -0,0 +1,135 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+import threading
+from .food_database import CUPS_PER_UNIT, GRAMS_PER_UNIT, FoodDatabase, get_food_database, parse_ingredient
+
+# Mass is summed in grams and volume in millilitres; other units stay as counted
+ML_PER_CUP = 240
+
+# Known foods are summed in one unit whatever each recipe measured them in: these by volume, the rest by weight
+VOLUME_CATEGORIES = {"beverages"}
+VOLUME_FOODS = {"milk", "olive oil", "lemon juice"}
+
+# Store aisles in walking order; foods without a category go last
+AISLES = [
+    "produce", "meat_seafood", "plant_protein", "dairy_eggs", "bakery",
+    "grains", "legumes", "nuts_seeds", "pantry", "beverages", "other"
+]
+
+class IngredientIndex:
+    """Interns each (food, unit) pair as a small integer shared by every shopping list"""
+
+    def __init__(self, food_db: FoodDatabase):
+        self.food_db = food_db
+        self.ids: Dict[Tuple[str, str], int] = {}
+        self.names: List[str] = []
+        self.units: List[str] = []
+        self.aisles: List[int] = []
+        self._lock = threading.Lock()
+        # Meal plans repeat the same ingredient strings, so each is parsed once
+        self.resolve = lru_cache(maxsize=8192)(self._resolve)
+
+    def intern(self, name: str, unit: str, aisle: str) -> int:
+        key = (name, unit)
+        item_id = self.ids.get(key)
+        if item_id is None:
+            with self._lock:
+                item_id = self.ids.get(key)
+                if item_id is None:
+                    item_id = len(self.names)
+                    self.names.append(name)
+                    self.units.append(unit)
+                    self.aisles.append(AISLES.index(aisle) if aisle in AISLES else AISLES.index("other"))
+                    self.ids[key] = item_id
+        return item_id
+
+    def _resolve(self, ingredient: str) -> Tuple[int, float]:
+        parsed = parse_ingredient(ingredient)
+        food = self.food_db.lookup(parsed.name) if parsed.name else None
+        name = food.name if food is not None else parsed.name or ingredient.strip().lower()
+        aisle = food.category if food is not None and food.category else "other"
+        quantity = parsed.quantity if parsed.quantity is not None else 1.0
+
+        # "1/2 onion" and "30g onion", or "1 cup rice" and "50g rice", become one line
+        grams = self.food_db.ingredient_grams(parsed, food) if food is not None else None
+        if grams is not None:
+            if food.category in VOLUME_CATEGORIES or food.name in VOLUME_FOODS:
+                unit, amount = "ml", grams * ML_PER_CUP / (food.grams_per_cup or ML_PER_CUP)
+            else:
+                unit, amount = "g", grams
+        elif parsed.unit in GRAMS_PER_UNIT:
+            unit, amount = "g", quantity * GRAMS_PER_UNIT[parsed.unit]
+        elif parsed.unit in CUPS_PER_UNIT:
+            unit, amount = "ml", quantity * CUPS_PER_UNIT[parsed.unit] * ML_PER_CUP
+        else:
+            unit, amount = parsed.unit or "count", quantity
+        return self.intern(name, unit, aisle), amount
+
+    def format_item(self, item_id: int, amount: float) -> str:
+        name, unit = self.names[item_id], self.units[item_id]
+        if amount == 0:
+            return name
+        if unit == "g" and amount >= 1000:
+            return f"{name} ({amount / 1000:g} kg)"
+        if unit == "ml" and amount >= 1000:
+            return f"{name} ({amount / 1000:g} l)"
+        if unit in ("g", "ml"):
+            return f"{name} ({round(amount):g} {unit})"
+        if unit == "count":
+            return f"{name} ({round(amount, 2):g})"
+        return f"{name} ({round(amount, 2):g} {unit}{'' if amount == 1 else 's'})"
+
+class ShoppingList:
+    """Running week-long ingredient totals that meals can be added to or removed from"""
+
+    def __init__(self, index: Optional[IngredientIndex] = None):
+        self.index = index or get_ingredient_index()
+        self.amounts: Dict[int, float] = {}
+        # Number of ingredient lines behind each item, so an item leaves the list exactly when its last use does
+        self.uses: Dict[int, int] = {}
+
+    def add_meal(self, ingredients: Iterable[str]) -> None:
+        for ingredient in ingredients:
+            item_id, amount = self.index.resolve(ingredient)
+            self.amounts[item_id] = self.amounts.get(item_id, 0.0) + amount
+            self.uses[item_id] = self.uses.get(item_id, 0) + 1
+
+    def remove_meal(self, ingredients: Iterable[str]) -> None:
+        for ingredient in ingredients:
+            item_id, amount = self.index.resolve(ingredient)
+            if item_id not in self.uses:
+                continue
+            self.uses[item_id] -= 1
+            if self.uses[item_id] == 0:
+                del self.uses[item_id]
+                del self.amounts[item_id]
+            else:
+                self.amounts[item_id] -= amount
+
+    def grouped(self) -> Dict[str, List[str]]:
+        index = self.index
+        item_ids = sorted(self.amounts, key=lambda item_id: (index.aisles[item_id], index.names[item_id], index.units[item_id]))
+        groups: Dict[str, List[str]] = {}
+        for item_id in item_ids:
+            groups.setdefault(AISLES[index.aisles[item_id]], []).append(index.format_item(item_id, self.amounts[item_id]))
+        return groups
+
+    def copy(self) -> "ShoppingList":
+        shopping_list = ShoppingList(self.index)
+        shopping_list.amounts = dict(self.amounts)
+        shopping_list.uses = dict(self.uses)
+        return shopping_list
+
+    def __deepcopy__(self, memo) -> "ShoppingList":
+        # The interned index is shared process-wide; only the totals belong to this list
+        return self.copy()
+
+_ingredient_index: Optional[IngredientIndex] = None
+_ingredient_index_lock = threading.Lock()
+
+def get_ingredient_index() -> IngredientIndex:
+    global _ingredient_index
+    with _ingredient_index_lock:
+        if _ingredient_index is None:
+            _ingredient_index = IngredientIndex(get_food_database())
+        return _ingredient_index
\ No newline at end of file
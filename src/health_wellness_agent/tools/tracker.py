@@ -1,7 +1,15 @@
-from typing import List, Dict, Optional
-from datetime import datetime
-from pydantic import BaseModel
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Union
+from bisect import insort
+from datetime import datetime, timezone
+import sys
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ConfigDict, field_serializer
 from openai.agents import Tool
+from ..utils.anomaly import ANOMALY_WINDOW, AnomalyDetector, AnomalyTrigger
+from ..utils.trend_stats import TREND_METRICS, TrendState
+from .forecasting import GOAL_DIRECTION, GOAL_FORECAST_METRIC, GoalForecaster
+from .goal_analyzer import GoalOutput
 
 class ProgressMetrics(BaseModel):
     date: datetime
@@ -12,27 +20,193 @@ class ProgressMetrics(BaseModel):
     diet_compliance: Optional[float] = None
     notes: Optional[str] = None
 
+# Scalar ProgressMetrics fields, stored as float columns with NaN for missing values
+SCALAR_COLUMNS = ["weight", "energy_levels", "workout_compliance", "diet_compliance"]
+INTEGER_COLUMNS = {"energy_levels"}
+
+def to_datetime64(when: datetime) -> np.datetime64:
+    # Aware datetimes are kept as naive UTC, like the database
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(when, "us")
+
+class MetricsStore(Sequence[ProgressMetrics]):
+    """One user's check-ins as date-ordered columns; ProgressMetrics objects are only built when read"""
+
+    def __init__(self, capacity: int = 32):
+        self.size = 0
+        self.dates = np.empty(capacity, dtype="datetime64[us]")
+        # Scalar rows first, then one row per measurement key from its first appearance
+        self.values = np.full((len(SCALAR_COLUMNS), capacity), np.nan)
+        self.columns: Dict[str, int] = {name: row for row, name in enumerate(SCALAR_COLUMNS)}
+        self.measurement_keys: Dict[str, int] = {}
+        self.notes = np.full(capacity, None, dtype=object)
+
+    @classmethod
+    def from_history(cls, history: Iterable[ProgressMetrics]) -> "MetricsStore":
+        store = cls()
+        for metrics in history:
+            store.add(metrics)
+        return store
+
+    @property
+    def capacity(self) -> int:
+        return self.dates.shape[0]
+
+    def _resize(self, capacity: int) -> None:
+        dates = np.empty(capacity, dtype=self.dates.dtype)
+        dates[:self.size] = self.dates[:self.size]
+        values = np.full((self.values.shape[0], capacity), np.nan)
+        values[:, :self.size] = self.values[:, :self.size]
+        notes = np.full(capacity, None, dtype=object)
+        notes[:self.size] = self.notes[:self.size]
+        self.dates, self.values, self.notes = dates, values, notes
+
+    def _measurement_row(self, key: str) -> int:
+        row = self.measurement_keys.get(key)
+        if row is None:
+            row = self.measurement_keys[sys.intern(key)] = self.values.shape[0]
+            self.values = np.vstack([self.values, np.full((1, self.capacity), np.nan)])
+        return row
+
+    def add(self, metrics: ProgressMetrics) -> int:
+        when = to_datetime64(metrics.date)
+        if self.size == self.capacity:
+            self._resize(self.capacity * 2)
+
+        # In-order check-ins append; a late one shifts the tail right by one slot
+        position = self.size
+        if self.size and self.dates[self.size - 1] > when:
+            position = int(np.searchsorted(self.dates[:self.size], when, side="right"))
+            self.dates[position + 1:self.size + 1] = self.dates[position:self.size]
+            self.values[:, position + 1:self.size + 1] = self.values[:, position:self.size]
+            self.notes[position + 1:self.size + 1] = self.notes[position:self.size]
+
+        for key in metrics.measurements or {}:
+            self._measurement_row(key)
+        self.dates[position] = when
+        self.values[:, position] = np.nan
+        for name in SCALAR_COLUMNS:
+            value = getattr(metrics, name)
+            if value is not None:
+                self.values[self.columns[name], position] = value
+        for key, value in (metrics.measurements or {}).items():
+            self.values[self.measurement_keys[key], position] = value
+        self.notes[position] = metrics.notes
+        self.size += 1
+        return position
+
+    # Views share the store's buffers; they are valid until the next add
+    def date_view(self) -> np.ndarray:
+        return self.dates[:self.size]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[self.columns[name], :self.size]
+
+    def measurement(self, key: str) -> np.ndarray:
+        row = self.measurement_keys.get(key)
+        if row is None:
+            return np.full(self.size, np.nan)
+        return self.values[row, :self.size]
+
+    def to_frame(self) -> pd.DataFrame:
+        # One float block over the same buffer, transposed to one row per check-in
+        names = SCALAR_COLUMNS + [f"measurements.{key}" for key in self.measurement_keys]
+        return pd.DataFrame(
+            self.values[:, :self.size].T,
+            index=pd.DatetimeIndex(self.dates[:self.size], name="date"),
+            columns=names,
+            copy=False
+        )
+
+    def date_at(self, index: int) -> datetime:
+        return self.dates[index].astype(datetime)
+
+    def values_at(self, index: int) -> Dict[str, Optional[float]]:
+        values = self.values[:, index]
+        return {
+            name: None if np.isnan(values[row]) else float(values[row])
+            for name, row in self.columns.items()
+        }
+
+    def metrics_at(self, index: int) -> ProgressMetrics:
+        values = self.values[:, index]
+        scalars = {
+            name: None if np.isnan(values[row]) else (int(values[row]) if name in INTEGER_COLUMNS else float(values[row]))
+            for name, row in self.columns.items()
+        }
+        measurements = {
+            key: float(values[row]) for key, row in self.measurement_keys.items() if not np.isnan(values[row])
+        }
+        return ProgressMetrics(
+            date=self.date_at(index),
+            measurements=measurements or None,
+            notes=self.notes[index],
+            **scalars
+        )
+
+    def between(self, start: datetime, end: datetime) -> List[ProgressMetrics]:
+        first = int(np.searchsorted(self.dates[:self.size], to_datetime64(start), side="left"))
+        last = int(np.searchsorted(self.dates[:self.size], to_datetime64(end), side="right"))
+        return [self.metrics_at(index) for index in range(first, last)]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.metrics_at(position) for position in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("MetricsStore index out of range")
+        return self.metrics_at(index)
+
+    def __iter__(self) -> Iterator[ProgressMetrics]:
+        for index in range(self.size):
+            yield self.metrics_at(index)
+
 class ProgressAnalysis(BaseModel):
-    metrics_history: List[ProgressMetrics]
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    metrics_history: Union[MetricsStore, List[ProgressMetrics]]
     trend_analysis: Dict[str, float]
     goal_progress: Dict[str, float]
     recommendations: Dict[str, str]
+    anomalies: List[AnomalyTrigger] = []
+
+    @field_serializer('metrics_history')
+    def dump_metrics_history(self, history: Union[MetricsStore, List[ProgressMetrics]]) -> List[ProgressMetrics]:
+        # Same list-of-check-ins shape as before the columnar store
+        return list(history)
 
 class ProgressTrackerTool(Tool):
     name = "progress_tracker"
     description = "Tracks and analyzes user progress towards health and fitness goals"
+    forecaster = GoalForecaster()
 
     async def run(
         self,
         new_metrics: ProgressMetrics,
         goal_output: GoalOutput,
-        history: List[ProgressMetrics]
+        history: Union[MetricsStore, List[ProgressMetrics]],
+        trend_state: Optional[TrendState] = None,
+        anomaly_detector: Optional[AnomalyDetector] = None
     ) -> ProgressAnalysis:
+        # Judge the check-in against the baseline before it joins history
+        if anomaly_detector is None:
+            anomaly_detector = self.build_anomaly_detector(history)
+        anomalies = anomaly_detector.observe(new_metrics.date, self.metric_values(new_metrics))
+
         # Update metrics history
         updated_history = self.update_history(history, new_metrics)
         
-        # Analyze trends
-        trends = self.analyze_trends(updated_history)
+        # Analyze trends; a persisted state (as of before this check-in) only takes the new values
+        if trend_state is None:
+            trend_state = self.build_trend_state(updated_history)
+        else:
+            self.update_trend_state(trend_state, new_metrics)
+        trends = self.analyze_trends(trend_state)
         
         # Calculate progress towards goals
         progress = self.calculate_goal_progress(updated_history, goal_output)
@@ -48,39 +222,81 @@ class ProgressTrackerTool(Tool):
             metrics_history=updated_history,
             trend_analysis=trends,
             goal_progress=progress,
-            recommendations=recommendations
+            recommendations=recommendations,
+            anomalies=anomalies
         )
 
-    def update_history(self, history: List[ProgressMetrics], new_metrics: ProgressMetrics) -> List[ProgressMetrics]:
+    def update_history(
+        self,
+        history: Union[MetricsStore, List[ProgressMetrics]],
+        new_metrics: ProgressMetrics
+    ) -> Union[MetricsStore, List[ProgressMetrics]]:
         # Validate new metrics
         self.validate_metrics(new_metrics)
         
-        # Add to history
+        if isinstance(history, MetricsStore):
+            history.add(new_metrics)
+            return history
+
+        # The caller's list is left alone. Check-ins usually arrive in order and
+        # append; a late entry is placed by binary search instead of re-sorting
         updated_history = history.copy()
-        updated_history.append(new_metrics)
-        
-        # Sort by date
-        return sorted(updated_history, key=lambda x: x.date)
-
-    def analyze_trends(self, history: List[ProgressMetrics]) -> Dict[str, float]:
-        # Calculate rate of change for each metric
-        trends = {}
-        for metric in ["weight", "energy_levels", "workout_compliance", "diet_compliance"]:
-            trends[f"{metric}_trend"] = self.calculate_trend(history, metric)
-        return trends
-
-    def calculate_goal_progress(self, history: List[ProgressMetrics], goal_output: GoalOutput) -> Dict[str, float]:
-        # Calculate progress percentage
-        initial = history[0]
-        current = history[-1]
-        target = goal_output.target_value
-        
-        progress = {
-            "overall_progress": self.calculate_overall_progress(initial, current, target),
-            "weekly_progress": self.calculate_weekly_progress(history),
-            "projected_completion": self.project_completion_time(history, target)
-        }
-        return progress
+        if not updated_history or updated_history[-1].date <= new_metrics.date:
+            updated_history.append(new_metrics)
+        else:
+            insort(updated_history, new_metrics, key=lambda metrics: metrics.date)
+        return updated_history
+
+    def build_trend_state(self, history: Union[MetricsStore, List[ProgressMetrics]]) -> TrendState:
+        # One pass over history for callers without a persisted state
+        state = TrendState()
+        if isinstance(history, MetricsStore):
+            for index in range(len(history)):
+                state.update(history.date_at(index), history.values_at(index))
+            return state
+        for metrics in history:
+            self.update_trend_state(state, metrics)
+        return state
+
+    def update_trend_state(self, state: TrendState, metrics: ProgressMetrics) -> None:
+        state.update(metrics.date, self.metric_values(metrics))
+
+    def metric_values(self, metrics: ProgressMetrics) -> Dict[str, Optional[float]]:
+        return {metric: getattr(metrics, metric) for metric in TREND_METRICS}
+
+    def build_anomaly_detector(self, history: Union[MetricsStore, List[ProgressMetrics]]) -> AnomalyDetector:
+        # Only the last window of check-ins forms the baseline
+        detector = AnomalyDetector()
+        for index in range(max(len(history) - ANOMALY_WINDOW, 0), len(history)):
+            if isinstance(history, MetricsStore):
+                detector.observe(history.date_at(index), history.values_at(index))
+            else:
+                detector.observe(history[index].date, self.metric_values(history[index]))
+        return detector
+
+    def analyze_trends(self, trend_state: TrendState) -> Dict[str, float]:
+        # Rate of change per day, EWMA and rolling mean for each metric, read from the accumulators
+        return trend_state.summary()
+
+    def calculate_goal_progress(self, history: Union[MetricsStore, List[ProgressMetrics]], goal_output: GoalOutput) -> Dict[str, float]:
+        # Progress, weekly rate and projected completion (days, with a confidence band) from the forecaster
+        goal_type = getattr(goal_output, "goal_type", "general_fitness")
+        metric = GOAL_FORECAST_METRIC.get(goal_type)
+        if metric is None or not len(history):
+            return {}
+        if isinstance(history, MetricsStore):
+            dates, values = history.date_view(), history.column(metric)
+        else:
+            dates = np.array([to_datetime64(metrics.date) for metrics in history])
+            values = np.array([getattr(metrics, metric) for metrics in history], dtype=np.float64)
+        observed = values[~np.isnan(values)]
+        if not len(observed):
+            return {}
+
+        # target_value is the change from the first check-in, as for stored goals
+        target = observed[0] + GOAL_DIRECTION[goal_type] * goal_output.target_value
+        forecast = self.forecaster.forecast(np.zeros(len(values), dtype=np.int64), dates, values, {0: target})
+        return forecast.row(0)
 
     async def generate_recommendations(self, progress: Dict[str, float], trends: Dict[str, float], goal_output: GoalOutput) -> Dict[str, str]:
         # Analyze progress and trends
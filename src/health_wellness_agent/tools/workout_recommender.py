@@ -1,22 +1,59 @@
-from typing import List, Dict, Optional
-from pydantic import BaseModel
+from typing import Any, List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, field_serializer, field_validator
 from openai.agents import Tool
-from ..config import GEMINI_API_KEY
-import google.generativeai as genai
+from ..utils.llm_client import get_model
+from .exercise_catalog import get_exercise_catalog
+from .goal_analyzer import GoalOutput
+from .progression import ProgressionEngine, ProgressionPlan
+from .schedule_templates import SCHEDULE_TEMPLATES, WeeklySchedule
+import json
 
 class FitnessLevel(BaseModel):
     experience: str  # "beginner", "intermediate", "advanced"
     current_activity: str
     limitations: List[str] = []
+    # Empty means no restriction on equipment
+    available_equipment: List[str] = []
+    # Empty means the template's days are kept
+    available_days: List[str] = []
 
 class WorkoutPlan(BaseModel):
-    weekly_schedule: Dict[str, Dict[str, str]]
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # Shared template plus per-user overrides; dumps as a plain dict for the JSON column
+    weekly_schedule: WeeklySchedule
     exercises: List[Dict[str, str]]
-    progression_plan: Dict[str, str]
+    # Reads like Dict[str, str] and dumps as one
+    progression_plan: ProgressionPlan
+
+    @field_validator('weekly_schedule', mode='before')
+    @classmethod
+    def load_weekly_schedule(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            return WeeklySchedule.from_dict(value)
+        return value
+
+    @field_validator('progression_plan', mode='before')
+    @classmethod
+    def load_progression_plan(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            return ProgressionPlan.from_dict(value)
+        return value
+
+    @field_serializer('weekly_schedule')
+    def dump_weekly_schedule(self, schedule: WeeklySchedule) -> Dict[str, Dict[str, str]]:
+        return schedule.to_dict()
+
+    @field_serializer('progression_plan')
+    def dump_progression_plan(self, plan: ProgressionPlan) -> Dict[str, str]:
+        return plan.to_dict()
 
 class WorkoutRecommenderTool(Tool):
     name = "workout_recommender"
     description = "Generates personalized workout plans based on user goals and fitness level"
+    coaching_notes: bool = False
+    # Periodization by experience level
+    periodization: Dict[str, str] = {"beginner": "linear", "intermediate": "undulating", "advanced": "block"}
 
     async def run(self, goal_output: GoalOutput, fitness_level: FitnessLevel) -> WorkoutPlan:
         # Generate base workout schedule
@@ -28,11 +65,14 @@ class WorkoutRecommenderTool(Tool):
             fitness_level,
             schedule
         )
+        if self.coaching_notes:
+            exercises = await self.add_coaching_notes(exercises, goal_output, fitness_level)
         
         # Create progression plan
         progression = self.create_progression_plan(
             exercises,
-            goal_output.timeframe_weeks
+            goal_output.timeframe_weeks,
+            self.periodization.get(fitness_level.experience, "linear")
         )
         
         return WorkoutPlan(
@@ -41,31 +81,56 @@ class WorkoutRecommenderTool(Tool):
             progression_plan=progression
         )
 
-    def create_weekly_schedule(self, fitness_level: FitnessLevel) -> Dict[str, Dict[str, str]]:
-        # Create schedule based on experience level
-        if fitness_level.experience == "beginner":
-            return self.create_beginner_schedule()
-        elif fitness_level.experience == "intermediate":
-            return self.create_intermediate_schedule()
-        else:
-            return self.create_advanced_schedule()
+    def create_weekly_schedule(self, fitness_level: FitnessLevel) -> WeeklySchedule:
+        # Start from the shared template for the experience level; only changed days are copied
+        template = SCHEDULE_TEMPLATES.get(fitness_level.experience, SCHEDULE_TEMPLATES["advanced"])
+        return template.with_available_days(fitness_level.available_days)
 
     def __init__(self):
         super().__init__()
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = get_model('gemini-pro')
+        self.catalog = get_exercise_catalog()
+        self.progression_engine = ProgressionEngine()
+
+    def select_exercises(self, goal_output: GoalOutput, fitness_level: FitnessLevel, schedule: WeeklySchedule) -> List[Dict[str, str]]:
+        # Selected locally from the bundled catalog; no model call on this path
+        return self.catalog.select_week(
+            schedule,
+            goal_type=getattr(goal_output, "goal_type", "general_fitness"),
+            experience=fitness_level.experience,
+            limitations=fitness_level.limitations,
+            available_equipment=fitness_level.available_equipment
+        )
 
-    async def select_exercises(self, goal_output: GoalOutput, fitness_level: FitnessLevel, schedule: Dict[str, Dict[str, str]]) -> List[Dict[str, str]]:
-        prompt = self.create_exercise_prompt(goal_output, fitness_level, schedule)
-        response = await self.model.generate_content(prompt)
-        return self.parse_exercise_recommendations(response.text)
+    async def add_coaching_notes(self, exercises: List[Dict[str, str]], goal_output: GoalOutput, fitness_level: FitnessLevel) -> List[Dict[str, str]]:
+        prompt = self.create_coaching_prompt(exercises, goal_output, fitness_level)
+        try:
+            response = await self.model.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            notes = json.loads(response.text)
+        except Exception:
+            # Coaching text is optional; the plan stands without it
+            return exercises
 
-    def create_progression_plan(self, exercises: List[Dict[str, str]], timeframe: int) -> Dict[str, str]:
-        # Create progressive overload plan
-        progression = {}
         for exercise in exercises:
-            progression[exercise["name"]] = self.plan_exercise_progression(
-                exercise,
-                timeframe
-            )
-        return progression
\ No newline at end of file
+            note = notes.get(exercise["name"]) if isinstance(notes, dict) else None
+            if isinstance(note, str):
+                exercise["coaching"] = note
+        return exercises
+
+    def create_coaching_prompt(self, exercises: List[Dict[str, str]], goal_output: GoalOutput, fitness_level: FitnessLevel) -> str:
+        names = sorted({exercise["name"] for exercise in exercises})
+        return (
+            "Write one short coaching cue for each exercise below. "
+            "Answer as a JSON object mapping exercise name to cue.\n\n"
+            f"Goal: {getattr(goal_output, 'goal_type', 'general_fitness')}\n"
+            f"Experience: {fitness_level.experience}\n"
+            f"Limitations: {', '.join(fitness_level.limitations) or 'none'}\n"
+            f"Exercises: {', '.join(names)}"
+        )
+
+    def create_progression_plan(self, exercises: List[Dict[str, str]], timeframe: int, scheme: str = "linear") -> ProgressionPlan:
+        # Create progressive overload plan for every exercise and week at once
+        return self.progression_engine.build(exercises, timeframe, scheme)
\ No newline at end of file
@@ -0,0 +1,132 @@
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timezone
+from statistics import median
+import asyncio
+from pydantic import BaseModel
+
+# Check-ins per metric kept as the baseline, and how many are needed before judging
+ANOMALY_WINDOW = 14
+MIN_BASELINE = 4
+
+# Robust z-score (deviation over 1.4826 * MAD) that counts as an anomaly, and twice that as urgent
+ANOMALY_Z = 3.5
+URGENT_Z = 7.0
+
+# metric: (trigger, direction that matters, scale floor, smallest change worth escalating)
+ANOMALY_RULES = {
+    "weight": ("rapid_weight_loss", -1, 0.3, 1.5),
+    "energy_levels": ("energy_collapse", -1, 0.5, 3.0),
+    "workout_compliance": ("workout_compliance_drop", -1, 0.05, 0.4),
+    "diet_compliance": ("diet_compliance_drop", -1, 0.05, 0.4)
+}
+
+class AnomalyTrigger(BaseModel):
+    metric: str
+    trigger: str
+    value: float
+    baseline: float
+    score: float
+    urgency: str
+    detected_at: datetime
+
+class MetricDetector:
+    """Rolling median/MAD baseline of one metric over a fixed window"""
+
+    __slots__ = ("window",)
+
+    def __init__(self, values: Optional[List[float]] = None):
+        self.window: deque = deque(values or [], maxlen=ANOMALY_WINDOW)
+
+    def score(self, value: float, scale_floor: float) -> Optional[Tuple[float, float]]:
+        if len(self.window) < MIN_BASELINE:
+            return None
+        baseline = median(self.window)
+        mad = median(abs(previous - baseline) for previous in self.window)
+        return (value - baseline) / max(1.4826 * mad, scale_floor), baseline
+
+    def add(self, value: float) -> None:
+        self.window.append(value)
+
+class AnomalyDetector:
+    """One user's per-metric baselines; each check-in is judged and absorbed in O(window)"""
+
+    def __init__(self, detectors: Optional[Dict[str, MetricDetector]] = None, last_seen: Optional[float] = None):
+        self.detectors = detectors or {metric: MetricDetector() for metric in ANOMALY_RULES}
+        self.last_seen = last_seen
+
+    def observe(self, when: datetime, values: Mapping[str, Optional[float]]) -> List[AnomalyTrigger]:
+        # Late check-ins describe the past, so they neither trigger nor shift the baseline
+        timestamp = (when if when.tzinfo else when.replace(tzinfo=timezone.utc)).timestamp()
+        if self.last_seen is not None and timestamp < self.last_seen:
+            return []
+        self.last_seen = timestamp
+
+        triggers = []
+        for metric, detector in self.detectors.items():
+            value = values.get(metric)
+            if value is None:
+                continue
+            trigger, direction, scale_floor, min_change = ANOMALY_RULES[metric]
+            scored = detector.score(float(value), scale_floor)
+            detector.add(float(value))
+            if scored is None:
+                continue
+            score, baseline = scored
+            if score * direction >= ANOMALY_Z and (value - baseline) * direction >= min_change:
+                triggers.append(AnomalyTrigger(
+                    metric=metric,
+                    trigger=trigger,
+                    value=float(value),
+                    baseline=baseline,
+                    score=round(score, 2),
+                    urgency="high" if score * direction >= URGENT_Z else "medium",
+                    detected_at=when
+                ))
+        return triggers
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "last_seen": self.last_seen,
+            "windows": {metric: list(detector.window) for metric, detector in self.detectors.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]]) -> "AnomalyDetector":
+        detector = cls(last_seen=(data or {}).get("last_seen"))
+        for metric, window in (data or {}).get("windows", {}).items():
+            if metric in detector.detectors:
+                detector.detectors[metric] = MetricDetector(window)
+        return detector
+
+class AnomalySink(ABC):
+    @abstractmethod
+    async def emit(self, user_id: int, triggers: List[AnomalyTrigger]) -> None:
+        """Hand anomalies to whatever escalates them"""
+        pass
+
+class LocalAnomalySink(AnomalySink):
+    """In-process sink for tests and local runs; keeps every trigger in order"""
+
+    def __init__(self):
+        self.emitted: List[Tuple[int, AnomalyTrigger]] = []
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(self, user_id: int, triggers: List[AnomalyTrigger]) -> None:
+        for trigger in triggers:
+            self.emitted.append((user_id, trigger))
+        self.queue.put_nowait((user_id, triggers))
+
+class EscalationSink(AnomalySink):
+    """Hands anomalies straight to the escalation agent, recorded on the user's session context"""
+
+    def __init__(self, agent: Any, contexts: Callable[[int], Any]):
+        # agent is an EscalationAgent, untyped so the detector doesn't depend on the agents SDK;
+        # contexts returns the session context of a user id
+        self.agent = agent
+        self.contexts = contexts
+
+    async def emit(self, user_id: int, triggers: List[AnomalyTrigger]) -> None:
+        if triggers:
+            self.agent.escalate_anomalies(triggers, self.contexts(user_id))
\ No newline at end of file
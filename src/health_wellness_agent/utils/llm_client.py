@@ -0,0 +1,160 @@
+from typing import Any, Callable, Dict, Optional, Set
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+import asyncio
+import os
+import threading
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# How long close() lets in-flight calls finish before cancelling them
+CLOSE_TIMEOUT = 30.0
+
+@dataclass
+class LLMResponse:
+    text: str
+
+class LLMBackend(ABC):
+    @abstractmethod
+    async def generate(self, model_name: str, prompt: str, **kwargs) -> str:
+        """Send one prompt to the named model and return the response text"""
+        pass
+
+    async def aclose(self) -> None:
+        """Release any pooled connections held by the backend"""
+        pass
+
+class GeminiBackend(LLMBackend):
+    def __init__(self, api_key: Optional[str] = None):
+        import google.generativeai as genai
+
+        if api_key is None:
+            from ..config import GEMINI_API_KEY
+            api_key = GEMINI_API_KEY
+
+        # Configure once per process; the SDK keeps a single async channel
+        # that every model handle below reuses
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: Dict[str, Any] = {}
+
+    def get_model(self, model_name: str) -> Any:
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = self._genai.GenerativeModel(model_name)
+        return model
+
+    async def generate(self, model_name: str, prompt: str, **kwargs) -> str:
+        response = await self.get_model(model_name).generate_content_async(prompt, **kwargs)
+        return response.text
+
+class LocalBackend(LLMBackend):
+    """In-process stand-in for offline development, tests and benchmarks"""
+
+    def __init__(self, responder: Optional[Callable[[str, str], str]] = None, latency: float = 0.0):
+        self.responder = responder or (lambda model_name, prompt: "")
+        self.latency = latency
+        self.calls = 0
+
+    async def generate(self, model_name: str, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.responder(model_name, prompt)
+
+class ModelHandle:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def client(self) -> "LLMClient":
+        # Handles follow the process-wide client, so swapping the backend
+        # with configure_llm_client() reaches every existing handle
+        return get_llm_client()
+
+    async def generate_content(self, prompt: str, **kwargs) -> LLMResponse:
+        return await self.client.generate(self.model_name, prompt, **kwargs)
+
+    def generate_content_sync(self, prompt: str, **kwargs) -> LLMResponse:
+        return self.client.generate_sync(self.model_name, prompt, **kwargs)
+
+class LLMClient:
+    def __init__(self, backend: LLMBackend, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def _submit(self, model_name: str, prompt: str, **kwargs) -> Future:
+        # All backend I/O runs on one dedicated loop so pooled connections stay
+        # bound to a single loop no matter which thread or loop calls us
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-client", daemon=True)
+                thread.start()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._loop, self._thread = loop, thread
+            # Each call keeps the semaphore it started with, so close() can't pull it away mid-call
+            future = asyncio.run_coroutine_threadsafe(
+                self._throttled_generate(self._semaphore, model_name, prompt, **kwargs),
+                self._loop
+            )
+            self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    async def _throttled_generate(self, semaphore: asyncio.Semaphore, model_name: str, prompt: str, **kwargs) -> str:
+        async with semaphore:
+            return await self.backend.generate(model_name, prompt, **kwargs)
+
+    async def generate(self, model_name: str, prompt: str, **kwargs) -> LLMResponse:
+        future = self._submit(model_name, prompt, **kwargs)
+        return LLMResponse(text=await asyncio.wrap_future(future))
+
+    def generate_sync(self, model_name: str, prompt: str, **kwargs) -> LLMResponse:
+        return LLMResponse(text=self._submit(model_name, prompt, **kwargs).result())
+
+    def close(self, timeout: float = CLOSE_TIMEOUT) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            pending = list(self._pending)
+            self._loop = self._thread = self._semaphore = None
+        if loop is None:
+            return
+        # Calls already in flight finish on the old loop; any still running after the timeout are cancelled
+        _, unfinished = wait(pending, timeout=timeout)
+        for future in unfinished:
+            future.cancel()
+        asyncio.run_coroutine_threadsafe(self.backend.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+def get_llm_client() -> LLMClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(GeminiBackend())
+        return _client
+
+def configure_llm_client(
+    backend: Optional[LLMBackend] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> LLMClient:
+    global _client
+    with _client_lock:
+        previous = _client
+        _client = LLMClient(backend or GeminiBackend(), max_concurrency=max_concurrency)
+    if previous is not None:
+        previous.close()
+    return _client
+
+def get_model(model_name: str) -> ModelHandle:
+    return ModelHandle(model_name)
\ No newline at end of file
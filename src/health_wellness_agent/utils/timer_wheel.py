@@ -0,0 +1,61 @@
+from typing import Any, Hashable, List, Sequence, Tuple
+import heapq
+import math
+
+# Level 0 ticks through an hour of minutes, then hours of a day, then days of about two months
+DEFAULT_LEVELS = (60, 24, 64)
+
+class TimerWheel:
+    """Hierarchical timing wheel: each tick touches one slot, cascading coarser slots as they come up"""
+
+    def __init__(self, tick_seconds: float, start: float, levels: Sequence[int] = DEFAULT_LEVELS):
+        self.tick_seconds = tick_seconds
+        self.current = math.floor(start / tick_seconds)
+        self.levels = list(levels)
+        # Ticks covered by one slot at each level
+        self.spans = [math.prod(self.levels[:level]) for level in range(len(self.levels))]
+        self.slots: List[List[List[Tuple[int, Hashable]]]] = [[[] for _ in range(size)] for size in self.levels]
+        # Timers beyond the top level wait here until they come within range
+        self.overflow: List[Tuple[int, int, Hashable]] = []
+        self._sequence = 0
+        self.size = 0
+
+    def add(self, due: float, item: Hashable) -> None:
+        self.size += 1
+        self._place(max(math.ceil(due / self.tick_seconds), self.current), item)
+
+    def _place(self, due_tick: int, item: Hashable) -> None:
+        for level, (size, span) in enumerate(zip(self.levels, self.spans)):
+            # Slots are compared at this level's granularity, so a slot never wraps onto an active one
+            if due_tick // span - self.current // span < size:
+                self.slots[level][(due_tick // span) % size].append((due_tick, item))
+                return
+        heapq.heappush(self.overflow, (due_tick, self._sequence, item))
+        self._sequence += 1
+
+    def advance(self, now: float) -> List[Any]:
+        # Fire every timer due at or before now
+        target = math.floor(now / self.tick_seconds)
+        due = []
+        while self.current <= target:
+            tick = self.current
+            for level in range(len(self.levels) - 1, 0, -1):
+                span = self.spans[level]
+                if tick % span == 0:
+                    slot = self.slots[level][(tick // span) % self.levels[level]]
+                    self.slots[level][(tick // span) % self.levels[level]] = []
+                    for due_tick, item in slot:
+                        self._place(due_tick, item)
+            top_span = self.spans[-1]
+            while self.overflow and self.overflow[0][0] // top_span - tick // top_span < self.levels[-1]:
+                due_tick, _, item = heapq.heappop(self.overflow)
+                self._place(due_tick, item)
+
+            slot = self.slots[0][tick % self.levels[0]]
+            if slot:
+                self.slots[0][tick % self.levels[0]] = []
+                due.extend(item for _, item in slot)
+            self.current += 1
+
+        self.size -= len(due)
+        return due
\ No newline at end of file
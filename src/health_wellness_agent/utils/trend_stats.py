@@ -0,0 +1,119 @@
+from typing import Any, Dict, Mapping, Optional
+from collections import deque
+from datetime import datetime, timezone
+
+TREND_METRICS = ["weight", "energy_levels", "workout_compliance", "diet_compliance"]
+
+EWMA_ALPHA = 0.3
+# Check-ins kept for the rolling mean
+ROLLING_WINDOW = 7
+SECONDS_PER_DAY = 86400.0
+
+class TrendAccumulator:
+    """Running least-squares slope, EWMA and rolling mean of one metric, updated in O(1) per check-in"""
+
+    __slots__ = ("origin", "count", "sum_t", "sum_y", "sum_tt", "sum_ty", "ewma", "window", "window_sum")
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        # Time is measured in days from the first check-in so the sums stay small
+        self.origin: Optional[float] = None
+        self.count = 0
+        self.sum_t = 0.0
+        self.sum_y = 0.0
+        self.sum_tt = 0.0
+        self.sum_ty = 0.0
+        self.ewma: Optional[float] = None
+        self.window: deque = deque(maxlen=window)
+        self.window_sum = 0.0
+
+    def add(self, when: datetime, value: float) -> None:
+        # Naive datetimes are UTC, as stored in the database
+        timestamp = (when if when.tzinfo else when.replace(tzinfo=timezone.utc)).timestamp()
+        if self.origin is None:
+            self.origin = timestamp
+        t = (timestamp - self.origin) / SECONDS_PER_DAY
+        self.count += 1
+        self.sum_t += t
+        self.sum_y += value
+        self.sum_tt += t * t
+        self.sum_ty += t * value
+
+        # EWMA and the window follow arrival order; the slope doesn't depend on it
+        self.ewma = value if self.ewma is None else self.ewma + EWMA_ALPHA * (value - self.ewma)
+        if len(self.window) == self.window.maxlen:
+            self.window_sum -= self.window[0]
+        self.window.append(value)
+        self.window_sum += value
+
+    @property
+    def slope(self) -> float:
+        # Change per day
+        denominator = self.count * self.sum_tt - self.sum_t * self.sum_t
+        if self.count < 2 or denominator <= 1e-12:
+            return 0.0
+        return (self.count * self.sum_ty - self.sum_t * self.sum_y) / denominator
+
+    @property
+    def mean(self) -> float:
+        return self.sum_y / self.count if self.count else 0.0
+
+    @property
+    def rolling_mean(self) -> float:
+        return self.window_sum / len(self.window) if self.window else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "origin": self.origin,
+            "count": self.count,
+            "sum_t": self.sum_t,
+            "sum_y": self.sum_y,
+            "sum_tt": self.sum_tt,
+            "sum_ty": self.sum_ty,
+            "ewma": self.ewma,
+            "window": list(self.window),
+            "window_size": self.window.maxlen
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TrendAccumulator":
+        accumulator = cls(data.get("window_size", ROLLING_WINDOW))
+        accumulator.origin = data.get("origin")
+        accumulator.count = data.get("count", 0)
+        accumulator.sum_t = data.get("sum_t", 0.0)
+        accumulator.sum_y = data.get("sum_y", 0.0)
+        accumulator.sum_tt = data.get("sum_tt", 0.0)
+        accumulator.sum_ty = data.get("sum_ty", 0.0)
+        accumulator.ewma = data.get("ewma")
+        accumulator.window.extend(data.get("window", []))
+        accumulator.window_sum = float(sum(accumulator.window))
+        return accumulator
+
+class TrendState:
+    """One user's accumulators for every tracked metric"""
+
+    def __init__(self, accumulators: Optional[Dict[str, TrendAccumulator]] = None):
+        self.accumulators = accumulators or {metric: TrendAccumulator() for metric in TREND_METRICS}
+
+    def update(self, when: datetime, values: Mapping[str, Optional[float]]) -> None:
+        for metric, accumulator in self.accumulators.items():
+            value = values.get(metric)
+            if value is not None:
+                accumulator.add(when, float(value))
+
+    def summary(self) -> Dict[str, float]:
+        trends = {}
+        for metric, accumulator in self.accumulators.items():
+            trends[f"{metric}_trend"] = accumulator.slope
+            trends[f"{metric}_ewma"] = accumulator.ewma if accumulator.ewma is not None else 0.0
+            trends[f"{metric}_rolling_mean"] = accumulator.rolling_mean
+        return trends
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {metric: accumulator.to_dict() for metric, accumulator in self.accumulators.items()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Mapping[str, Any]]]) -> "TrendState":
+        state = cls()
+        for metric, accumulator in (data or {}).items():
+            state.accumulators[metric] = TrendAccumulator.from_dict(accumulator)
+        return state
\ No newline at end of file
@@ -0,0 +1,43 @@
+import sys
+import types
+
+try:
+    import openai.agents  # noqa: F401
+except ImportError:
+    # The agents SDK isn't installed in every dev environment; stand in the
+    # names the package imports so tools can be exercised without it
+    class Tool:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class Agent(Tool):
+        pass
+
+    class AgentResponse:
+        def __init__(self, *args, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class AgentState:
+        pass
+
+    class RunHooks:
+        pass
+
+    class AgentHooks:
+        pass
+
+    class StreamingResponse:
+        def __init__(self, final_response=None, progress_generator=None):
+            self.final_response = final_response
+            self.progress_generator = progress_generator
+
+        def __class_getitem__(cls, item):
+            return cls
+
+    openai = sys.modules.get("openai") or types.ModuleType("openai")
+    agents = types.ModuleType("openai.agents")
+    for stub in (Tool, Agent, AgentResponse, AgentState, RunHooks, AgentHooks, StreamingResponse):
+        setattr(agents, stub.__name__, stub)
+    openai.agents = agents
+    sys.modules.setdefault("openai", openai)
+    sys.modules["openai.agents"] = agents
\ No newline at end of file
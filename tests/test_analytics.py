@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+import runpy
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from health_wellness_agent.database.analytics import NO_GOAL_COHORT, CohortAnalytics
+from health_wellness_agent.database.db import Database
+from health_wellness_agent.database.models import CohortProgressSummary, Goal, ProgressLog, User, UserProgressSummary
+
+NOW = datetime(2026, 10, 18, 20, 0)
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'analytics.db'}")
+    database.create_tables()
+    return database
+
+def add_logs(db, user_id: int, days_ago, **values):
+    with db.get_session() as session:
+        if session.get(User, user_id) is None:
+            session.add(User(id=user_id, name=f"user {user_id}", email=f"{user_id}@example.com"))
+        session.add_all(
+            ProgressLog(user_id=user_id, log_date=NOW.replace(hour=8) - timedelta(days=day), **values)
+            for day in days_ago
+        )
+        session.commit()
+
+def add_random_logs(db, users: int = 12, seed: int = 7):
+    # Gappy calendars, some days logged twice and some weigh-ins skipped
+    rng = np.random.default_rng(seed)
+    with db.get_session() as session:
+        for user_id in range(1, users + 1):
+            session.add(User(id=user_id, name=f"user {user_id}", email=f"{user_id}@example.com"))
+            for day in sorted(rng.choice(40, size=int(rng.integers(1, 25)), replace=False), reverse=True):
+                for hour in range(int(rng.integers(1, 3))):
+                    session.add(ProgressLog(
+                        user_id=user_id,
+                        log_date=NOW.replace(hour=7 + hour) - timedelta(days=int(day)),
+                        weight=None if rng.random() < 0.3 else float(rng.normal(80, 5)),
+                        energy_level=int(rng.integers(1, 11)),
+                        workout_compliance=float(rng.random()),
+                        diet_compliance=None if rng.random() < 0.2 else float(rng.random())
+                    ))
+        session.add(Goal(user_id=1, goal_type="weight_loss", target_value=5, timeframe_weeks=10))
+        session.add(Goal(user_id=2, goal_type="muscle_gain", target_value=3, timeframe_weeks=12))
+        session.add(Goal(user_id=3, goal_type="weight_loss", target_value=4, timeframe_weeks=8, status="completed"))
+        session.commit()
+
+def expected_users(db) -> pd.DataFrame:
+    # The same summary from one plain groupby over every log, without chunking or grouped sums
+    with db.engine.connect() as connection:
+        logs = pd.read_sql("SELECT * FROM progress_logs", connection, parse_dates=["log_date"])
+    rows = {}
+    today = pd.Timestamp(NOW).floor("D")
+    for user_id, group in logs.sort_values(["user_id", "log_date"]).groupby("user_id"):
+        weighed = group.dropna(subset=["weight"])
+        slope = np.nan
+        if weighed["log_date"].nunique() > 1:
+            days = (weighed["log_date"] - weighed["log_date"].iloc[0]) / pd.Timedelta(days=1)
+            slope = np.polyfit(days, weighed["weight"], 1)[0] * 7
+        calendar = sorted(group["log_date"].dt.floor("D").unique())
+        runs = [1]
+        for previous, day in zip(calendar, calendar[1:]):
+            if day - previous == pd.Timedelta(days=1):
+                runs[-1] += 1
+            else:
+                runs.append(1)
+        rows[user_id] = {
+            "log_count": len(group),
+            "first_log": group["log_date"].min(),
+            "last_log": group["log_date"].max(),
+            "workout_compliance": group["workout_compliance"].mean(),
+            "diet_compliance": group["diet_compliance"].mean(),
+            "energy_level": group["energy_level"].mean(),
+            "weight_start": weighed["weight"].iloc[0] if len(weighed) else np.nan,
+            "weight_latest": weighed["weight"].iloc[-1] if len(weighed) else np.nan,
+            "weight_slope": slope,
+            "latest_streak": runs[-1] if calendar[-1] >= today - pd.Timedelta(days=1) else 0,
+            "longest_streak": max(runs)
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+def stored_users(db) -> pd.DataFrame:
+    with db.engine.connect() as connection:
+        users = pd.read_sql(f"SELECT * FROM {UserProgressSummary.__tablename__}", connection, parse_dates=["first_log", "last_log"])
+    return users.set_index("user_id").sort_index()
+
+@pytest.mark.parametrize("chunk_rows", [3, 7, 10_000])
+def test_chunked_summary_matches_a_plain_groupby(db, chunk_rows):
+    add_random_logs(db)
+    counts = CohortAnalytics(db, chunk_rows=chunk_rows).run(now=NOW)
+
+    expected = expected_users(db)
+    users = stored_users(db)
+    assert counts == {"users": 12, "cohorts": 3}
+    assert list(users.index) == list(expected.index)
+    pd.testing.assert_frame_equal(users[expected.columns], expected, check_dtype=False, check_names=False, atol=1e-9)
+
+def test_cohorts_use_the_active_goal(db):
+    add_random_logs(db)
+    CohortAnalytics(db, chunk_rows=5).run(now=NOW)
+
+    users = stored_users(db)
+    assert users.loc[1, "cohort"] == "weight_loss"
+    assert users.loc[2, "cohort"] == "muscle_gain"
+    assert users.loc[3, "cohort"] == NO_GOAL_COHORT
+    with db.engine.connect() as connection:
+        cohorts = pd.read_sql(f"SELECT * FROM {CohortProgressSummary.__tablename__}", connection).set_index("cohort")
+    assert cohorts["user_count"].to_dict() == {"muscle_gain": 1, NO_GOAL_COHORT: 10, "weight_loss": 1}
+    assert cohorts["log_count"].sum() == users["log_count"].sum()
+    assert cohorts.loc[NO_GOAL_COHORT, "longest_streak_mean"] == pytest.approx(users.loc[3:, "longest_streak"].mean())
+
+def test_latest_streak_is_relative_to_the_reference_day(db):
+    add_logs(db, 1, [0, 1, 2, 5, 6, 7, 8], weight=80.0)
+    add_logs(db, 2, [1, 2, 3], weight=80.0)
+    add_logs(db, 3, [2, 3, 4, 5], weight=80.0)
+    CohortAnalytics(db).run(now=NOW)
+
+    users = stored_users(db)
+    # Logged today, through yesterday, and missed yesterday
+    assert users["latest_streak"].to_dict() == {1: 3, 2: 3, 3: 0}
+    assert users["longest_streak"].to_dict() == {1: 4, 2: 3, 3: 4}
+
+    # A week later every streak has lapsed
+    CohortAnalytics(db).run(now=NOW + timedelta(days=7))
+    assert stored_users(db)["latest_streak"].to_dict() == {1: 0, 2: 0, 3: 0}
+
+def test_cli_rebuilds_summaries(db, tmp_path, monkeypatch, capsys):
+    add_logs(db, 1, [0, 1], weight=80.0)
+    monkeypatch.setattr(sys, "argv", ["analytics", f"sqlite:///{tmp_path / 'analytics.db'}", "--chunk-rows", "1"])
+    sys.modules.pop("health_wellness_agent.database.analytics", None)
+    runpy.run_module("health_wellness_agent.database.analytics", run_name="__main__")
+
+    assert capsys.readouterr().out.strip() == "summarized 1 users in 1 cohorts"
+    assert stored_users(db).loc[1, "log_count"] == 2
\ No newline at end of file
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+import pytest
+from health_wellness_agent.database.db import Database
+from health_wellness_agent.tools.checkin_dispatch import CheckinDispatcher, LocalCheckinSink
+from health_wellness_agent.tools.scheduler import ScheduledCheckin
+
+class FlakySink(LocalCheckinSink):
+    """Fails the first delivery, then behaves"""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 0
+
+    async def deliver(self, user_id: int, checkin: ScheduledCheckin) -> None:
+        if self.failures == 0:
+            self.failures += 1
+            raise ConnectionError("push service unavailable")
+        await super().deliver(user_id, checkin)
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'checkins.db'}")
+    database.create_tables()
+    return database
+
+def checkin(checkin_type: str) -> ScheduledCheckin:
+    due = datetime.now(timezone.utc) - timedelta(minutes=1)
+    return ScheduledCheckin(datetime=due, checkin_type=checkin_type, metrics_required=["weight"], questions=[])
+
+async def test_failing_sink_does_not_stop_the_dispatcher(db):
+    sink = FlakySink()
+    dispatcher = CheckinDispatcher(db, sink, tick_seconds=0.01)
+    dispatcher.schedule(1, [checkin("daily"), checkin("weekly")])
+
+    stop = asyncio.Event()
+    running = asyncio.ensure_future(dispatcher.run(stop))
+    try:
+        for _ in range(2):
+            await asyncio.wait_for(sink.queue.get(), timeout=2)
+    finally:
+        stop.set()
+        await asyncio.wait_for(running, timeout=2)
+
+    assert sink.failures == 1
+    assert sorted(delivered.checkin_type for _, delivered in sink.delivered) == ["daily", "weekly"]
+    assert dispatcher.restore() == 0
+
+async def test_restore_skips_checkins_already_on_the_wheel(db):
+    sink = LocalCheckinSink()
+    dispatcher = CheckinDispatcher(db, sink)
+    dispatcher.schedule(1, [checkin("daily"), checkin("weekly")])
+
+    assert dispatcher.restore() == 0
+    assert dispatcher.wheel.size == 2
+    # After a restart the database puts them back
+    assert CheckinDispatcher(db, LocalCheckinSink()).restore() == 2
+
+    assert await dispatcher.tick() == 2
+    assert dispatcher.wheel.size == 0 and not dispatcher.pending
\ No newline at end of file
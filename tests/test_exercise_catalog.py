@@ -0,0 +1,30 @@
+import pytest
+from health_wellness_agent.tools.exercise_catalog import (
+    MOBILITY_PRESCRIPTION, get_exercise_catalog, limitation_contraindications
+)
+from health_wellness_agent.tools.schedule_templates import SCHEDULE_TEMPLATES
+
+@pytest.mark.parametrize("limitation, expected", [
+    ("bad back", {"lower_back"}),
+    ("carries a heavy backpack to work", set()),
+    ("sore knees", {"knee"}),
+    ("hip replacement", {"hip"}),
+    ("worships at a hipster gym", set()),
+    ("high blood pressure", {"hypertension"}),
+    ("torn Achilles tendon", {"ankle"})
+])
+def test_limitations_match_whole_words(limitation, expected):
+    assert limitation_contraindications([limitation]) == expected
+
+def test_knee_limitation_removes_knee_contraindicated_exercises():
+    catalog = get_exercise_catalog()
+    allowed = catalog.allowed("advanced", ["bad knees"])
+    assert allowed
+    assert not allowed & catalog.by_contraindication["knee"]
+
+def test_holds_are_only_prescribed_for_mobility_work():
+    exercises = get_exercise_catalog().select_week(SCHEDULE_TEMPLATES["beginner"], goal_type="flexibility", experience="beginner")
+    assert {"mobility", "squat"} <= {exercise["movement_pattern"] for exercise in exercises}
+    for exercise in exercises:
+        is_hold = (exercise["sets"], exercise["reps"], exercise["rest"]) == MOBILITY_PRESCRIPTION
+        assert is_hold == (exercise["movement_pattern"] == "mobility")
\ No newline at end of file
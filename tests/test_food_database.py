@@ -0,0 +1,46 @@
+import pytest
+from health_wellness_agent.tools.food_database import FoodDatabase, parse_ingredient, scale_amount
+
+@pytest.fixture(scope="module")
+def food_db(tmp_path_factory):
+    return FoodDatabase(db_path=str(tmp_path_factory.mktemp("foods") / "foods.sqlite"))
+
+@pytest.mark.parametrize("text, quantity, unit, name", [
+    ("1 1/2 cups rolled oats", 1.5, "cup", "rolled oats"),
+    ("½ tbsp extra virgin olive oil", 0.5, "tbsp", "extra virgin olive oil"),
+    ("2 large eggs, beaten", 2.0, None, "eggs"),
+    ("3.5 oz baby spinach (washed)", 3.5, "oz", "baby spinach"),
+    ("salt to taste", 0.0, None, "salt")
+])
+def test_parse_ingredient(text, quantity, unit, name):
+    parsed = parse_ingredient(text)
+    assert (parsed.quantity, parsed.unit, parsed.name) == (pytest.approx(quantity), unit, name)
+
+@pytest.mark.parametrize("text, grams", [
+    ("200g spinach", 200.0),
+    ("1 lb spinach", 453.592),
+    ("2 eggs", 100.0),
+    ("1 cup milk", 244.0),
+    ("2 tbsp olive oil", 27.0),
+    ("250 ml milk", 254.17)
+])
+def test_ingredient_grams(food_db, text, grams):
+    parsed = parse_ingredient(text)
+    assert food_db.ingredient_grams(parsed, food_db.lookup(parsed.name)) == pytest.approx(grams, rel=1e-3)
+
+def test_ingredient_nutrition_scales_per_100g(food_db):
+    nutrition = food_db.ingredient_nutrition("50g rolled oats")
+    assert nutrition["calories"] == pytest.approx(189.5)
+    assert nutrition["protein"] == pytest.approx(6.6)
+
+def test_trailing_word_does_not_name_another_food(food_db):
+    assert food_db.ingredient_nutrition("1 cup coconut milk") is None
+
+@pytest.mark.parametrize("text, factor, scaled", [
+    ("60g rolled oats", 1.1, "66g rolled oats"),
+    ("2 eggs", 1.5, "3 eggs"),
+    ("1/2 cup milk", 0.5, "0.2 cup milk"),
+    ("pinch of salt", 2.0, "pinch of salt")
+])
+def test_scale_amount(text, factor, scaled):
+    assert scale_amount(text, factor) == scaled
\ No newline at end of file
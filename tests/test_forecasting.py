@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+import pytest
+from health_wellness_agent.database.db import Database
+from health_wellness_agent.database.models import Goal, ProgressLog, User
+from health_wellness_agent.tools.forecasting import FIT_WINDOW_DAYS, GoalForecaster
+
+NOW = datetime(2026, 10, 18)
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'forecast.db'}")
+    database.create_tables()
+    return database
+
+def add_goal(db, user_id: int, days_ago: int, start_weight: float, lose: float, per_day: float) -> int:
+    # Weekly weigh-ins from the goal's start, losing per_day kg a day
+    start = NOW - timedelta(days=days_ago)
+    with db.get_session() as session:
+        session.add(User(id=user_id, name=f"user {user_id}", email=f"{user_id}@example.com"))
+        goal = Goal(user_id=user_id, goal_type="weight_loss", target_value=lose, timeframe_weeks=52, start_date=start)
+        session.add(goal)
+        session.add_all(
+            ProgressLog(user_id=user_id, log_date=start + timedelta(days=day), weight=start_weight - per_day * day)
+            for day in range(0, days_ago + 1, 7)
+        )
+        session.commit()
+        return goal.id
+
+def test_goal_older_than_the_fit_window_keeps_its_starting_weight(db):
+    goal_id = add_goal(db, 1, days_ago=300, start_weight=100.0, lose=10.0, per_day=0.02)
+    assert 300 > FIT_WINDOW_DAYS
+
+    forecast = GoalForecaster().forecast_active_goals(db, now=NOW).row(goal_id)
+    # Last weigh-in on day 294 at 94.12 kg: 5.88 of 10 kg lost, 4.12 kg left at 0.02 kg a day
+    assert forecast["overall_progress"] == pytest.approx(0.588, abs=1e-3)
+    assert forecast["weekly_progress"] == pytest.approx(-0.14)
+    assert forecast["projected_completion"] == pytest.approx(206, abs=1)
+
+def test_goal_inside_the_window_matches(db):
+    goal_id = add_goal(db, 2, days_ago=70, start_weight=90.0, lose=5.0, per_day=0.05)
+
+    forecast = GoalForecaster().forecast_active_goals(db, now=NOW).row(goal_id)
+    assert forecast["overall_progress"] == pytest.approx(0.7)
+    assert forecast["projected_completion"] == pytest.approx(30, abs=1)
\ No newline at end of file
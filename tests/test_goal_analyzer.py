@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from datetime import date
+import pytest
+import json
+from health_wellness_agent.tools.goal_analyzer import GoalAnalyzerTool, RuleBasedGoalParser
+from health_wellness_agent.utils.llm_client import LocalBackend, configure_llm_client
+
+TODAY = date(2026, 10, 18)
+
+@pytest.fixture
+def parser():
+    return RuleBasedGoalParser()
+
+def test_ordinal_date_is_not_a_stone_target(parser):
+    parsed = parser.parse("lose weight by march 1st", TODAY)
+    assert parsed.target_value is None
+    assert parsed.confidence < GoalAnalyzerTool.fast_path_threshold
+
+@pytest.mark.parametrize("text", [
+    "lose 10 lbs, working out twice a week",
+    "lose 5 kg by walking 30 minutes a day"
+])
+def test_frequency_is_not_a_timeframe(parser, text):
+    parsed = parser.parse(text, TODAY)
+    assert parsed.timeframe_weeks is None
+    assert parsed.confidence < GoalAnalyzerTool.fast_path_threshold
+
+def test_frequency_next_to_a_real_timeframe(parser):
+    parsed = parser.parse("lose 5 kg in 3 months, training 3 days a week", TODAY)
+    assert parsed.timeframe_weeks == 13
+    assert parsed.target_value == 5.0
+
+def test_stone_with_space_still_parses(parser):
+    assert parser.parse("lose 2 st in 10 weeks", TODAY).target_value == 12.7
+
+@pytest.mark.parametrize("text", [
+    "lose 5 kg or 8 kg in 10 weeks",
+    "lose 5 kg in 10 weeks by june"
+])
+def test_ambiguous_goals_fall_back_to_the_model(parser, text):
+    assert parser.parse(text, TODAY).confidence < GoalAnalyzerTool.fast_path_threshold
+
+def test_unambiguous_goal_takes_the_fast_path(parser):
+    parsed = parser.parse("lose 5 kg in 10 weeks", TODAY)
+    assert (parsed.goal_type, parsed.target_value, parsed.timeframe_weeks) == ("weight_loss", 5.0, 10)
+    assert parsed.confidence >= GoalAnalyzerTool.fast_path_threshold
+
+async def test_fast_path_counters_span_instances(monkeypatch):
+    configure_llm_client(LocalBackend(lambda model_name, prompt: json.dumps({
+        "goal_type": "weight_loss", "target_value": 5.0, "timeframe_weeks": 10, "constraints": []
+    })))
+    monkeypatch.setattr(GoalAnalyzerTool, "_parse_cache", OrderedDict())
+    monkeypatch.setattr(GoalAnalyzerTool, "fast_path_hits", 0)
+    monkeypatch.setattr(GoalAnalyzerTool, "fast_path_misses", 0)
+
+    # A fresh tool per message, as the agent builds them
+    await GoalAnalyzerTool().extract_goal("lose 5 kg in 10 weeks")
+    await GoalAnalyzerTool().extract_goal("lose 5 kg or 8 kg in 10 weeks")
+    assert (GoalAnalyzerTool.fast_path_hits, GoalAnalyzerTool.fast_path_misses) == (1, 1)
\ No newline at end of file
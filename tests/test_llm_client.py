@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+from health_wellness_agent.utils.llm_client import LLMClient, LocalBackend, configure_llm_client, get_model
+
+class CountingBackend(LocalBackend):
+    """Records the highest number of calls running at once"""
+
+    def __init__(self, latency: float):
+        super().__init__(responder=lambda model_name, prompt: prompt.upper(), latency=latency)
+        self.running = 0
+        self.peak = 0
+
+    async def generate(self, model_name: str, prompt: str, **kwargs) -> str:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            return await super().generate(model_name, prompt, **kwargs)
+        finally:
+            self.running -= 1
+
+async def test_concurrency_is_capped():
+    backend = CountingBackend(latency=0.02)
+    client = LLMClient(backend, max_concurrency=2)
+    try:
+        responses = await asyncio.gather(*(client.generate("local", f"p{i}") for i in range(6)))
+    finally:
+        client.close()
+    assert [response.text for response in responses] == [f"P{i}" for i in range(6)]
+    assert backend.peak == 2
+
+def test_handles_follow_configured_client():
+    handle = get_model("local")
+    configure_llm_client(LocalBackend(lambda model_name, prompt: "first"))
+    assert handle.generate_content_sync("hi").text == "first"
+    configure_llm_client(LocalBackend(lambda model_name, prompt: "second"))
+    assert handle.generate_content_sync("hi").text == "second"
+
+def test_close_waits_for_in_flight_calls():
+    client = LLMClient(LocalBackend(lambda model_name, prompt: "done", latency=0.1))
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(client.generate_sync("local", "hi").text)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while len(client._pending) < 3:
+        time.sleep(0.001)
+    client.close()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert results == ["done"] * 3
\ No newline at end of file
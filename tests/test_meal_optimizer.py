@@ -0,0 +1,84 @@
+from itertools import combinations, product
+import numpy as np
+import pytest
+from health_wellness_agent.tools.food_database import NUTRIENTS, FoodDatabase
+from health_wellness_agent.tools.meal_optimizer import TARGET_WEIGHTS, MealPlanOptimizer, RecipeCatalog
+
+TARGETS = {"calories": 2000, "protein": 120, "carbs": 220, "fat": 70}
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    food_db = FoodDatabase(db_path=str(tmp_path_factory.mktemp("foods") / "foods.sqlite"))
+    return RecipeCatalog.load(food_db=food_db)
+
+@pytest.fixture
+def optimizer(catalog):
+    return MealPlanOptimizer(catalog)
+
+def excluded_names(catalog, allergy):
+    eligible = catalog.eligible([], [allergy])
+    return {recipe.name for recipe, keep in zip(catalog.recipes, eligible) if not keep}
+
+def tagged(catalog, allergen):
+    return {recipe.name for recipe in catalog.recipes if allergen in recipe.allergens}
+
+@pytest.mark.parametrize("allergy, allergen", [
+    ("sesame seeds", "sesame"),
+    ("nut allergy", "nuts"),
+    ("lactose intolerance", "dairy")
+])
+def test_allergy_phrases_exclude_their_allergen(catalog, allergy, allergen):
+    assert tagged(catalog, allergen)
+    assert tagged(catalog, allergen) <= excluded_names(catalog, allergy)
+
+def test_food_allergy_excludes_every_food_containing_it(catalog):
+    excluded = excluded_names(catalog, "almond")
+    assert {"Handful of almonds", "Overnight oats with blueberries", "Protein shake"} <= excluded
+
+def test_unknown_allergy_falls_back_to_the_model(catalog):
+    assert catalog.constraint_masks([], ["kiwi"]) is None
+    assert not catalog.eligible([], ["kiwi"]).any()
+
+def day_totals(catalog, day):
+    indexes = [day.breakfast, day.lunch, day.dinner, *day.snacks]
+    return dict(zip(NUTRIENTS, catalog.nutrients[indexes].sum(axis=0)))
+
+@pytest.mark.parametrize("restrictions", [[], ["vegetarian"], ["vegan"]])
+def test_week_meets_targets_within_tolerance(catalog, optimizer, restrictions):
+    days = optimizer.plan_days(TARGETS, restrictions, [], [], 7)
+    assert all(day is not None for day in days)
+    for day in days:
+        totals = day_totals(catalog, day)
+        for nutrient, target in TARGETS.items():
+            tolerance = optimizer.calorie_tolerance if nutrient == "calories" else optimizer.macro_tolerance
+            assert abs(totals[nutrient] - target) <= tolerance * target
+        for index, meal_type in zip([day.breakfast, day.lunch, day.dinner], ["breakfast", "lunch", "dinner"]):
+            assert catalog.recipes[index].meal_type == meal_type
+            assert set(restrictions) <= set(catalog.recipes[index].diets)
+
+def test_first_day_is_the_closest_fit(catalog, optimizer):
+    # Exhaustive search over the same combinations the broadcast scores
+    columns = [NUTRIENTS.index(nutrient) for nutrient in TARGET_WEIGHTS]
+    target = np.array([TARGETS[nutrient] for nutrient in TARGET_WEIGHTS])
+    weights = np.array(list(TARGET_WEIGHTS.values()))
+    tolerance = np.array([optimizer.calorie_tolerance] + [optimizer.macro_tolerance] * 3)
+    slots = {meal_type: index.tolist() for meal_type, index in catalog.meal_type_index.items()}
+    snack_options = [()] + [option for count in (1, 2) for option in combinations(slots["snack"], count)]
+
+    best = np.inf
+    for breakfast, lunch, dinner, snacks in product(slots["breakfast"], slots["lunch"], slots["dinner"], snack_options):
+        totals = catalog.nutrients[[breakfast, lunch, dinner, *snacks]][:, columns].sum(axis=0)
+        deviation = np.abs(totals - target) / target
+        if (deviation <= tolerance).all():
+            best = min(best, (deviation * weights).sum() / weights.sum())
+
+    assert optimizer.plan_days(TARGETS, [], [], [], 1)[0].score == pytest.approx(best)
+
+def test_unknown_restriction_leaves_days_to_the_model(optimizer):
+    assert optimizer.plan_days(TARGETS, ["keto"], [], [], 3) == [None, None, None]
+
+@pytest.mark.parametrize("allergy", ["seafood", "seafood allergy"])
+def test_seafood_allergy_excludes_fish_and_shellfish(catalog, allergy):
+    seafood = tagged(catalog, "fish") | tagged(catalog, "shellfish")
+    assert tagged(catalog, "fish") and tagged(catalog, "shellfish")
+    assert seafood <= excluded_names(catalog, allergy)
\ No newline at end of file
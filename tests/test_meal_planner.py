@@ -0,0 +1,132 @@
+import asyncio
+import json
+import pytest
+from health_wellness_agent.tools.food_database import NUTRIENTS
+from health_wellness_agent.tools.goal_analyzer import GoalOutput
+from health_wellness_agent.tools.meal_planner import DAYS_OF_WEEK, DietaryPreferences, Meal, MealPlan, MealPlannerTool
+from health_wellness_agent.utils.llm_client import LocalBackend, configure_llm_client
+
+TARGETS = {"calories": 2000, "protein": 120, "carbs": 220, "fat": 70}
+
+def meal(name: str, calories: float) -> dict:
+    return {
+        "name": name,
+        "ingredients": ["1 cup oats", "2 eggs"],
+        "nutrition": {"calories": calories, "protein": calories / 20, "carbs": calories / 9, "fat": calories / 30},
+        "preparation": "Combine and cook.",
+        "portion_size": "1 plate"
+    }
+
+def day_response(model_name: str, prompt: str) -> str:
+    return json.dumps({
+        "breakfast": meal("Porridge", 450),
+        "lunch": meal("Chickpea bowl", 650),
+        "dinner": meal("Salmon and rice", 700),
+        "snacks": [meal("Greek yogurt", 200)]
+    })
+
+class PeakBackend(LocalBackend):
+    """Fails every `fail_every`-th call and records the peak number of calls in flight"""
+
+    def __init__(self, fail_every: int = 0):
+        super().__init__(day_response, latency=0.01)
+        self.fail_every = fail_every
+        self.running = 0
+        self.peak = 0
+
+    async def generate(self, model_name: str, prompt: str, **kwargs) -> str:
+        fail = self.fail_every and (self.calls + 1) % self.fail_every == 0
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            text = await super().generate(model_name, prompt, **kwargs)
+        finally:
+            self.running -= 1
+        if fail:
+            raise RuntimeError("simulated model failure")
+        return text
+
+@pytest.fixture
+def tool():
+    tool = MealPlannerTool()
+    tool.use_optimizer = False
+    tool.use_plan_cache = False
+    tool.day_retry_delay = 0.0
+    return tool
+
+async def test_days_generate_concurrently_within_the_limit(tool):
+    backend = PeakBackend()
+    configure_llm_client(backend)
+    tool.max_concurrent_days = 3
+
+    plans = await tool.generate_daily_plans(TARGETS, DietaryPreferences(calories_target=2000))
+    assert list(plans) == DAYS_OF_WEEK
+    assert backend.calls == 7
+    assert backend.peak == 3
+
+async def test_failed_day_is_retried_on_its_own(tool):
+    backend = PeakBackend(fail_every=3)
+    configure_llm_client(backend)
+
+    plans = await tool.generate_daily_plans(TARGETS, DietaryPreferences(calories_target=2000))
+    assert list(plans) == DAYS_OF_WEEK
+    # Every third call fails and only that day is asked again
+    assert backend.calls == 10
+
+async def test_every_reader_sees_every_day(tool):
+    configure_llm_client(PeakBackend())
+    stream = tool.stream_meal_plan(TARGETS, DietaryPreferences(calories_target=2000))
+
+    async def read():
+        return [day async for day, _ in stream]
+
+    first, second = await asyncio.gather(read(), read())
+    late = await read()
+    assert sorted(first) == sorted(second) == sorted(late) == sorted(DAYS_OF_WEEK)
+    assert list((await stream.result()).daily_plans) == DAYS_OF_WEEK
+
+async def test_execute_returns_the_finished_plan(tool, monkeypatch):
+    configure_llm_client(PeakBackend())
+    monkeypatch.setattr(tool, "calculate_nutrition_targets", lambda goal_output: TARGETS)
+    goal = GoalOutput(goal_type="weight_loss", target_value=5.0, timeframe_weeks=10)
+
+    response = await tool.execute(goal, DietaryPreferences(calories_target=2000))
+    assert isinstance(response.final_response, MealPlan)
+    progress = [line async for line in response.progress_generator]
+    assert len(progress) == len(DAYS_OF_WEEK)
+
+async def test_swap_updates_totals_and_shopping_list_incrementally(tool):
+    tool.use_optimizer = True
+    preferences = DietaryPreferences(calories_target=2000)
+    meal_plan = tool.build_meal_plan(await tool.generate_daily_plans(TARGETS, preferences))
+    old_lunch = meal_plan.daily_plans["tuesday"].lunch
+
+    new_lunch = await tool.swap_meal(meal_plan, "tuesday", "lunch", TARGETS, preferences)
+    assert new_lunch.name != old_lunch.name
+    assert meal_plan.daily_plans["tuesday"].lunch is new_lunch
+
+    # Same result as rebuilding everything from the swapped plan
+    tuesday = meal_plan.daily_plans["tuesday"]
+    assert tuesday.total_nutrition == pytest.approx(tool.sum_meal_nutrition(tool.day_meals(tuesday)))
+    assert meal_plan.nutritional_summary == pytest.approx(tool.calculate_nutritional_summary(meal_plan.daily_plans))
+    assert meal_plan.shopping_list == tool.create_shopping_list(meal_plan.daily_plans)
+
+def test_nutrients_cannot_drift_from_the_array():
+    porridge = Meal(**meal("Porridge", 450))
+    with pytest.raises(TypeError):
+        porridge.nutrition["calories"] = 0
+    with pytest.raises(ValueError):
+        porridge.nutrients[0] = 0
+
+    porridge.nutrition = {"calories": 300, "protein": 10}
+    assert porridge.nutrients[NUTRIENTS.index("calories")] == 300
+    assert porridge.nutrition["calories"] == 300
+
+def test_nutrients_outside_the_table_are_kept():
+    data = meal("Porridge", 450)
+    data["nutrition"]["cholesterol"] = 12.0
+    porridge = Meal(**data)
+
+    assert porridge.nutrition["cholesterol"] == 12.0
+    assert porridge.model_dump()["nutrition"]["cholesterol"] == 12.0
+    assert Meal.model_validate_json(porridge.model_dump_json()) == porridge
\ No newline at end of file
@@ -0,0 +1,57 @@
+from typing import Dict, List
+from pydantic import BaseModel
+from health_wellness_agent.tools.food_database import scale_amount
+from health_wellness_agent.tools.plan_cache import PlanTemplateCache, portion_scale
+
+WEIGHTS = {"calories": 2.0, "protein": 1.0, "carbs": 1.0, "fat": 1.0}
+
+class Plan(BaseModel):
+    ingredients: List[str]
+    totals: Dict[str, float]
+
+def scale_plan(plan: Plan, targets: Dict[str, float]) -> Plan:
+    factor = portion_scale(plan.totals, targets, WEIGHTS)
+    plan.ingredients = [scale_amount(ingredient, factor) for ingredient in plan.ingredients]
+    plan.totals = {nutrient: value * factor for nutrient, value in plan.totals.items()}
+    return plan
+
+def targets(calories: float) -> Dict[str, float]:
+    return {"calories": calories, "protein": calories * 0.3 / 4, "carbs": calories * 0.4 / 4, "fat": calories * 0.3 / 9}
+
+def test_cached_template_is_scaled_to_each_user():
+    cache = PlanTemplateCache(Plan, scale=scale_plan)
+    template = Plan(ingredients=["100g chicken breast", "1 cup milk"], totals=targets(2000))
+    cache.put(cache.make_key(targets(2000), [], [], [], ["monday"]), template)
+
+    key = cache.make_key(targets(2040), [], [], [], ["monday"])
+    assert key == cache.make_key(targets(2000), [], [], [], ["monday"])
+    plan = cache.get(key, targets(2040))
+    assert plan.totals["calories"] == 2040
+    assert abs(plan.totals["protein"] - targets(2040)["protein"]) < 1e-6
+    assert plan.ingredients == ["102g chicken breast", "1 cup milk"]
+
+    # The stored template is untouched
+    assert cache.get(key, targets(2000)).ingredients == ["100g chicken breast", "1 cup milk"]
+
+def test_scale_amount_keeps_text_without_a_quantity():
+    assert scale_amount("salt to taste", 1.5) == "salt to taste"
+    assert scale_amount("1/2 cup rice", 2.0) == "1 cup rice"
+
+def test_unwritable_disk_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = PlanTemplateCache(Plan, disk_dir=str(blocker / "cache"))
+    key = cache.make_key(targets(2000), [], [], [], ["monday"])
+    cache.put(key, Plan(ingredients=[], totals=targets(2000)))
+    assert cache.get(key) is not None
+
+def test_failed_disk_write_keeps_the_memory_entry(tmp_path, monkeypatch):
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("os.replace", disk_full)
+    cache = PlanTemplateCache(Plan, disk_dir=str(tmp_path))
+    key = cache.make_key(targets(2000), [], [], [], ["monday"])
+    cache.put(key, Plan(ingredients=[], totals=targets(2000)))
+    assert cache.get(key) is not None
+    assert list(tmp_path.iterdir()) == []
\ No newline at end of file
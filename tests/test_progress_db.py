@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import asyncio
+import threading
+import pytest
+from health_wellness_agent.database.db import Database, DatabaseManager
+from health_wellness_agent.database.models import ProgressRollup, ProgressTrend
+from health_wellness_agent.database.rollups import backfill
+
+class RecordingAgent:
+    """Stands in for EscalationAgent; records what it was asked to escalate"""
+
+    def __init__(self):
+        self.escalated = []
+
+    def escalate_anomalies(self, triggers, context):
+        if triggers:
+            self.escalated.append((context.uid, [trigger.trigger for trigger in triggers]))
+        return {}
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'progress.db'}")
+    database.create_tables()
+    return database
+
+async def test_anomalies_reach_the_escalation_agent(db):
+    agent = RecordingAgent()
+    manager = DatabaseManager(db, escalation_agent=agent, contexts=lambda user_id: SimpleNamespace(uid=user_id))
+    user = await manager.create_user({"name": "Sam", "email": "sam@example.com"})
+
+    start = datetime(2026, 1, 5)
+    for day, weight in enumerate([80.0, 80.2, 79.9, 80.1, 80.0, 80.1, 74.0]):
+        await manager.log_progress(user.id, {"log_date": start + timedelta(days=day), "weight": weight})
+
+    assert agent.escalated == [(user.id, ["rapid_weight_loss"])]
+
+def test_escalation_agent_needs_contexts(db):
+    with pytest.raises(ValueError):
+        DatabaseManager(db, escalation_agent=RecordingAgent())
+
+def rollup_rows(db):
+    with db.get_session() as session:
+        return sorted(
+            (row.user_id, row.period, row.period_start, row.log_count, row.weight_count, round(row.weight_sum, 6))
+            for row in session.query(ProgressRollup)
+        )
+
+def test_concurrent_logs_keep_every_count_and_match_a_backfill(db):
+    manager = DatabaseManager(db)
+    user = asyncio.run(manager.create_user({"name": "Sam", "email": "sam@example.com"}))
+
+    def log_many(worker):
+        for index in range(10):
+            log_date = datetime(2026, 1, 1) + timedelta(hours=worker * 10 + index)
+            asyncio.run(manager.log_progress(user.id, {"log_date": log_date, "weight": 80.0 + index / 10}))
+
+    threads = [threading.Thread(target=log_many, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    incremental = rollup_rows(db)
+    assert [row[3] for row in incremental if row[1] == "month"] == [40]
+    assert asyncio.run(manager.get_trend_state(user.id)).accumulators["weight"].count == 40
+
+    backfill(db.engine)
+    assert rollup_rows(db) == incremental
+
+def test_concurrent_first_logs_share_one_trend_row(db):
+    manager = DatabaseManager(db)
+    user = asyncio.run(manager.create_user({"name": "Sam", "email": "sam@example.com"}))
+    start = threading.Barrier(4)
+
+    def first_log(worker):
+        # Every worker finds no trend row yet, so all of them race to create it
+        start.wait()
+        asyncio.run(manager.log_progress(user.id, {"log_date": datetime(2026, 1, 1, worker), "weight": 80.0}))
+
+    threads = [threading.Thread(target=first_log, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with db.get_session() as session:
+        assert session.query(ProgressTrend).filter(ProgressTrend.user_id == user.id).count() == 1
+    assert asyncio.run(manager.get_trend_state(user.id)).accumulators["weight"].count == 4
\ No newline at end of file
@@ -0,0 +1,67 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import json
+import pytest
+from health_wellness_agent.tools.goal_analyzer import GoalOutput
+from health_wellness_agent.tools.recurrence import parse_weekday
+from health_wellness_agent.tools.scheduler import GOAL_METRICS, CheckinSchedule, CheckinSchedulerTool
+from health_wellness_agent.utils.llm_client import LocalBackend, configure_llm_client
+
+TZ = ZoneInfo("Europe/London")
+
+@pytest.fixture
+def tool():
+    return CheckinSchedulerTool()
+
+def biweekly() -> CheckinSchedule:
+    # Started on Monday 5 January
+    return CheckinSchedule(
+        frequency="biweekly",
+        preferred_time="08:00",
+        timezone="Europe/London",
+        reminder_method="push",
+        anchor=datetime(2026, 1, 5, 9, 30, tzinfo=TZ)
+    )
+
+def test_biweekly_weeks_count_from_the_schedule_start(tool):
+    # Asking from the off week must not shift the schedule onto it
+    checkins = tool.next_checkins(biweekly(), 3, after=datetime(2026, 1, 12, tzinfo=TZ))
+    assert [checkin.datetime.date().isoformat() for checkin in checkins] == ["2026-01-19", "2026-02-02", "2026-02-16"]
+
+def test_query_window_does_not_change_occurrences(tool):
+    preferences = biweekly()
+    whole = tool.checkins_between(preferences, datetime(2026, 1, 1, tzinfo=TZ), datetime(2026, 4, 1, tzinfo=TZ))
+    later = tool.checkins_between(preferences, datetime(2026, 2, 10, tzinfo=TZ), datetime(2026, 4, 1, tzinfo=TZ))
+    assert [checkin.datetime for checkin in later] == [
+        checkin.datetime for checkin in whole if checkin.datetime >= datetime(2026, 2, 10, tzinfo=TZ)
+    ]
+
+def test_anchor_is_stored_with_the_schedule():
+    preferences = biweekly()
+    assert CheckinSchedule.model_validate_json(preferences.model_dump_json()).anchor == preferences.anchor
+    assert CheckinSchedule(frequency="weekly", preferred_time="8am", timezone="UTC", reminder_method="email").anchor.tzinfo
+
+@pytest.mark.parametrize("text, weekday", [("Monday", 0), ("mon", 0), ("Tues", 1), ("thurs", 3), ("Sat.", 5)])
+def test_weekday_names_and_abbreviations(text, weekday):
+    assert parse_weekday(text) == weekday
+
+@pytest.mark.parametrize("text", ["Monkey", "mo", "sundays", "fr"])
+def test_other_words_are_not_weekdays(text):
+    with pytest.raises(ValueError):
+        parse_weekday(text)
+
+async def test_questions_are_generated_once_per_checkin_type(tool):
+    backend = LocalBackend(lambda model_name, prompt: json.dumps([f"Q for {prompt.split(' check-in')[0]}?"]))
+    configure_llm_client(backend)
+    preferences = CheckinSchedule(frequency="weekly", preferred_time="08:00", timezone="UTC", reminder_method="push")
+    goal = GoalOutput(goal_type="weight_loss", target_value=5.0, timeframe_weeks=12)
+
+    checkins = await tool.run(preferences, goal)
+    assert len(checkins) >= 12
+    assert {checkin.checkin_type for checkin in checkins} == {"progress", "monthly_review"}
+    assert backend.calls == 2
+    assert all(checkin.metrics_required == GOAL_METRICS["weight_loss"] for checkin in checkins)
+
+    # Shared content, but separate lists
+    checkins[0].questions.append("extra")
+    assert all("extra" not in checkin.questions for checkin in checkins[1:])
\ No newline at end of file
@@ -0,0 +1,29 @@
+import pytest
+from health_wellness_agent.tools.food_database import FoodDatabase
+from health_wellness_agent.tools.shopping_list import IngredientIndex, ShoppingList
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    return IngredientIndex(FoodDatabase(db_path=str(tmp_path_factory.mktemp("foods") / "foods.sqlite")))
+
+def items(shopping, aisle):
+    return shopping.grouped()[aisle]
+
+def test_counts_and_weights_of_one_food_share_a_line(index):
+    shopping = ShoppingList(index)
+    shopping.add_meal(["1/2 onion", "30g onion"])
+    assert len(items(shopping, "produce")) == 1
+
+    shopping.remove_meal(["1/2 onion"])
+    assert items(shopping, "produce") == ["onion (30 g)"]
+
+def test_solids_measured_by_volume_are_weighed(index):
+    shopping = ShoppingList(index)
+    shopping.add_meal(["1 cup brown rice", "50g brown rice"])
+    [rice] = items(shopping, "grains")
+    assert rice.startswith("brown rice (") and rice.endswith(" g)")
+
+def test_liquids_measured_by_weight_are_in_millilitres(index):
+    shopping = ShoppingList(index)
+    shopping.add_meal(["250ml milk", "1 cup milk"])
+    assert items(shopping, "dairy_eggs") == ["milk (490 ml)"]
\ No newline at end of file
@@ -0,0 +1,42 @@
+from datetime import datetime
+import pytest
+from health_wellness_agent.tools.tracker import MetricsStore, ProgressAnalysis, ProgressMetrics, ProgressTrackerTool
+
+class Tracker(ProgressTrackerTool):
+    """Accepts every check-in; validation isn't what these tests cover"""
+
+    def validate_metrics(self, metrics: ProgressMetrics) -> None:
+        pass
+
+@pytest.fixture
+def tracker():
+    return Tracker()
+
+def checkin(day: int, weight: float) -> ProgressMetrics:
+    return ProgressMetrics(date=datetime(2026, 3, day), weight=weight)
+
+def test_update_history_leaves_the_callers_list_alone(tracker):
+    history = [checkin(1, 80.0), checkin(8, 79.5)]
+    updated = tracker.update_history(history, checkin(15, 79.0))
+    late = tracker.update_history(updated, checkin(4, 79.8))
+
+    assert [metrics.date.day for metrics in history] == [1, 8]
+    assert [metrics.date.day for metrics in updated] == [1, 8, 15]
+    assert [metrics.date.day for metrics in late] == [1, 4, 8, 15]
+
+def test_metrics_store_is_updated_in_place(tracker):
+    store = MetricsStore.from_history([checkin(1, 80.0), checkin(8, 79.5)])
+    assert tracker.update_history(store, checkin(4, 79.8)) is store
+    assert [metrics.date.day for metrics in store] == [1, 4, 8]
+
+def test_analysis_serializes_a_store_like_a_list():
+    history = [checkin(1, 80.0), ProgressMetrics(date=datetime(2026, 3, 8), weight=79.5, measurements={"waist": 90.0})]
+    kwargs = {"trend_analysis": {}, "goal_progress": {}, "recommendations": {}}
+    from_store = ProgressAnalysis(metrics_history=MetricsStore.from_history(history), **kwargs)
+    from_list = ProgressAnalysis(metrics_history=history, **kwargs)
+
+    assert from_store.model_dump() == from_list.model_dump()
+    assert from_store.model_dump_json() == from_list.model_dump_json()
+    assert from_store.model_dump()["metrics_history"][1]["measurements"] == {"waist": 90.0}
+    restored = ProgressAnalysis.model_validate_json(from_store.model_dump_json())
+    assert [metrics.weight for metrics in restored.metrics_history] == [80.0, 79.5]
\ No newline at end of file
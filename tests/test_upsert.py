@@ -0,0 +1,62 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import mssql, mysql, postgresql
+from health_wellness_agent.database.db import Database
+from health_wellness_agent.database.models import ProgressRollup, ProgressTrend, User
+from health_wellness_agent.database.upsert import upsert
+
+class CapturingSession:
+    """Compiles the upsert for a dialect without a database behind it"""
+
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=self.dialect)
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=self.dialect)))
+
+def compiled(dialect, *args, **kwargs) -> str:
+    session = CapturingSession(dialect)
+    upsert(session, *args, **kwargs)
+    return session.statements[0]
+
+ROLLUP = {"user_id": 1, "period": "day", "period_start": datetime(2026, 1, 1), "log_count": 1, "weight_sum": 80.0}
+
+def test_postgresql_increments_on_conflict():
+    sql = compiled(postgresql.dialect(), ProgressRollup, ROLLUP, ["user_id", "period", "period_start"], increment=["log_count", "weight_sum"])
+    assert "ON CONFLICT (user_id, period, period_start) DO UPDATE SET" in sql
+    assert "log_count = (progress_rollups.log_count + excluded.log_count)" in sql
+    assert "updated_at = excluded.updated_at" in sql
+
+def test_postgresql_without_increment_does_nothing():
+    sql = compiled(postgresql.dialect(), ProgressTrend, {"user_id": 1, "state": {}}, ["user_id"])
+    assert sql.endswith("ON CONFLICT (user_id) DO NOTHING")
+
+def test_mysql_uses_on_duplicate_key_update():
+    sql = compiled(mysql.dialect(), ProgressRollup, ROLLUP, ["user_id", "period", "period_start"], increment=["log_count"])
+    assert "ON DUPLICATE KEY UPDATE log_count = (progress_rollups.log_count + VALUES(log_count))" in sql
+    # No increment still needs a no-op assignment
+    assert "ON DUPLICATE KEY UPDATE user_id = progress_trends.user_id" in compiled(mysql.dialect(), ProgressTrend, {"user_id": 1, "state": {}}, ["user_id"])
+
+def test_unsupported_dialect_is_refused():
+    with pytest.raises(NotImplementedError):
+        compiled(mssql.dialect(), ProgressTrend, {"user_id": 1, "state": {}}, ["user_id"])
+
+def test_sqlite_inserts_then_increments(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'upsert.db'}")
+    db.create_tables()
+    with db.get_session() as session:
+        session.add(User(id=1, name="Sam", email="sam@example.com"))
+        session.commit()
+        for _ in range(3):
+            upsert(session, ProgressRollup, ROLLUP, ["user_id", "period", "period_start"], increment=["log_count", "weight_sum"])
+            upsert(session, ProgressTrend, {"user_id": 1, "state": {"first": True}}, ["user_id"])
+        session.commit()
+
+        rollup = session.query(ProgressRollup).one()
+        assert (rollup.log_count, rollup.weight_sum) == (3, 240.0)
+        assert session.get(ProgressTrend, 1).state == {"first": True}
\ No newline at end of file
@@ -0,0 +1,40 @@
+import json
+import pytest
+from health_wellness_agent.tools.exercise_catalog import get_exercise_catalog
+from health_wellness_agent.tools.progression import ProgressionEngine
+from health_wellness_agent.tools.schedule_templates import SCHEDULE_TEMPLATES
+from health_wellness_agent.tools.workout_recommender import WorkoutPlan
+
+@pytest.mark.parametrize("experience, goal_type, scheme", [
+    ("beginner", "endurance", "linear"),
+    ("intermediate", "muscle_gain", "undulating"),
+    ("advanced", "flexibility", "block")
+])
+def test_workout_plan_round_trips_through_json(experience, goal_type, scheme):
+    schedule = SCHEDULE_TEMPLATES[experience].with_available_days(["monday", "wednesday", "friday"])
+    exercises = get_exercise_catalog().select_week(
+        schedule, goal_type=goal_type, experience=experience, limitations=[], available_equipment=[]
+    )
+    plan = WorkoutPlan(
+        weekly_schedule=schedule,
+        exercises=exercises,
+        progression_plan=ProgressionEngine().build(exercises, 12, scheme)
+    )
+
+    dumped = plan.model_dump()
+    assert dumped["weekly_schedule"] == schedule.to_dict()
+    assert dumped["progression_plan"] == plan.progression_plan.to_dict()
+    json.dumps(dumped)
+
+    restored = WorkoutPlan.model_validate_json(plan.model_dump_json())
+    assert restored.model_dump() == dumped
+    assert restored.progression_plan.weeks == 12
+
+def test_abbreviated_days_keep_the_training_sessions():
+    schedule = SCHEDULE_TEMPLATES["beginner"].with_available_days(["Mon", "Wed", "Fri"])
+    assert schedule == SCHEDULE_TEMPLATES["beginner"].with_available_days(["monday", "wednesday", "friday"])
+    assert [day for day in schedule if schedule[day]["focus"] != "rest"] == ["monday", "wednesday", "friday"]
+
+def test_unknown_day_names_are_rejected():
+    with pytest.raises(ValueError):
+        SCHEDULE_TEMPLATES["beginner"].with_available_days(["Mon", "Funday"])
\ No newline at end of file